@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+
+"""
+Benchmark of EwaldMinimizer on the removal of lithium from Li2O supercells.
+Prints the time taken and the number of nodes pruned per second.
+
+Usage: python benchmark_ewald_minimizer.py [ncores]
+"""
+
+import sys
+import time
+
+from pymatgen import Lattice, Structure
+from pymatgen.analysis.ewald import EwaldSummation, EwaldMinimizer
+
+
+def get_problem(n):
+    """
+    Returns the ewald matrix of a n x n x n Li2O supercell and the indices of
+    the Li sites.
+    """
+    s = Structure.from_spacegroup("Fm-3m", Lattice.cubic(4.61), ["O", "Li"],
+                                  [[0, 0, 0], [0.25, 0.25, 0.25]])
+    s.add_oxidation_state_by_element({"Li": 1, "O": -2})
+    s.make_supercell([n, n, n])
+    li = [i for i, site in enumerate(s) if site.specie.symbol == "Li"]
+    return EwaldSummation(s).total_energy_matrix, li
+
+
+def main(ncores):
+    """
+    Prints the time taken by EwaldMinimizer to remove Li from supercells of
+    increasing size.
+    """
+    print("%8s %8s %12s %12s %16s" % (
+        "nsites", "removed", "time (s)", "pruned", "pruned / s"))
+    for n, nremove in [(1, 4), (2, 4), (2, 8), (3, 4)]:
+        matrix, li = get_problem(n)
+        t = time.perf_counter()
+        e = EwaldMinimizer(matrix, [[0, nremove, li, None]], 1, ncores=ncores)
+        t = time.perf_counter() - t
+        print("%8d %8d %12.2f %12d %16.0f" % (
+            len(matrix), nremove, t, e.nodes_pruned, e.pruning_rate))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else None)
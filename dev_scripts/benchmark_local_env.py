@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+
+"""
+Benchmark of NearNeighbors.get_all_nn_info on supercells of increasing size.
+The time per site should be roughly independent of the size of the
+supercell.
+
+Usage: python benchmark_local_env.py [nsites ...]
+"""
+
+import sys
+import time
+
+from pymatgen import Lattice, Structure
+from pymatgen.analysis.local_env import CrystalNN
+
+
+def get_supercell(nsites):
+    """
+    Returns a rocksalt supercell with about nsites sites.
+    """
+    nacl = Structure.from_spacegroup("Fm-3m", Lattice.cubic(5.69),
+                                     ["Na", "Cl"], [[0, 0, 0], [0.5, 0, 0]])
+    n = max(1, int(round((nsites / len(nacl)) ** (1 / 3))))
+    return nacl * n
+
+
+def main(sizes):
+    """
+    Prints the time taken by CrystalNN().get_all_nn_info for supercells of
+    the given sizes.
+    """
+    print("%10s %12s %18s" % ("nsites", "time (s)", "time / site (ms)"))
+    for nsites in sizes:
+        s = get_supercell(nsites)
+        t = time.perf_counter()
+        CrystalNN().get_all_nn_info(s)
+        t = time.perf_counter() - t
+        print("%10d %12.1f %18.3f" % (len(s), t, 1000 * t / len(s)))
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [1000, 10000, 50000])
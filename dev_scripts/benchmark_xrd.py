@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+
+"""
+Benchmark of XRDCalculator on supercells of increasing size, and of
+XRDCalculator.get_patterns with serial and parallel evaluation.
+
+Usage: python benchmark_xrd.py [nsites ...]
+"""
+
+import sys
+import time
+
+from pymatgen import Lattice, Structure
+from pymatgen.analysis.diffraction.xrd import XRDCalculator
+
+
+def get_supercell(nsites):
+    """
+    Returns a rocksalt supercell with about nsites sites.
+    """
+    nacl = Structure.from_spacegroup("Fm-3m", Lattice.cubic(5.69),
+                                     ["Na", "Cl"], [[0, 0, 0], [0.5, 0, 0]])
+    n = max(1, int(round((nsites / len(nacl)) ** (1 / 3))))
+    return nacl * n
+
+
+def main(sizes):
+    """
+    Prints the time taken by XRDCalculator().get_pattern for supercells of
+    the given sizes, and by get_patterns for all of them with n_jobs=1 and
+    n_jobs=-1.
+    """
+    c = XRDCalculator()
+    structures = [get_supercell(nsites) for nsites in sizes]
+    print("%10s %12s" % ("nsites", "time (s)"))
+    for s in structures:
+        t = time.perf_counter()
+        c.get_pattern(s)
+        t = time.perf_counter() - t
+        print("%10d %12.2f" % (len(s), t))
+    for n_jobs in [1, -1]:
+        t = time.perf_counter()
+        c.get_patterns(structures, n_jobs=n_jobs)
+        t = time.perf_counter() - t
+        print("get_patterns, n_jobs=%d: %.2f s" % (n_jobs, t))
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [8, 64, 216, 512, 1000])
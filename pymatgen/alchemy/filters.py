@@ -8,6 +8,7 @@ from pymatgen.core.periodic_table import get_el_sp
 from monty.json import MSONable
 from pymatgen.analysis.structure_matcher import StructureMatcher,\
     ElementComparator
+from pymatgen.analysis.structure_index import StructureIndex
 from pymatgen.symmetry.analyzer import SpacegroupAnalyzer
 
 from collections import defaultdict
@@ -210,7 +211,9 @@ class RemoveExistingFilter(AbstractStructureFilter):
         and symmetry (if symprec is given).
 
         Args:
-            existing_structures: List of existing structures to compare with
+            existing_structures: List of existing structures to compare with,
+                or a StructureIndex of existing structures (in which case
+                the matcher of the index is used).
             structure_matcher: Provides a structure matcher to be used for
                 structure comparison.
             symprec: The precision in the symmetry finder algorithm if None (
@@ -224,6 +227,11 @@ class RemoveExistingFilter(AbstractStructureFilter):
             self.structure_matcher = StructureMatcher.from_dict(structure_matcher)
         else:
             self.structure_matcher = structure_matcher
+        if isinstance(existing_structures, StructureIndex):
+            self._index = existing_structures
+            self.structure_matcher = existing_structures.structure_matcher
+        else:
+            self._index = None
 
     def test(self, structure):
 
@@ -231,17 +239,49 @@ class RemoveExistingFilter(AbstractStructureFilter):
             finder = SpacegroupAnalyzer(s, symprec=self.symprec)
             return finder.get_space_group_number()
 
-        for s in self.existing_structures:
-            if self.structure_matcher._comparator.get_hash(structure.composition) ==\
-                    self.structure_matcher._comparator.get_hash(s.composition):
-                if self.symprec is None or \
-                        get_sg(s) == get_sg(structure):
-                    if self.structure_matcher.fit(s, structure):
-                        return False
+        if self.structure_matcher._subset:
+            # StructureIndex does not support allow_subset, so all the
+            # existing structures with the same composition hash are fitted
+            for s in self.existing_structures:
+                if self.structure_matcher._comparator.get_hash(structure.composition) == \
+                        self.structure_matcher._comparator.get_hash(s.composition):
+                    if self.symprec is None or \
+                            get_sg(s) == get_sg(structure):
+                        if self.structure_matcher.fit(s, structure):
+                            return False
+            self.structure_list.append(structure)
+            return True
+
+        if self._index is None:
+            # Index the existing structures on first use, so that only the
+            # few candidates with matching fingerprints are fitted
+            self._index = StructureIndex(
+                structure_matcher=self.structure_matcher)
+            self._index.add_structures(
+                self.existing_structures,
+                data=list(range(len(self.existing_structures))))
+
+        for i in self._index.get_matches(structure):
+            if self.symprec is None:
+                return False
+            if isinstance(self.existing_structures, StructureIndex):
+                s = self._index.get_structure(i)
+            else:
+                s = self.existing_structures[self._index.get_data(i)]
+            if get_sg(s) == get_sg(structure):
+                return False
 
         self.structure_list.append(structure)
         return True
 
+    def __getstate__(self):
+        # The index built by test is not pickled, since it is rebuilt on the
+        # next call of test. A supplied index is pickled with its contents.
+        d = self.__dict__.copy()
+        if d["_index"] is not self.existing_structures:
+            d["_index"] = None
+        return d
+
     def as_dict(self):
         return {"version": __version__, "@module": self.__class__.__module__,
                 "@class": self.__class__.__name__,
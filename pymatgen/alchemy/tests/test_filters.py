@@ -10,12 +10,15 @@ from pymatgen.core.structure import Structure
 from pymatgen.core.periodic_table import Specie
 from pymatgen.alchemy.transmuters import StandardTransmuter
 from pymatgen.analysis.structure_matcher import StructureMatcher
+from pymatgen.analysis.structure_index import StructureIndex
 from pymatgen.util.testing import PymatgenTest
 
 from monty.json import MontyDecoder
 
 import os
+import copy
 import json
+import pickle
 import unittest
 
 test_dir = os.path.join(os.path.dirname(__file__), "..", "..", "..",
@@ -125,6 +128,36 @@ class RemoveExistingFilterTest(unittest.TestCase):
             self._sm.fit(self._struct_list[-1],
                          transmuter.transformed_structures[-1].final_structure))
 
+    def test_pickle(self):
+        fil = RemoveExistingFilter(self._exisiting_structures)
+        self.assertFalse(fil.test(self._struct_list[0]))
+        for f in (pickle.loads(pickle.dumps(fil)), copy.deepcopy(fil)):
+            self.assertFalse(f.test(self._struct_list[0]))
+            self.assertTrue(f.test(self._struct_list[-1]))
+        index = StructureIndex()
+        index.add_structures(self._exisiting_structures)
+        fil = RemoveExistingFilter(index)
+        for f in (pickle.loads(pickle.dumps(fil)), copy.deepcopy(fil)):
+            self.assertIsInstance(f._index, StructureIndex)
+            self.assertIs(f._index, f.existing_structures)
+            self.assertFalse(f.test(self._struct_list[0]))
+            self.assertTrue(f.test(self._struct_list[-1]))
+
+    def test_allow_subset(self):
+        fil = RemoveExistingFilter(
+            self._exisiting_structures,
+            structure_matcher=StructureMatcher(allow_subset=True))
+        self.assertFalse(fil.test(self._struct_list[0]))
+        self.assertTrue(fil.test(self._struct_list[-1]))
+
+    def test_filter_index(self):
+        index = StructureIndex()
+        index.add_structures(self._exisiting_structures)
+        fil = RemoveExistingFilter(index, symprec=1e-3)
+        transmuter = StandardTransmuter.from_structures(self._struct_list)
+        transmuter.apply_filter(fil)
+        self.assertEqual(len(transmuter.transformed_structures), 1)
+
 
 if __name__ == "__main__":
     # import sys;sys.argv = ['', 'Test.testName']
@@ -6,8 +6,15 @@
 import warnings
 import unittest
 import os
-from pymatgen.alchemy.transmuters import CifTransmuter, PoscarTransmuter
-from pymatgen.alchemy.filters import ContainsSpecieFilter
+import tarfile
+from monty.tempfile import ScratchDir
+from pymatgen import SETTINGS
+from pymatgen.alchemy.materials import TransformedStructure
+from pymatgen.alchemy.transmuters import CifTransmuter, PoscarTransmuter, \
+    StreamingTransmuter, batch_write_vasp_input
+from pymatgen.alchemy.filters import ContainsSpecieFilter, \
+    RemoveDuplicatesFilter
+from pymatgen.io.vasp.inputs import Poscar
 from pymatgen.transformations.standard_transformations import \
     SubstitutionTransformation, RemoveSpeciesTransformation, \
     OrderDisorderedStructureTransformation
@@ -98,6 +105,78 @@ class PoscarTransmuterTest(unittest.TestCase):
                          ["world", "universe"])
 
 
+class StreamingTransmuterTest(unittest.TestCase):
+
+    def test_write(self):
+        structure = Poscar.from_file(os.path.join(test_dir, "POSCAR"),
+                                     check_for_POTCAR=False).structure
+        stages = [RemoveSpeciesTransformation('O'),
+                  SubstitutionTransformation(
+                      {"Fe": {"Fe2+": 0.25, "Mn3+": .75}, "P": "P5+"}),
+                  OrderDisorderedStructureTransformation(),
+                  SuperTransformation(
+                      [SubstitutionTransformation({"Fe2+": "Mg2+"}),
+                       SubstitutionTransformation({"Fe2+": "Zn2+"}),
+                       SubstitutionTransformation({"Fe2+": "Be2+"})]),
+                  ContainsSpecieFilter(['Zn2+', 'Be2+', 'Mn4+'],
+                                       strict_compare=True, AND=False)]
+        transmuter = StreamingTransmuter(stages, extend_collection=50,
+                                         chunk_size=2)
+        tstructs = list(transmuter.iter_transform([structure]))
+        self.assertEqual(len(tstructs), 8)
+        for ts in tstructs:
+            self.assertEqual(len(ts), 5)
+            self.assertEqual(ts.history[-1]['@class'], 'ContainsSpecieFilter')
+
+        transmuter = StreamingTransmuter(
+            stages + [RemoveDuplicatesFilter()], extend_collection=50,
+            ncores=2)
+        with ScratchDir("."):
+            self.assertEqual(transmuter.write([structure, structure],
+                                              "out.jsonl.gz"), 2)
+            tstructs = list(StreamingTransmuter.load("out.jsonl.gz"))
+        self.assertEqual(len(tstructs), 2)
+        self.assertEqual(
+            set(ts.final_structure.composition.reduced_formula
+                for ts in tstructs), {"Mn3ZnP4", "Mn3BeP4"})
+
+
+class BatchWriteVaspInputTest(unittest.TestCase):
+
+    def setUp(self):
+        self.psp_dir = SETTINGS.get("PMG_VASP_PSP_DIR")
+        SETTINGS["PMG_VASP_PSP_DIR"] = os.path.abspath(test_dir)
+        warnings.simplefilter("ignore")
+
+    def tearDown(self):
+        SETTINGS["PMG_VASP_PSP_DIR"] = self.psp_dir
+        warnings.simplefilter("default")
+
+    def test_batch_write_vasp_input(self):
+        structure = Poscar.from_file(os.path.join(test_dir, "POSCAR"),
+                                     check_for_POTCAR=False).structure
+        tstructs = [TransformedStructure(structure, []) for i in range(4)]
+        with ScratchDir("."):
+            batch_write_vasp_input(tstructs, output_dir="serial")
+            batch_write_vasp_input(iter(tstructs), output_dir="parallel",
+                                   ncores=2)
+            for i in range(4):
+                for f in ["INCAR", "KPOINTS", "POSCAR", "POTCAR"]:
+                    with open(os.path.join("serial", "Fe4P4O16_%d" % i,
+                                           f)) as f1, \
+                            open(os.path.join("parallel", "Fe4P4O16_%d" % i,
+                                              f)) as f2:
+                        self.assertEqual(f1.read(), f2.read())
+
+            batch_write_vasp_input(tstructs, output_dir="archive",
+                                   archive=True)
+            self.assertEqual(sorted(os.listdir("archive")),
+                             ["Fe4P4O16_%d.tar.gz" % i for i in range(4)])
+            with tarfile.open(os.path.join("archive",
+                                           "Fe4P4O16_0.tar.gz")) as tar:
+                self.assertIn("Fe4P4O16_0/POTCAR", tar.getnames())
+
+
 if __name__ == "__main__":
     # import sys;sys.argv = ['', 'Test.testName']
     unittest.main()
@@ -11,6 +11,9 @@ structures and input files.
 
 It also includes the helper function, batch_write_vasp_input to generate an
 entire directory of vasp input files for running.
+
+For large one-to-many chains, StreamingTransmuter streams the structures
+through the transformations and filters without holding them all in memory.
 """
 
 __author__ = "Shyue Ping Ong, Will Richards"
@@ -20,11 +23,17 @@ __maintainer__ = "Shyue Ping Ong"
 __email__ = "shyuep@gmail.com"
 __date__ = "Mar 4, 2012"
 
+import json
 import os
 import re
+import shutil
+import tarfile
 
 from multiprocessing import Pool
+from monty.io import zopen
+from monty.json import MontyEncoder
 from pymatgen.alchemy.materials import TransformedStructure
+from pymatgen.alchemy.filters import AbstractStructureFilter
 from pymatgen.io.vasp.sets import MPRelaxSet
 
 
@@ -345,13 +354,146 @@ class PoscarTransmuter(StandardTransmuter):
                                   extend_collection=extend_collection)
 
 
+class StreamingTransmuter:
+    """
+    A transmuter which streams structures through a sequence of stages, each
+    of which is a transformation or an AbstractStructureFilter, without
+    keeping all the TransformedStructures in memory.
+
+    The structures flow through the stages in chunks, depth first: the
+    outputs of a chunk are passed on to the next stage before the next chunk
+    is read. Memory use is therefore bounded by the chunk size and the
+    branching of the one-to-many transformations, rather than by the total
+    number of structures. Transformations are applied by a
+    multiprocessing.Pool if ncores is set. Filters are applied in the main
+    process, in order, so that stateful filters such as
+    RemoveDuplicatesFilter are applied incrementally as structures arrive.
+
+    Usage::
+
+        transmuter = StreamingTransmuter(
+            [SubstitutionTransformation({"Fe": {"Fe2+": 0.25, "Mn3+": 0.75}}),
+             OrderDisorderedStructureTransformation(),
+             RemoveDuplicatesFilter()],
+            extend_collection=50, ncores=4)
+        transmuter.write(structures, "transmuted.jsonl.gz")
+        for ts in StreamingTransmuter.load("transmuted.jsonl.gz"):
+            ...
+    """
+
+    def __init__(self, stages, extend_collection=0, ncores=None,
+                 chunk_size=100):
+        """
+        Args:
+            stages ([Transformation/AbstractStructureFilter]): Transformations
+                and filters to apply, in order.
+            extend_collection (int): Whether to use more than one output
+                structure from one-to-many transformations. extend_collection
+                can be an int, which determines the maximum branching for each
+                transformation.
+            ncores (int): Number of cores to use for applying transformations.
+                Uses multiprocessing.Pool. Default is None, which implies
+                serial.
+            chunk_size (int): Number of structures passed to a stage at once.
+        """
+        self.stages = list(stages)
+        self.extend_collection = extend_collection
+        self.ncores = ncores
+        self.chunk_size = chunk_size
+
+    def iter_transform(self, structures):
+        """
+        Lazily applies the stages to structures.
+
+        Args:
+            structures: Iterable of Structures or TransformedStructures. It is
+                only read as the outputs are consumed.
+
+        Yields:
+            TransformedStructures which passed all the filters.
+        """
+        tstructs = (s if isinstance(s, TransformedStructure)
+                    else TransformedStructure(s, []) for s in structures)
+        pool = Pool(self.ncores) if self.ncores and self.ncores > 1 else None
+        try:
+            yield from self._iter_stages(tstructs, self.stages, pool)
+        finally:
+            if pool is not None:
+                pool.terminate()
+
+    def _iter_stages(self, tstructs, stages, pool):
+        if not stages:
+            yield from tstructs
+            return
+        stage = stages[0]
+        for chunk in _get_chunks(tstructs, self.chunk_size):
+            if isinstance(stage, AbstractStructureFilter):
+                out = []
+                for ts in chunk:
+                    if stage.test(ts.final_structure):
+                        ts.append_filter(stage)
+                        out.append(ts)
+            else:
+                inputs = [(ts, stage, self.extend_collection, True)
+                          for ts in chunk]
+                if pool is not None and stage.use_multiprocessing:
+                    chunksize = -(-len(inputs) // self.ncores)
+                    outputs = pool.map(_apply_transformation, inputs,
+                                       chunksize)
+                else:
+                    outputs = map(_apply_transformation, inputs)
+                out = [ts for o in outputs for ts in o]
+            yield from self._iter_stages(out, stages[1:], pool)
+
+    def write(self, structures, filename):
+        """
+        Applies the stages to structures and writes the resulting
+        TransformedStructures to a file as they are produced, one JSON
+        document per line.
+
+        Args:
+            structures: Iterable of Structures or TransformedStructures.
+            filename (str): Output file. It is gzipped if the name ends with
+                .gz.
+
+        Returns:
+            Number of TransformedStructures written.
+        """
+        count = 0
+        with zopen(filename, "wt") as f:
+            for ts in self.iter_transform(structures):
+                f.write(json.dumps(ts.as_dict(), cls=MontyEncoder) + "\n")
+                count += 1
+        return count
+
+    @staticmethod
+    def load(filename):
+        """
+        Reads back the TransformedStructures written by write.
+
+        Args:
+            filename (str): File written by write.
+
+        Yields:
+            TransformedStructures.
+        """
+        with zopen(filename, "rt") as f:
+            for line in f:
+                if line.strip():
+                    yield TransformedStructure.from_dict(json.loads(line))
+
+
 def batch_write_vasp_input(transformed_structures, vasp_input_set=MPRelaxSet,
                            output_dir=".", create_directory=True,
                            subfolder=None,
-                           include_cif=False, **kwargs):
+                           include_cif=False, ncores=None, archive=False,
+                           **kwargs):
     """
     Batch write vasp input for a sequence of transformed structures to
     output_dir, following the format output_dir/{group}/{formula}_{number}.
+    The transformed structures are read in chunks, so a generator (e.g.,
+    StreamingTransmuter.load) can be used to write more directories than fit
+    in memory.
 
     Args:
         transformed_structures: Sequence of TransformedStructures.
@@ -367,22 +509,63 @@ def batch_write_vasp_input(transformed_structures, vasp_input_set=MPRelaxSet,
         include_cif (bool): Boolean indication whether to output a CIF as
             well. CIF files are generally better supported in visualization
             programs.
+        ncores (int): Number of cores to use for writing the directories.
+            Uses multiprocessing.Pool. Default is None, which implies
+            serial.
+        archive (bool): Whether to pack each directory into a gzipped
+            tarball, {formula}_{number}.tar.gz, which replaces the directory.
     """
-    for i, s in enumerate(transformed_structures):
-        formula = re.sub(r"\s+", "", s.final_structure.formula)
-        if subfolder is not None:
-            subdir = subfolder(s)
-            dirname = os.path.join(output_dir, subdir,
-                                   "{}_{}".format(formula, i))
-        else:
-            dirname = os.path.join(output_dir, "{}_{}".format(formula, i))
-        s.write_vasp_input(vasp_input_set, dirname,
-                           create_directory=create_directory, **kwargs)
-        if include_cif:
-            from pymatgen.io.cif import CifWriter
+    def get_inputs():
+        for i, s in enumerate(transformed_structures):
+            formula = re.sub(r"\s+", "", s.final_structure.formula)
+            if subfolder is not None:
+                subdir = subfolder(s)
+                dirname = os.path.join(output_dir, subdir,
+                                       "{}_{}".format(formula, i))
+            else:
+                dirname = os.path.join(output_dir, "{}_{}".format(formula, i))
+            yield (s, dirname, vasp_input_set, create_directory, include_cif,
+                   archive, kwargs)
+
+    if ncores and ncores > 1:
+        p = Pool(ncores)
+        try:
+            for chunk in _get_chunks(get_inputs(), 100 * ncores):
+                p.map(_write_vasp_input, chunk, 10)
+        finally:
+            p.close()
+            p.join()
+    else:
+        for inputs in get_inputs():
+            _write_vasp_input(inputs)
+
+
+def _write_vasp_input(inputs):
+    """
+    Helper method for batch_write_vasp_input. Must not be nested so that it
+    can be pickled.
 
-            writer = CifWriter(s.final_structure)
-            writer.write_file(os.path.join(dirname, "{}.cif".format(formula)))
+    Args:
+        inputs: Tuple containing the transformed structure, the directory,
+            the vasp input set, whether to create the directory, whether to
+            include a cif, whether to archive the directory and the kwargs of
+            the vasp input set.
+    """
+    s, dirname, vasp_input_set, create_directory, include_cif, archive, \
+        kwargs = inputs
+    s.write_vasp_input(vasp_input_set, dirname,
+                       create_directory=create_directory, **kwargs)
+    if include_cif:
+        from pymatgen.io.cif import CifWriter
+
+        formula = re.sub(r"\s+", "", s.final_structure.formula)
+        writer = CifWriter(s.final_structure)
+        writer.write_file(os.path.join(dirname, "{}.cif".format(formula)))
+    if archive:
+        # The POTCARs dominate the size, and gain little from slower levels.
+        with tarfile.open(dirname + ".tar.gz", "w:gz", compresslevel=1) as tar:
+            tar.add(dirname, arcname=os.path.basename(dirname))
+        shutil.rmtree(dirname)
 
 
 def _apply_transformation(inputs):
@@ -406,3 +589,17 @@ def _apply_transformation(inputs):
     if new:
         o.extend(new)
     return o
+
+
+def _get_chunks(iterable, size):
+    """
+    Yields lists of at most size items from iterable.
+    """
+    chunk = []
+    for x in iterable:
+        chunk.append(x)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -83,6 +83,19 @@ class XRDCalculatorTest(PymatgenTest):
         self.assertAlmostEqual(xrd.y[0], 2377745.2296686019)
         self.assertAlmostEqual(xrd.d_hkls[0], 2.2382050944897789)
 
+    def test_get_patterns(self):
+        c = XRDCalculator()
+        structures = [self.get_structure("CsCl"), self.get_structure("LiFePO4"),
+                      self.get_structure("Graphite")]
+        for n_jobs in [1, 2, -1]:
+            patterns = c.get_patterns(structures, n_jobs=n_jobs)
+            self.assertEqual(len(patterns), 3)
+            for s, xrd in zip(structures, patterns):
+                ref = c.get_pattern(s)
+                self.assertArrayAlmostEqual(xrd.x, ref.x)
+                self.assertArrayAlmostEqual(xrd.y, ref.y)
+                self.assertEqual(xrd.hkls, ref.hkls)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -5,7 +5,9 @@
 
 import os
 import json
-from math import sin, cos, asin, pi, degrees, radians
+from functools import partial
+from math import sin, pi, radians
+from multiprocessing import Pool
 
 import numpy as np
 
@@ -117,6 +119,9 @@ class XRDCalculator(AbstractDiffractionPatternCalculator):
     # Tuple of available radiation keywords.
     AVAILABLE_RADIATION = tuple(WAVELENGTHS.keys())
 
+    # Maximum number of (hkl, site) structure factor terms evaluated at once.
+    BLOCK_SIZE = 1000000
+
     def __init__(self, wavelength="CuKa", symprec=0, debye_waller_factors=None):
         """
         Initializes the XRD calculator with a given radiation.
@@ -210,72 +215,45 @@ class XRDCalculator(AbstractDiffractionPatternCalculator):
         fcoords = np.array(fcoords)
         occus = np.array(occus)
         dwfactors = np.array(dwfactors)
+
+        recip_pts = sorted(recip_pts,
+                           key=lambda i: (i[1], -i[0][0], -i[0][1], -i[0][2]))
+        # Force miller indices to be integers.
+        hkls = np.array([np.round(pt[0]) for pt in recip_pts
+                         if pt[1] != 0], dtype=int).reshape(-1, 3)
+        g_hkls = np.array([pt[1] for pt in recip_pts if pt[1] != 0])
+        if len(g_hkls) == 0:
+            raise ValueError("No reciprocal lattice points lie within the "
+                             "given two theta range.")
+
+        i_hkls = self._get_intensities(hkls, g_hkls, zs, coeffs, fcoords,
+                                       occus, dwfactors)
+
+        # Bragg condition
+        thetas = np.arcsin(wavelength * g_hkls / 2)
+        # Lorentz polarization correction for hkl
+        lorentz_factors = (1 + np.cos(2 * thetas) ** 2) / \
+            (np.sin(thetas) ** 2 * np.cos(thetas))
+        two_thetas = np.degrees(2 * thetas)
+
+        # Group peaks with the same two theta. As the reciprocal points are
+        # sorted by |g_hkl|, a peak can only coincide with the last peak.
         peaks = {}
-        two_thetas = []
-
-        for hkl, g_hkl, ind, _ in sorted(
-                recip_pts, key=lambda i: (i[1], -i[0][0], -i[0][1], -i[0][2])):
-            # Force miller indices to be integers.
-            hkl = [int(round(i)) for i in hkl]
-            if g_hkl != 0:
-
-                d_hkl = 1 / g_hkl
-
-                # Bragg condition
-                theta = asin(wavelength * g_hkl / 2)
-
-                # s = sin(theta) / wavelength = 1 / 2d = |ghkl| / 2 (d =
-                # 1/|ghkl|)
-                s = g_hkl / 2
-
-                # Store s^2 since we are using it a few times.
-                s2 = s ** 2
-
-                # Vectorized computation of g.r for all fractional coords and
-                # hkl.
-                g_dot_r = np.dot(fcoords, np.transpose([hkl])).T[0]
-
-                # Highly vectorized computation of atomic scattering factors.
-                # Equivalent non-vectorized code is::
-                #
-                #   for site in structure:
-                #      el = site.specie
-                #      coeff = ATOMIC_SCATTERING_PARAMS[el.symbol]
-                #      fs = el.Z - 41.78214 * s2 * sum(
-                #          [d[0] * exp(-d[1] * s2) for d in coeff])
-                fs = zs - 41.78214 * s2 * np.sum(
-                    coeffs[:, :, 0] * np.exp(-coeffs[:, :, 1] * s2), axis=1)
-
-                dw_correction = np.exp(-dwfactors * s2)
-
-                # Structure factor = sum of atomic scattering factors (with
-                # position factor exp(2j * pi * g.r and occupancies).
-                # Vectorized computation.
-                f_hkl = np.sum(fs * occus * np.exp(2j * pi * g_dot_r)
-                               * dw_correction)
-
-                # Lorentz polarization correction for hkl
-                lorentz_factor = (1 + cos(2 * theta) ** 2) / \
-                    (sin(theta) ** 2 * cos(theta))
-
-                # Intensity for hkl is modulus square of structure factor.
-                i_hkl = (f_hkl * f_hkl.conjugate()).real
-
-                two_theta = degrees(2 * theta)
-
-                if is_hex:
-                    # Use Miller-Bravais indices for hexagonal lattices.
-                    hkl = (hkl[0], hkl[1], - hkl[0] - hkl[1], hkl[2])
-                # Deal with floating point precision issues.
-                ind = np.where(np.abs(np.subtract(two_thetas, two_theta)) <
-                               AbstractDiffractionPatternCalculator.TWO_THETA_TOL)
-                if len(ind[0]) > 0:
-                    peaks[two_thetas[ind[0][0]]][0] += i_hkl * lorentz_factor
-                    peaks[two_thetas[ind[0][0]]][1].append(tuple(hkl))
-                else:
-                    peaks[two_theta] = [i_hkl * lorentz_factor, [tuple(hkl)],
-                                        d_hkl]
-                    two_thetas.append(two_theta)
+        last_two_theta = None
+        for hkl, g_hkl, i_hkl, lorentz_factor, two_theta in zip(
+                hkls.tolist(), g_hkls, i_hkls, lorentz_factors, two_thetas):
+            if is_hex:
+                # Use Miller-Bravais indices for hexagonal lattices.
+                hkl = (hkl[0], hkl[1], - hkl[0] - hkl[1], hkl[2])
+            # Deal with floating point precision issues.
+            if last_two_theta is not None and abs(two_theta - last_two_theta) < \
+                    AbstractDiffractionPatternCalculator.TWO_THETA_TOL:
+                peaks[last_two_theta][0] += i_hkl * lorentz_factor
+                peaks[last_two_theta][1].append(tuple(hkl))
+            else:
+                peaks[two_theta] = [i_hkl * lorentz_factor, [tuple(hkl)],
+                                    1 / g_hkl]
+                last_two_theta = two_theta
 
         # Scale intensities so that the max intensity is 100.
         max_intensity = max([v[0] for v in peaks.values()])
@@ -296,3 +274,96 @@ class XRDCalculator(AbstractDiffractionPatternCalculator):
         if scaled:
             xrd.normalize(mode="max", value=100)
         return xrd
+
+    def _get_intensities(self, hkls, g_hkls, zs, coeffs, fcoords, occus,
+                         dwfactors):
+        """
+        Computes the intensities (modulus square of the structure factor) of
+        all reflections at once. The structure factors are evaluated as
+        (hkl x sites) matrices, in blocks of at most BLOCK_SIZE elements to
+        bound memory use.
+
+        Since the atomic scattering factors are real, Friedel's law holds,
+        i.e., I(hkl) = I(-h-k-l). Structure factors are therefore only
+        computed for one reflection of each Friedel pair.
+
+        Args:
+            hkls (Mx3 array): Miller indices.
+            g_hkls (M array): Lengths of the reciprocal lattice vectors.
+            zs, coeffs, fcoords, occus, dwfactors: Flattened arrays of atomic
+                numbers, scattering coefficients, fractional coordinates,
+                occupancies and Debye-Waller factors of all species.
+
+        Returns:
+            (M array) Intensities.
+        """
+        # Canonical member of each Friedel pair has its first non-zero index
+        # positive.
+        first_nonzero = hkls[np.arange(len(hkls)),
+                             np.argmax(hkls != 0, axis=1)]
+        canonical = hkls * np.sign(first_nonzero)[:, None]
+        unique_hkls, unique_inds, inverse = np.unique(
+            canonical, axis=0, return_index=True, return_inverse=True)
+        inverse = inverse.ravel()
+
+        # s = sin(theta) / wavelength = 1 / 2d = |ghkl| / 2 (d =
+        # 1/|ghkl|). Store s^2 since we are using it a few times.
+        s2s = (g_hkls[unique_inds] / 2) ** 2
+        i_hkls = np.zeros(len(unique_hkls))
+        block = max(1, self.BLOCK_SIZE // max(len(zs), 1))
+        for i in range(0, len(unique_hkls), block):
+            s2 = s2s[i:i + block, None]
+            # Vectorized computation of g.r for all fractional coords and
+            # hkl.
+            g_dot_r = np.dot(unique_hkls[i:i + block], fcoords.T)
+
+            # Highly vectorized computation of atomic scattering factors.
+            # Equivalent non-vectorized code is::
+            #
+            #   for site in structure:
+            #      el = site.specie
+            #      coeff = ATOMIC_SCATTERING_PARAMS[el.symbol]
+            #      fs = el.Z - 41.78214 * s2 * sum(
+            #          [d[0] * exp(-d[1] * s2) for d in coeff])
+            fs = zs - 41.78214 * s2 * np.sum(
+                coeffs[None, :, :, 0] *
+                np.exp(-coeffs[None, :, :, 1] * s2[:, :, None]), axis=2)
+
+            dw_correction = np.exp(-dwfactors * s2)
+
+            # Structure factor = sum of atomic scattering factors (with
+            # position factor exp(2j * pi * g.r and occupancies).
+            f_hkl = np.sum(fs * occus * np.exp(2j * pi * g_dot_r) *
+                           dw_correction, axis=1)
+
+            # Intensity for hkl is modulus square of structure factor.
+            i_hkls[i:i + block] = (f_hkl * f_hkl.conjugate()).real
+        return i_hkls[inverse]
+
+    def get_patterns(self, structures, n_jobs=1, scaled=True,
+                     two_theta_range=(0, 90)):
+        """
+        Calculates the diffraction patterns for many structures, e.g., for
+        screening a set of candidate structures against an experimental
+        pattern.
+
+        Args:
+            structures ([Structure]): Input structures.
+            n_jobs (int): Number of processes to use. Defaults to 1, i.e.,
+                the patterns are computed serially. -1 uses all the cores.
+            scaled (bool): Whether to return scaled intensities. See
+                get_pattern.
+            two_theta_range ([float of length 2]): Tuple for range of
+                two_thetas to calculate in degrees. See get_pattern.
+
+        Returns:
+            [XRDPattern] in the same order as the input structures.
+        """
+        func = partial(self.get_pattern, scaled=scaled,
+                       two_theta_range=two_theta_range)
+        if n_jobs == -1:
+            n_jobs = os.cpu_count() or 1
+        if n_jobs == 1:
+            return [func(s) for s in structures]
+        with Pool(n_jobs) as p:
+            return p.map(func, structures)
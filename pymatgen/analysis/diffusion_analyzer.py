@@ -2,10 +2,13 @@
 # Copyright (c) Pymatgen Development Team.
 # Distributed under the terms of the MIT License.
 
+import itertools
 import numpy as np
 import warnings
 import scipy.constants as const
+import xml.etree.cElementTree as ET
 
+from monty.io import zopen
 from monty.json import MSONable
 
 from pymatgen.analysis.structure_matcher import StructureMatcher, \
@@ -164,7 +167,8 @@ class DiffusionAnalyzer(MSONable):
                    of data points for each time origin, subject to a
                    minimum # of observations given by min_obs, and then
                    weights the observations based on the variance
-                   accordingly. This is the default.
+                   accordingly. The MSD is computed for all time steps at
+                   once with FFTs. This is the default.
                 ii. "constant", in which each timestep is averaged over
                     the number of time_steps given by min_steps.
                 iii. None / False / any other false-like quantity. No
@@ -237,36 +241,48 @@ class DiffusionAnalyzer(MSONable):
 
             dt = timesteps * self.time_step * self.step_skip
 
-            # calculate the smoothed msd values
-            msd = np.zeros_like(dt, dtype=np.double)
-            sq_disp_ions = np.zeros((len(dc), len(dt)), dtype=np.double)
-            msd_components = np.zeros(dt.shape + (3,))
-
-            # calculate mean square charge displacement
-            mscd = np.zeros_like(msd, dtype=np.double)
-
-            for i, n in enumerate(timesteps):
-                if not smoothed:
-                    dx = dc[:, i:i + 1, :]
-                    dcomponents = dc[:, i:i + 1, :]
-                elif smoothed == "constant":
-                    dx = dc[:, i:i + avg_nsteps, :] - dc[:, 0:avg_nsteps, :]
-                    dcomponents = dc[:, i:i + avg_nsteps, :] - dc[:, 0:avg_nsteps, :]
-                else:
-                    dx = dc[:, n:, :] - dc[:, :-n, :]
-                    dcomponents = dc[:, n:, :] - dc[:, :-n, :]
-
-                # Get msd
-                sq_disp = dx ** 2
-                sq_disp_ions[:, i] = np.average(np.sum(sq_disp, axis=2), axis=1)
-                msd[i] = np.average(sq_disp_ions[:, i][indices])
-
-                msd_components[i] = np.average(dcomponents[indices] ** 2,
-                                               axis=(0, 1))
+            if smoothed == "max":
+                # The square displacements of each ion along each axis are
+                # averaged over all time origins for all lag times at once
+                # with FFTs, in O(nsteps log nsteps).
+                sq_disp_axes = _get_msd_fft(
+                    np.transpose(dc, (0, 2, 1)))[:, :, timesteps]
+                sq_disp_ions = np.sum(sq_disp_axes, axis=1)
+                msd = np.average(sq_disp_ions[indices], axis=0)
+                msd_components = np.average(sq_disp_axes[indices], axis=0).T
 
                 # Get mscd
-                sq_chg_disp = np.sum(dx[indices, :, :], axis=0) ** 2
-                mscd[i] = np.average(np.sum(sq_chg_disp, axis=1), axis=0) / len(indices)
+                chg_disp = np.sum(dc[indices], axis=0).T
+                mscd = np.sum(_get_msd_fft(chg_disp)[:, timesteps],
+                              axis=0) / len(indices)
+            else:
+                # calculate the smoothed msd values
+                msd = np.zeros_like(dt, dtype=np.double)
+                sq_disp_ions = np.zeros((len(dc), len(dt)), dtype=np.double)
+                msd_components = np.zeros(dt.shape + (3,))
+
+                # calculate mean square charge displacement
+                mscd = np.zeros_like(msd, dtype=np.double)
+
+                for i, n in enumerate(timesteps):
+                    if not smoothed:
+                        dx = dc[:, i:i + 1, :]
+                        dcomponents = dc[:, i:i + 1, :]
+                    else:
+                        dx = dc[:, i:i + avg_nsteps, :] - dc[:, 0:avg_nsteps, :]
+                        dcomponents = dc[:, i:i + avg_nsteps, :] - dc[:, 0:avg_nsteps, :]
+
+                    # Get msd
+                    sq_disp = dx ** 2
+                    sq_disp_ions[:, i] = np.average(np.sum(sq_disp, axis=2), axis=1)
+                    msd[i] = np.average(sq_disp_ions[:, i][indices])
+
+                    msd_components[i] = np.average(dcomponents[indices] ** 2,
+                                                   axis=(0, 1))
+
+                    # Get mscd
+                    sq_chg_disp = np.sum(dx[indices, :, :], axis=0) ** 2
+                    mscd[i] = np.average(np.sum(sq_chg_disp, axis=1), axis=0) / len(indices)
 
             def weighted_lstsq(a, b):
                 if smoothed == "max":
@@ -342,6 +358,51 @@ class DiffusionAnalyzer(MSONable):
             self.indices = indices
             self.framework_indices = framework_indices
 
+    def get_block_averaged_diffusivity(self, nblocks=5):
+        """
+        Estimates the diffusivity and its error bar by block averaging. The
+        run is split into nblocks consecutive blocks of equal length, which
+        are analyzed independently with the same settings as this analyzer.
+        Unlike diffusivity_std_dev, this error bar accounts for the
+        correlations between the MSDs at different time steps.
+
+        Args:
+            nblocks (int): Number of blocks. Each block has to be long enough
+                to be analyzed on its own.
+
+        Returns:
+            (diffusivity, std_err): Average of the diffusivities of the
+            blocks and its standard error, in cm^2 / s.
+        """
+        diffusivities = [d.diffusivity for d in self._get_blocks(nblocks)]
+        return np.mean(diffusivities), \
+            np.std(diffusivities, ddof=1) / np.sqrt(nblocks)
+
+    def _get_blocks(self, nblocks):
+        """
+        Splits the run into nblocks consecutive blocks of equal length, and
+        returns a DiffusionAnalyzer for each of them.
+        """
+        nsteps = self.disp.shape[1]
+        block_size = nsteps // nblocks
+        if nblocks < 2 or block_size < 2:
+            raise ValueError("Block averaging needs at least 2 blocks of 2 "
+                             "time steps.")
+        blocks = []
+        for i in range(nblocks):
+            block = slice(i * block_size, (i + 1) * block_size)
+            disp = self.disp[:, block] - self.disp[:, block.start][:, None]
+            # For NPT runs, the lattices start with the initial lattice, so
+            # there is one more lattice than displacement steps.
+            lattices = self.lattices if len(self.lattices) == 1 \
+                else self.lattices[block.start:block.stop + 1]
+            blocks.append(DiffusionAnalyzer(
+                self.structure, disp, self.specie, self.temperature,
+                self.time_step, self.step_skip, smoothed=self.smoothed,
+                min_obs=self.min_obs, avg_nsteps=self.avg_nsteps,
+                lattices=lattices))
+        return blocks
+
     def get_drift_corrected_structures(self, start=None, stop=None, step=None):
         """
         Returns an iterator for the drift-corrected structures. Use of
@@ -594,20 +655,7 @@ class DiffusionAnalyzer(MSONable):
             p.insert(0, p[0])
             l.insert(0, l[0])
 
-        p = np.concatenate(p, axis=1)
-        dp = p[:, 1:] - p[:, :-1]
-        dp = dp - np.round(dp)
-        f_disp = np.cumsum(dp, axis=1)
-        c_disp = []
-        for i in f_disp:
-            c_disp.append([np.dot(d, m) for d, m in zip(i, l[1:])])
-        disp = np.array(c_disp)
-
-        # If is NVT-AIMD, clear lattice data.
-        if np.array_equal(l[0], l[-1]):
-            l = np.array([l[0]])
-        else:
-            l = np.array(l)
+        disp, l = _get_displacements(p, l)
         if initial_disp is not None:
             disp += initial_disp[:, None, :]
 
@@ -664,8 +712,9 @@ class DiffusionAnalyzer(MSONable):
         s = get_structures(vaspruns)
         step_skip, temperature, time_step = next(s)
 
+        # The structures are streamed so that only their coordinates are kept.
         return cls.from_structures(
-            structures=list(s), specie=specie, temperature=temperature,
+            structures=s, specie=specie, temperature=temperature,
             time_step=time_step, step_skip=step_skip,
             initial_disp=initial_disp, initial_structure=initial_structure,
             **kwargs)
@@ -708,30 +757,114 @@ class DiffusionAnalyzer(MSONable):
             \\*\\*kwargs: kwargs supported by the :class:`DiffusionAnalyzer`_.
                 Examples include smoothed, min_obs, avg_nsteps.
         """
+        pool = None
         if ncores is not None and len(filepaths) > 1:
             import multiprocessing
-            p = multiprocessing.Pool(ncores)
-            vaspruns = p.imap(_get_vasprun,
-                              [(fp, step_skip) for fp in filepaths])
-            analyzer = cls.from_vaspruns(
-                vaspruns, specie=specie, initial_disp=initial_disp,
-                initial_structure=initial_structure, **kwargs)
-            p.close()
-            p.join()
-            return analyzer
+            pool = multiprocessing.Pool(ncores)
+            runs = pool.imap(_read_vasprun,
+                             [(fp, step_skip, 0) for fp in filepaths])
         else:
-            def vr(filepaths):
+            def get_runs(filepaths):
                 offset = 0
-                for p in filepaths:
-                    v = Vasprun(p, ionic_step_offset=offset,
-                                ionic_step_skip=step_skip)
-                    yield v
+                for fp in filepaths:
+                    run = _read_vasprun((fp, step_skip, offset))
+                    yield run
                     # Recompute offset.
-                    offset = (-(v.nionic_steps - offset)) % step_skip
+                    offset = (-(run["nionic_steps"] - offset)) % step_skip
 
-            return cls.from_vaspruns(
-                vr(filepaths), specie=specie, initial_disp=initial_disp,
-                initial_structure=initial_structure, **kwargs)
+            runs = get_runs(filepaths)
+
+        # Only the lattices and fractional coordinates of the sampled ionic
+        # steps are kept, instead of a Vasprun for each file.
+        p, l = [], []
+        try:
+            for i, run in enumerate(runs):
+                if i == 0:
+                    structure = Structure(run["lattices"][0], run["species"],
+                                          run["frac_coords"][0][:, 0])
+                    temperature = run["temperature"]
+                    time_step = run["time_step"]
+                    final_coords = run["initial_coords"]
+                # check that the runs are continuous
+                fdist = pbc_diff(run["initial_coords"], final_coords)
+                if np.any(fdist > 0.001):
+                    raise ValueError('initial and final structures do not '
+                                     'match.')
+                final_coords = run["final_coords"]
+                p.extend(run["frac_coords"])
+                l.extend(run["lattices"])
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        if initial_structure is not None:
+            p.insert(0, np.array(initial_structure.frac_coords)[:, None])
+            l.insert(0, initial_structure.lattice.matrix)
+        else:
+            p.insert(0, p[0])
+            l.insert(0, l[0])
+
+        disp, l = _get_displacements(p, l)
+        if initial_disp is not None:
+            disp += initial_disp[:, None, :]
+
+        return cls(structure, disp, specie, temperature, time_step,
+                   step_skip=step_skip, lattices=l, **kwargs)
+
+    @classmethod
+    def from_xdatcars(cls, filepaths, specie, temperature, time_step,
+                      step_skip=1, initial_disp=None, initial_structure=None,
+                      **kwargs):
+        """
+        Convenient constructor that takes in a list of XDATCAR paths to
+        perform diffusion analysis. The frames are streamed from the files, so
+        that only their coordinates are kept in memory.
+
+        Args:
+            filepaths ([str]): List of paths to XDATCAR files of runs (must be
+                ordered in sequence of MD simulation).
+            specie (Element/Specie): Specie to calculate diffusivity for as a
+                String. E.g., "Li".
+            temperature (float): Temperature of the diffusion run in Kelvin.
+            time_step (int): Time step between measurements.
+            step_skip (int): Sampling frequency of the displacements (
+                time_step is multiplied by this number to get the real time
+                between measurements), i.e., NBLOCK for XDATCARs.
+            initial_disp (np.ndarray): Sometimes, you need to iteratively
+                compute estimates of the diffusivity. This supplies an
+                initial displacement that will be added on to the initial
+                displacements. Note that this makes sense only when
+                smoothed=False.
+            initial_structure (Structure): Like initial_disp, this is used
+                for iterative computations of estimates of the diffusivity. You
+                typically need to supply both variables. This stipulates the
+                initial structure from which the current set of displacements
+                are computed.
+            \\*\\*kwargs: kwargs supported by the :class:`DiffusionAnalyzer`_.
+                Examples include smoothed, min_obs, avg_nsteps.
+        """
+        p, l = [], []
+        structure = None
+        for fp in filepaths:
+            for species, lattice, frac_coords in _iter_xdatcar(fp):
+                if structure is None:
+                    structure = Structure(lattice, species, frac_coords)
+                p.append(frac_coords[:, None])
+                l.append(lattice)
+        if initial_structure is not None:
+            p.insert(0, np.array(initial_structure.frac_coords)[:, None])
+            l.insert(0, initial_structure.lattice.matrix)
+        else:
+            p.insert(0, p[0])
+            l.insert(0, l[0])
+
+        disp, l = _get_displacements(p, l)
+        if initial_disp is not None:
+            disp += initial_disp[:, None, :]
+
+        return cls(structure, disp, specie, temperature, time_step,
+                   step_skip=step_skip, lattices=l, **kwargs)
 
     def as_dict(self):
         return {
@@ -791,12 +924,153 @@ def get_conversion_factor(structure, species, temperature):
     return 1000 * n / (vol * const.N_A) * z ** 2 * (const.N_A * const.e) ** 2 / (const.R * temperature)
 
 
-def _get_vasprun(args):
+def _get_msd_fft(x):
+    """
+    Mean square displacement of 1D trajectories for all lag times, averaged
+    over all time origins. The autocorrelation term is computed with FFTs
+    (Wiener-Khinchin theorem), which takes O(nsteps log nsteps) instead of
+    O(nsteps^2) for a direct computation.
+
+    Args:
+        x (np.ndarray): Positions with shape [..., nsteps].
+
+    Returns:
+        Array with the same shape as x, whose [..., n] element is the
+        average of (x[..., t + n] - x[..., t]) ** 2 over t.
+    """
+    nsteps = x.shape[-1]
+    f = np.fft.rfft(x, n=2 * nsteps)
+    autocorr = np.fft.irfft(f * np.conjugate(f), n=2 * nsteps)[..., :nsteps]
+    # Sums of x[t] ** 2 over t < nsteps - n and over t >= n.
+    cumsq = np.cumsum(x ** 2, axis=-1)
+    lags = np.arange(nsteps)
+    sq = cumsq[..., nsteps - 1 - lags] + cumsq[..., -1:]
+    sq[..., 1:] -= cumsq[..., :-1]
+    return (sq - 2 * autocorr) / (nsteps - lags)
+
+
+def _get_displacements(p, l):
     """
-    Internal method to support multiprocessing.
+    Computes the cartesian displacements of the sites of a trajectory.
+
+    Args:
+        p ([np.ndarray]): Fractional coordinates of the sites at each step,
+            as [site, 1, axis] arrays, starting with the initial positions.
+        l ([np.ndarray]): Lattice matrix at each step.
+
+    Returns:
+        (displacements, lattices): Numpy arrays of the displacements with
+        shape [site, time step, axis] and of the lattices, which only
+        contains the first lattice for NVT runs.
+    """
+    p = np.concatenate(p, axis=1)
+    dp = p[:, 1:] - p[:, :-1]
+    dp = dp - np.round(dp)
+    f_disp = np.cumsum(dp, axis=1)
+    disp = np.einsum("ijk,jkl->ijl", f_disp, np.array(l[1:]))
+
+    # If is NVT-AIMD, clear lattice data.
+    if np.array_equal(l[0], l[-1]):
+        l = np.array([l[0]])
+    else:
+        l = np.array(l)
+    return disp, l
+
+
+def _iter_xdatcar(filename):
+    """
+    Yields the species, lattice matrix and fractional coordinates of each
+    frame of a VASP 5 XDATCAR, without creating a Structure for each of them.
+    Variable cell XDATCARs, in which each frame has its own header, are
+    supported. An incomplete last frame is ignored.
+    """
+    with zopen(filename, "rt") as f:
+        lines = iter(f)
+        header = list(itertools.islice(lines, 7))
+        title = header[0].strip()
+        while len(header) == 7:
+            scale = float(header[1])
+            lattice = np.array([l.split() for l in header[2:5]], dtype=float)
+            if scale < 0:
+                scale = (-scale / abs(np.linalg.det(lattice))) ** (1 / 3)
+            lattice *= scale
+            species = []
+            for sp, n in zip(header[5].split(), header[6].split()):
+                species.extend([sp] * int(n))
+            header = []
+            for l in lines:
+                if "configuration" in l or not l.strip():
+                    coords = list(itertools.islice(lines, len(species)))
+                    if len(coords) < len(species):
+                        return
+                    yield species, lattice, np.array(
+                        [c.split()[:3] for c in coords], dtype=float)
+                elif title and l.strip() == title:
+                    header = [l] + list(itertools.islice(lines, 6))
+                    break
+
+
+def _read_vasprun(args):
+    """
+    Reads the data needed for a diffusion analysis from a vasprun.xml,
+    without creating a Vasprun or a Structure for each ionic step. The ionic
+    steps are streamed with Vasprun.iter_ionic_steps, so that only the
+    lattice matrices and fractional coordinates of every step_skip-th ionic
+    step, starting at the ionic step offset, are held in memory. Also used
+    to support multiprocessing.
+
+    Args:
+        args: (filename, step_skip, offset)
+
+    Returns:
+        Dict with the temperature, time_step, species, lattices and
+        frac_coords (with shape [nsites, 1, 3]) of the sampled ionic steps,
+        the initial_coords and final_coords of the run and its total number
+        of ionic steps (nionic_steps).
     """
-    return Vasprun(args[0], ionic_step_skip=args[1],
-                   parse_dos=False, parse_eigen=False)
+    filename, step_skip, offset = args
+
+    def get_coords(elem):
+        return np.array([v.text.split() for v in
+                         elem.find("varray[@name='positions']")], dtype=float)
+
+    run = {"species": None, "lattices": [], "frac_coords": []}
+    # Only the header, which ends with the initial positions, is parsed here.
+    with zopen(filename, "rt") as f:
+        for _, elem in ET.iterparse(f):
+            if elem.tag == "parameters":
+                run["temperature"] = float(
+                    elem.find(".//i[@name='TEEND']").text)
+                run["time_step"] = float(elem.find(".//i[@name='POTIM']").text)
+            elif elem.tag == "structure" and \
+                    elem.attrib.get("name") == "initialpos":
+                run["initial_coords"] = get_coords(elem)
+                break
+
+    for step in Vasprun.iter_ionic_steps(
+            filename, fields=["species", "lattice", "frac_coords"],
+            ionic_step_skip=step_skip, ionic_step_offset=offset):
+        run["species"] = step["species"]
+        run["lattices"].append(step["lattice"])
+        run["frac_coords"].append(step["frac_coords"][:, None])
+
+    # The ionic steps are counted and the final positions, which follow the
+    # last ionic step, are read from the text to avoid another xml parse.
+    nionic_steps = 0
+    with zopen(filename, "rt") as f:
+        lines = iter(f)
+        for line in lines:
+            if "<calculation>" in line:
+                nionic_steps += 1
+            elif 'name="finalpos"' in line:
+                final = [line]
+                for line in lines:
+                    final.append(line)
+                    if "</structure>" in line:
+                        break
+                run["final_coords"] = get_coords(ET.fromstring("".join(final)))
+    run["nionic_steps"] = nionic_steps
+    return run
 
 
 def fit_arrhenius(temps, diffusivities):
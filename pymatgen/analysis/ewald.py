@@ -5,9 +5,11 @@
 
 from math import pi, sqrt, log
 from datetime import datetime
-from copy import deepcopy, copy
+from copy import copy
 from warnings import warn
 import bisect
+import logging
+import multiprocessing
 
 import numpy as np
 from scipy.special import erfc, comb
@@ -26,6 +28,8 @@ __email__ = "shyuep@gmail.com"
 __status__ = "Production"
 __date__ = "Aug 1 2012"
 
+logger = logging.getLogger(__name__)
+
 
 class EwaldSummation:
     """
@@ -112,19 +116,133 @@ class EwaldSummation:
             self._forces = recip_forces + real_point_forces
 
         # Compute the correction for a charged cell
-        self._charged_cell_energy = - EwaldSummation.CONV_FACT / 2 * np.pi / \
-            structure.volume / self._eta * structure.charge ** 2
+        self._total_charge = structure.charge
+        self._charged_cell_energy = self._get_charged_cell_energy(
+            self._total_charge)
 
     def compute_partial_energy(self, removed_indices):
         """
         Gives total ewald energy for certain sites being removed, i.e. zeroed
         out.
         """
-        total_energy_matrix = self.total_energy_matrix.copy()
-        for i in removed_indices:
-            total_energy_matrix[i, :] = 0
-            total_energy_matrix[:, i] = 0
-        return sum(sum(total_energy_matrix))
+        total_energy_matrix = self.total_energy_matrix
+        removed_indices = list(removed_indices)
+        total_energy_matrix[removed_indices, :] = 0
+        total_energy_matrix[:, removed_indices] = 0
+        return np.sum(total_energy_matrix)
+
+    def compute_energy_change(self, indices, charges):
+        """
+        Gives the change in total ewald energy if the charges of a few sites
+        are changed, e.g., when the occupancy of a site changes in an
+        ordering enumeration. Only the rows of the energy matrices involving
+        the changed sites are computed, i.e., the cost is O(N) per changed
+        site instead of O(N^2) for a new EwaldSummation. This
+        EwaldSummation is not modified. Use update_charges to apply the
+        change.
+
+        Args:
+            indices ([int]): Indices of sites with changed charges.
+            charges ([float]): New charges of these sites. A charge of 0 is
+                equivalent to removing the site.
+
+        Returns:
+            Change in total energy in eV.
+        """
+        indices = list(indices)
+        qs = np.array(self._oxi_states, dtype=float)
+        dq = np.array(charges, dtype=float) - qs[indices]
+        real_rows, recip_rows, recip_cols = self._calc_unit_rows(indices)
+        rows = real_rows + recip_rows
+        cols = real_rows + recip_cols
+        delta = np.dot(dq, np.dot(rows, qs)) + np.dot(dq, np.dot(cols, qs)) + \
+            np.dot(dq, np.dot(rows[:, indices], dq))
+        new_qs = qs[indices] + dq
+        delta -= np.sum(new_qs ** 2 - qs[indices] ** 2) * \
+            sqrt(self._eta / pi) * EwaldSummation.CONV_FACT
+        delta += self._get_charged_cell_energy(self._total_charge + np.sum(dq)) - \
+            self._charged_cell_energy
+        return delta
+
+    def update_charges(self, indices, charges):
+        """
+        Changes the charges of a few sites and updates the energy matrices
+        in place. Only the rows and columns of the changed sites are
+        recomputed, i.e., the cost is O(N) per changed site instead of O(N^2)
+        for a new EwaldSummation. Note that the structure stored in this
+        EwaldSummation is not modified, and that forces cannot be updated
+        incrementally.
+
+        Args:
+            indices ([int]): Indices of sites with changed charges.
+            charges ([float]): New charges of these sites. A charge of 0 is
+                equivalent to removing the site.
+        """
+        if self._compute_forces:
+            raise ValueError("Charges cannot be updated incrementally when "
+                             "forces are computed.")
+        indices = list(indices)
+        real_rows, recip_rows, recip_cols = self._calc_unit_rows(indices)
+        qs = np.array(self._oxi_states, dtype=float)
+        self._total_charge += np.sum(charges) - np.sum(qs[indices])
+        qs[indices] = charges
+        new_qs = qs[indices][:, None]
+        self._real[indices, :] = real_rows * new_qs * qs
+        self._real[:, indices] = (real_rows * new_qs * qs).T
+        self._recip[indices, :] = recip_rows * new_qs * qs
+        self._recip[:, indices] = (recip_cols * new_qs * qs).T
+        self._point[indices] = - qs[indices] ** 2 * sqrt(self._eta / pi) * \
+            EwaldSummation.CONV_FACT
+        self._oxi_states = qs.tolist()
+        self._charged = abs(self._total_charge) > 1e-8
+        self._charged_cell_energy = self._get_charged_cell_energy(
+            self._total_charge)
+
+    def _get_charged_cell_energy(self, charge):
+        """
+        Energy correction for a cell with a net charge.
+        """
+        return - EwaldSummation.CONV_FACT / 2 * np.pi / self._vol / \
+            self._eta * charge ** 2
+
+    def _calc_unit_rows(self, indices):
+        """
+        Computes the rows of the real and reciprocal space energy matrices
+        for unit charges on the sites in indices and the actual charges on
+        all other sites replaced by unit charges, i.e., E_ij / (q_i * q_j).
+
+        Returns:
+            (real_rows, recip_rows, recip_cols) as len(indices) x N arrays.
+            The real space matrix is symmetric. The reciprocal space matrix
+            contains a small antisymmetric part, so both rows and columns
+            are returned.
+        """
+        numsites = self._s.num_sites
+        fcoords = self._s.frac_coords
+        real_rows = np.zeros((len(indices), numsites))
+        for n, i in enumerate(indices):
+            _, rij, js, _ = self._s.lattice.get_points_in_sphere(
+                fcoords, self._coords[i], self._rmax, zip_results=False)
+            inds = rij > 1e-8
+            real_rows[n] = np.bincount(
+                js[inds].astype(int),
+                weights=erfc(self._sqrt_eta * rij[inds]) / rij[inds],
+                minlength=numsites)
+        real_rows *= 0.5 * EwaldSummation.CONV_FACT
+
+        gs, g2s, expvals = self._recip_vectors
+        grs = np.dot(gs, self._coords.T)
+        cos_grs = np.cos(grs)
+        sin_grs = np.sin(grs)
+        weights = (expvals / g2s)[:, None]
+        wcos = weights * cos_grs[:, indices]
+        wsin = weights * sin_grs[:, indices]
+        recip_rows = np.dot(wcos.T, cos_grs + sin_grs) + \
+            np.dot(wsin.T, sin_grs - cos_grs)
+        recip_cols = np.dot((wcos + wsin).T, cos_grs) + \
+            np.dot((wsin - wcos).T, sin_grs)
+        prefactor = 2 * pi / self._vol * EwaldSummation.CONV_FACT
+        return real_rows, recip_rows * prefactor, recip_cols * prefactor
 
     def compute_sub_structure(self, sub_structure, tol=1e-3):
         """
@@ -152,17 +270,12 @@ class EwaldSummation:
             return None
 
         matches = []
+        new_qs = np.zeros(self._s.num_sites)
         for i, site in enumerate(self._s):
             matching_site = find_match(site)
             if matching_site:
-                new_charge = compute_average_oxidation_state(matching_site)
-                old_charge = self._oxi_states[i]
-                scaling_factor = new_charge / old_charge
+                new_qs[i] = compute_average_oxidation_state(matching_site)
                 matches.append(matching_site)
-            else:
-                scaling_factor = 0
-            total_energy_matrix[i, :] *= scaling_factor
-            total_energy_matrix[:, i] *= scaling_factor
 
         if len(matches) != len(sub_structure):
             output = ["Missing sites."]
@@ -171,6 +284,23 @@ class EwaldSummation:
                     output.append("unmatched = {}".format(site))
             raise ValueError("\n".join(output))
 
+        old_qs = np.array(self._oxi_states, dtype=float)
+        uncharged = np.abs(old_qs) < 1e-8
+        scaling = np.where(uncharged, 0, new_qs / np.where(uncharged, 1, old_qs))
+        total_energy_matrix *= np.outer(scaling, scaling)
+
+        # The rows of sites without charge, e.g. neutralized by
+        # update_charges, are zero and cannot be rescaled, so they are
+        # computed anew.
+        indices = np.where(uncharged & (np.abs(new_qs) > 1e-8))[0].tolist()
+        if indices:
+            real_rows, recip_rows, recip_cols = self._calc_unit_rows(indices)
+            qs = new_qs[indices][:, None]
+            total_energy_matrix[indices, :] = (real_rows + recip_rows) * qs * new_qs
+            total_energy_matrix[:, indices] = ((real_rows + recip_cols) * qs * new_qs).T
+            total_energy_matrix[indices, indices] -= new_qs[indices] ** 2 * \
+                sqrt(self._eta / pi) * EwaldSummation.CONV_FACT
+
         return sum(sum(total_energy_matrix))
 
     @property
@@ -236,8 +366,7 @@ class EwaldSummation:
         when the simulation cell is not charge balanced.
         """
         totalenergy = self._recip + self._real
-        for i in range(len(self._point)):
-            totalenergy[i, i] += self._point[i]
+        totalenergy[np.diag_indices_from(totalenergy)] += self._point
         return totalenergy
 
     @property
@@ -275,94 +404,91 @@ class EwaldSummation:
         """
         numsites = self._s.num_sites
         prefactor = 2 * pi / self._vol
-        erecip = np.zeros((numsites, numsites), dtype=np.float)
-        forces = np.zeros((numsites, 3), dtype=np.float)
         coords = self._coords
-        rcp_latt = self._s.lattice.reciprocal_lattice
-        recip_nn = rcp_latt.get_points_in_sphere([[0, 0, 0]], [0, 0, 0],
-                                                 self._gmax)
-
-        frac_coords = [fcoords for (fcoords, dist, i, img) in recip_nn if dist != 0]
-
-        gs = rcp_latt.get_cartesian_coords(frac_coords)
-        g2s = np.sum(gs ** 2, 1)
-        expvals = np.exp(-g2s / (4 * self._eta))
-        grs = np.sum(gs[:, None] * coords[None, :], 2)
+        gs, g2s, expvals = self._recip_vectors = self._get_recip_vectors()
+        grs = np.dot(gs, coords.T)
 
         oxistates = np.array(self._oxi_states)
 
         # create array where q_2[i,j] is qi * qj
         qiqj = oxistates[None, :] * oxistates[:, None]
 
-        # calculate the structure factor
-        sreals = np.sum(oxistates[None, :] * np.cos(grs), 1)
-        simags = np.sum(oxistates[None, :] * np.sin(grs), 1)
+        # Uses the identity sin(x)+cos(x) = 2**0.5 sin(x + pi/4), summed over
+        # all G at once as matrix products, with x = G.r_j - G.r_i:
+        # cos(x) = cos(G.r_i)cos(G.r_j) + sin(G.r_i)sin(G.r_j)
+        # sin(x) = cos(G.r_i)sin(G.r_j) - sin(G.r_i)cos(G.r_j)
+        cos_grs = np.cos(grs)
+        sin_grs = np.sin(grs)
+        weights = (expvals / g2s)[:, None]
+        wcos = weights * cos_grs
+        wsin = weights * sin_grs
+        erecip = np.dot(wcos.T, cos_grs + sin_grs) + \
+            np.dot(wsin.T, sin_grs - cos_grs)
 
-        for g, g2, gr, expval, sreal, simag in zip(gs, g2s, grs, expvals,
-                                                   sreals, simags):
-
-            # Uses the identity sin(x)+cos(x) = 2**0.5 sin(x + pi/4)
-            m = (gr[None, :] + pi / 4) - gr[:, None]
-            np.sin(m, m)
-            m *= expval / g2
+        forces = np.zeros((numsites, 3), dtype=np.float)
+        if self._compute_forces:
+            # calculate the structure factor
+            sreals = np.dot(cos_grs, oxistates)
+            simags = np.dot(sin_grs, oxistates)
+            pref = 2 * weights * oxistates[None, :]
+            factor = prefactor * pref * (sreals[:, None] * sin_grs -
+                                         simags[:, None] * cos_grs)
+            forces = np.dot(factor.T, gs)
 
-            erecip += m
+        forces *= EwaldSummation.CONV_FACT
+        erecip *= prefactor * EwaldSummation.CONV_FACT * qiqj
+        return erecip, forces
 
-            if self._compute_forces:
-                pref = 2 * expval / g2 * oxistates
-                factor = prefactor * pref * (
-                        sreal * np.sin(gr) - simag * np.cos(gr))
+    def _get_recip_vectors(self):
+        """
+        Returns the cartesian reciprocal lattice vectors G within the
+        reciprocal space cutoff (excluding G = 0), their squared lengths and
+        exp(-G.G / (4 * eta)).
+        """
+        rcp_latt = self._s.lattice.reciprocal_lattice
+        recip_nn = rcp_latt.get_points_in_sphere([[0, 0, 0]], [0, 0, 0],
+                                                 self._gmax)
 
-                forces += factor[:, None] * g[None, :]
+        frac_coords = [fcoords for (fcoords, dist, i, img) in recip_nn if dist != 0]
 
-        forces *= EwaldSummation.CONV_FACT
-        erecip *= prefactor * EwaldSummation.CONV_FACT * qiqj * 2 ** 0.5
-        return erecip, forces
+        gs = rcp_latt.get_cartesian_coords(frac_coords)
+        g2s = np.sum(gs ** 2, 1)
+        expvals = np.exp(-g2s / (4 * self._eta))
+        return gs, g2s, expvals
 
     def _calc_real_and_point(self):
         """
         Determines the self energy -(eta/pi)**(1/2) * sum_{i=1}^{N} q_i**2
         """
-        fcoords = self._s.frac_coords
         forcepf = 2.0 * self._sqrt_eta / sqrt(pi)
         coords = self._coords
         numsites = self._s.num_sites
-        ereal = np.empty((numsites, numsites), dtype=np.float)
-
-        forces = np.zeros((numsites, 3), dtype=np.float)
 
         qs = np.array(self._oxi_states)
 
         epoint = - qs ** 2 * sqrt(self._eta / pi)
 
-        for i in range(numsites):
-            nfcoords, rij, js, _ = self._s.lattice.get_points_in_sphere(fcoords,
-                                                                        coords[i], self._rmax, zip_results=False)
+        # A single neighbor list pass over all sites. The rii term is excluded
+        # by get_neighbor_list.
+        centers, js, images, rij = self._s.get_neighbor_list(self._rmax)
+        qi = qs[centers]
+        qj = qs[js]
 
-            # remove the rii term
-            inds = rij > 1e-8
-            js = js[inds]
-            rij = rij[inds]
-            nfcoords = nfcoords[inds]
-
-            qi = qs[i]
-            qj = qs[js]
-
-            erfcval = erfc(self._sqrt_eta * rij)
-            new_ereals = erfcval * qi * qj / rij
+        erfcval = erfc(self._sqrt_eta * rij)
+        new_ereals = erfcval * qi * qj / rij
+        ereal = np.bincount(js * numsites + centers, weights=new_ereals,
+                            minlength=numsites ** 2).reshape(numsites, numsites)
 
-            # insert new_ereals
-            for k in range(numsites):
-                ereal[k, i] = np.sum(new_ereals[js == k])
-
-            if self._compute_forces:
-                nccoords = self._s.lattice.get_cartesian_coords(nfcoords)
-
-                fijpf = qj / rij ** 3 * (erfcval + forcepf * rij *
-                                         np.exp(-self._eta * rij ** 2))
-                forces[i] += np.sum(np.expand_dims(fijpf, 1) *
-                                    (np.array([coords[i]]) - nccoords) *
-                                    qi * EwaldSummation.CONV_FACT, axis=0)
+        forces = np.zeros((numsites, 3), dtype=np.float)
+        if self._compute_forces:
+            nccoords = coords[js] + np.dot(images, self._s.lattice.matrix)
+            fijpf = qj / rij ** 3 * (erfcval + forcepf * rij *
+                                     np.exp(-self._eta * rij ** 2))
+            pair_forces = np.expand_dims(fijpf * qi, 1) * \
+                (coords[centers] - nccoords) * EwaldSummation.CONV_FACT
+            for k in range(3):
+                forces[:, k] = np.bincount(centers, weights=pair_forces[:, k],
+                                           minlength=numsites)
 
         ereal *= 0.5 * EwaldSummation.CONV_FACT
         epoint *= EwaldSummation.CONV_FACT
@@ -404,6 +530,12 @@ class EwaldMinimizer:
     An alternative (possibly more intuitive) interface to this class is the
     order disordered structure transformation.
 
+    The search is a depth first branch and bound. Rather than copying the
+    full matrix at every node, each node only stores the scaling factor and
+    the current row sum of every index, which are updated in O(N) when a
+    manipulation is applied. Subtrees can be searched in parallel, with the
+    processes sharing the best bound found so far.
+
     Author - Will Richards
 
     Args:
@@ -420,6 +552,13 @@ class EwaldMinimizer:
             structures so it may be necessary to overestimate and then
             remove the duplicates later. (duplicate checking in this
             process is extremely expensive)
+        algo: Algorithm to use. One of ALGO_FAST, ALGO_BEST_FIRST or
+            ALGO_TIME_LIMIT.
+        ncores: Number of processes used to search the tree. Default is
+            None, which implies serial processing. A negative value uses
+            all the cpus of the machine. ALGO_BEST_FIRST always runs
+            serially, because it stops at the first num_to_return orderings
+            found in the order of the serial search.
     """
 
     ALGO_FAST = 0
@@ -433,15 +572,12 @@ class EwaldMinimizer:
     """
     ALGO_TIME_LIMIT = 3
 
-    def __init__(self, matrix, m_list, num_to_return=1, algo=ALGO_FAST):
+    def __init__(self, matrix, m_list, num_to_return=1, algo=ALGO_FAST,
+                 ncores=None):
         # Setup and checking of inputs
-        self._matrix = copy(matrix)
+        matrix = np.array(matrix, dtype=float)
         # Make the matrix diagonally symmetric (so matrix[i,:] == matrix[:,j])
-        for i in range(len(self._matrix)):
-            for j in range(i, len(self._matrix)):
-                value = (self._matrix[i, j] + self._matrix[j, i]) / 2
-                self._matrix[i, j] = value
-                self._matrix[j, i] = value
+        self._matrix = (matrix + matrix.T) / 2
 
         # sort the m_list based on number of permutations
         self._m_list = sorted(m_list, key=lambda x: comb(len(x[2]), x[1]),
@@ -450,22 +586,47 @@ class EwaldMinimizer:
         for mlist in self._m_list:
             if mlist[0] > 1:
                 raise ValueError('multiplication fractions must be <= 1')
+
+        # Interactions between the indices that can be manipulated, with each
+        # row sorted once so that the bounds only have to pick out the
+        # indices left rather than sort the interaction matrix at every node.
+        m_indices = sorted(set(i for m in self._m_list for i in m[2]))
+        self._positions = np.zeros(len(self._matrix), dtype=int)
+        self._positions[m_indices] = np.arange(len(m_indices))
+        interactions = self._matrix[np.ix_(m_indices, m_indices)]
+        self._sorted_order = np.argsort(interactions, axis=1)
+        self._sorted_interactions = np.take_along_axis(
+            interactions, self._sorted_order, axis=1)
         self._current_minimum = float('inf')
         self._num_to_return = num_to_return
         self._algo = algo
         if algo == EwaldMinimizer.ALGO_COMPLETE:
             raise NotImplementedError('Complete algo not yet implemented for '
                                       'EwaldMinimizer')
+        if ncores is not None and ncores < 0:
+            ncores = multiprocessing.cpu_count()
+        self._ncores = ncores
 
         self._output_lists = []
         # Tag that the recurse function looks at at each level. If a method
         # sets this to true it breaks the recursion and stops the search.
         self._finished = False
+        # Bound shared between processes when searching in parallel.
+        self._shared_minimum = None
+        self._shared_lock = None
 
+        self._nodes_visited = 0
+        self._nodes_pruned = 0
         self._start_time = datetime.utcnow()
 
         self.minimize_matrix()
 
+        self._run_time = (datetime.utcnow() - self._start_time).total_seconds()
+        logger.info("EwaldMinimizer visited %d nodes and pruned %d nodes "
+                    "(%.0f nodes pruned / s)" % (self._nodes_visited,
+                                                 self._nodes_pruned,
+                                                 self.pruning_rate))
+
         self._best_m_list = self._output_lists[0][1]
         self._minimized_sum = self._output_lists[0][0]
 
@@ -475,9 +636,16 @@ class EwaldMinimizer:
         ewald sum calls recursive function to iterate through permutations
         """
         if self._algo == EwaldMinimizer.ALGO_FAST or \
-                self._algo == EwaldMinimizer.ALGO_BEST_FIRST:
-            return self._recurse(self._matrix, self._m_list,
-                                 set(range(len(self._matrix))))
+                self._algo == EwaldMinimizer.ALGO_BEST_FIRST or \
+                self._algo == EwaldMinimizer.ALGO_TIME_LIMIT:
+            n = len(self._matrix)
+            node = (np.ones(n), np.sum(self._matrix),
+                    np.sum(self._matrix, axis=1), self._m_list,
+                    set(range(n)), [])
+            if self._ncores and self._ncores > 1 and \
+                    self._algo != EwaldMinimizer.ALGO_BEST_FIRST:
+                return self._recurse_parallel(node)
+            return self._recurse(node)
 
     def add_m_list(self, matrix_sum, m_list):
         """
@@ -495,6 +663,10 @@ class EwaldMinimizer:
             self._output_lists.pop()
         if len(self._output_lists) == self._num_to_return:
             self._current_minimum = self._output_lists[-1][0]
+            if self._shared_minimum is not None:
+                with self._shared_lock:
+                    if self._current_minimum < self._shared_minimum.value:
+                        self._shared_minimum.value = self._current_minimum
 
     def best_case(self, matrix, m_list, indices_left):
         """
@@ -509,14 +681,22 @@ class EwaldMinimizer:
                 performed on them.
         """
         m_indices = []
-        fraction_list = []
         for m in m_list:
             m_indices.extend(m[2])
-            fraction_list.extend([m[0]] * m[1])
-
         indices = list(indices_left.intersection(m_indices))
+        return self._best_case(np.sum(matrix), np.sum(matrix[indices], axis=1),
+                               np.sort(matrix[np.ix_(indices, indices)]),
+                               m_list)
 
-        interaction_matrix = matrix[indices, :][:, indices]
+    def _best_case(self, matrix_sum, row_sums, interaction_matrix, m_list):
+        """
+        Computes a best case from the sum of the current matrix, the row sums
+        of the indices left and the interactions between them, with each row
+        of the interaction matrix sorted.
+        """
+        fraction_list = []
+        for m in m_list:
+            fraction_list.extend([m[0]] * m[1])
 
         fractions = np.zeros(len(interaction_matrix)) + 1
         fractions[:len(fraction_list)] = fraction_list
@@ -524,14 +704,13 @@ class EwaldMinimizer:
 
         # Sum associated with each index (disregarding interactions between
         # indices)
-        sums = 2 * np.sum(matrix[indices], axis=1)
-        sums = np.sort(sums)
+        sums = np.sort(2 * row_sums)
 
         # Interaction corrections. Can be reduced to (1-x)(1-y) for x,y in
         # fractions each element in a column gets multiplied by (1-x), and then
         # the sum of the columns gets multiplied by (1-y) since fractions are
         # less than 1, there is no effect of one choice on the other
-        step1 = np.sort(interaction_matrix) * (1 - fractions)
+        step1 = interaction_matrix * (1 - fractions)
         step2 = np.sort(np.sum(step1, axis=1))
         step3 = step2 * (1 - fractions)
         interaction_correction = np.sum(step3)
@@ -546,7 +725,7 @@ class EwaldMinimizer:
             interaction_correction = average_correction * speedup_parameter \
                 + interaction_correction * (1 - speedup_parameter)
 
-        best_case = np.sum(matrix) + np.inner(sums[::-1], fractions - 1) + interaction_correction
+        best_case = matrix_sum + np.inner(sums[::-1], fractions - 1) + interaction_correction
 
         return best_case
 
@@ -555,31 +734,48 @@ class EwaldMinimizer:
         Returns an index that should have the most negative effect on the
         matrix sum
         """
-        f = manipulation[0]
         indices = list(indices_left.intersection(manipulation[2]))
-        sums = np.sum(matrix[indices], axis=1)
-        if f < 1:
-            next_index = indices[sums.argmax(axis=0)]
-        else:
-            next_index = indices[sums.argmin(axis=0)]
+        return self._get_next_index(np.sum(matrix[indices], axis=1),
+                                    manipulation, indices)
 
-        return next_index
+    def _get_sorted_interactions(self, indices):
+        """
+        Returns the interaction matrix between indices, with each row sorted.
+        """
+        positions = self._positions[indices]
+        order = self._sorted_order[positions]
+        selected = np.zeros(len(self._sorted_order), dtype=bool)
+        selected[positions] = True
+        interactions = self._sorted_interactions[positions][selected[order]]
+        return interactions.reshape(len(indices), len(indices))
+
+    @staticmethod
+    def _get_next_index(sums, manipulation, indices):
+        """
+        Returns the index with the most negative effect on the matrix sum,
+        given the row sums of the candidate indices.
+        """
+        if manipulation[0] < 1:
+            return indices[sums.argmax(axis=0)]
+        return indices[sums.argmin(axis=0)]
 
-    def _recurse(self, matrix, m_list, indices, output_m_list=[]):
+    def _expand(self, node):
         """
-        This method recursively finds the minimal permutations using a binary
-        tree search strategy.
+        Expands a node of the search tree. Complete orderings are added to
+        the output lists, and nodes that cannot lead to a better ordering
+        are pruned.
 
         Args:
-            matrix: The current matrix (with some permutations already
-                performed).
-            m_list: The list of permutations still to be performed
-            indices: Set of indices which haven't had a permutation
-                performed on them.
+            node: Tuple of (scaling factor of every index, sum of the
+                matrix, row sums of the matrix, list of permutations still to
+                be performed, set of indices which haven't had a permutation
+                performed on them, manipulations performed so far).
+
+        Returns:
+            List of child nodes, the one with the manipulation applied first.
         """
-        # check to see if we've found all the solutions that we need
-        if self._finished:
-            return
+        scales, matrix_sum, row_sums, m_list, indices, output_m_list = node
+        self._nodes_visited += 1
 
         # if we're done with the current manipulation, pop it off.
         while m_list[-1][1] == 0:
@@ -587,40 +783,382 @@ class EwaldMinimizer:
             m_list.pop()
             # if there are no more manipulations left to do check the value
             if not m_list:
-                matrix_sum = np.sum(matrix)
                 if matrix_sum < self._current_minimum:
                     self.add_m_list(matrix_sum, output_m_list)
-                return
+                return []
+
+        if self._shared_minimum is not None:
+            self._current_minimum = min(self._current_minimum,
+                                        self._shared_minimum.value)
 
         # if we wont have enough indices left, return
-        if m_list[-1][1] > len(indices.intersection(m_list[-1][2])):
-            return
+        candidates = list(indices.intersection(m_list[-1][2]))
+        if m_list[-1][1] > len(candidates):
+            self._nodes_pruned += 1
+            return []
 
         if len(m_list) == 1 or m_list[-1][1] > 1:
-            if self.best_case(matrix, m_list, indices) > self._current_minimum:
-                return
+            # Indices which haven't been manipulated are unscaled, so their
+            # interactions can be read from the original matrix.
+            m_indices = []
+            for m in m_list:
+                m_indices.extend(m[2])
+            left = list(indices.intersection(m_indices))
+            bound = self._best_case(matrix_sum, row_sums[left],
+                                    self._get_sorted_interactions(left),
+                                    m_list)
+            if bound > self._current_minimum:
+                self._nodes_pruned += 1
+                return []
+
+        index = self._get_next_index(row_sums[candidates], m_list[-1],
+                                     candidates)
+
+        # The manipulations are shared between nodes, so they are replaced
+        # rather than modified.
+        f, n, m_indices, species = m_list[-1]
+        m_indices = [i for i in m_indices if i != index]
+        m_list = copy(m_list)
+        m_list[-1] = [f, n, m_indices, species]
+
+        # Make the new node where we do the manipulation to the index that we
+        # just got. Scaling row and column index by f changes the sum by
+        # 2 (f - 1) (r - a) + (f^2 - 1) a, with r the row sum and a the
+        # diagonal element, and every other row sum j by (f - 1) m_ji.
+        diag = self._matrix[index, index]
+        matrix_sum2 = matrix_sum + 2 * (f - 1) * (row_sums[index] - diag) \
+            + (f * f - 1) * diag
+        row_sums2 = row_sums + (f - 1) * scales * self._matrix[index]
+        row_sums2[index] = f * (row_sums[index] - diag) + f * f * diag
+        scales2 = scales.copy()
+        scales2[index] = f
+        m_list2 = copy(m_list)
+        m_list2[-1] = [f, n - 1, m_indices, species]
+        indices2 = copy(indices)
+        indices2.remove(index)
+        output_m_list2 = copy(output_m_list)
+        output_m_list2.append([index, species])
 
-        index = self.get_next_index(matrix, m_list[-1], indices)
+        return [(scales2, matrix_sum2, row_sums2, m_list2, indices2,
+                 output_m_list2),
+                (scales, matrix_sum, row_sums, m_list, indices, output_m_list)]
 
-        m_list[-1][2].remove(index)
+    def _recurse(self, node):
+        """
+        This method recursively finds the minimal permutations using a binary
+        tree search strategy.
 
-        # Make the matrix and new m_list where we do the manipulation to the
-        # index that we just got
-        matrix2 = np.copy(matrix)
-        m_list2 = deepcopy(m_list)
-        output_m_list2 = copy(output_m_list)
+        Args:
+            node: Node of the search tree. See _expand.
+        """
+        # check to see if we've found all the solutions that we need
+        if self._finished:
+            return
+        for child in self._expand(node):
+            self._recurse(child)
 
-        matrix2[index, :] *= m_list[-1][0]
-        matrix2[:, index] *= m_list[-1][0]
-        output_m_list2.append([index, m_list[-1][3]])
-        indices2 = copy(indices)
-        indices2.remove(index)
-        m_list2[-1][1] -= 1
+    def _recurse_parallel(self, node):
+        """
+        Splits the search tree into subtrees which are searched by a pool of
+        processes sharing the current minimum.
+
+        Args:
+            node: Root node of the search tree. See _expand.
+        """
+        # Expand the top of the tree breadth first until there are enough
+        # subtrees to keep all the processes busy.
+        nodes = [node]
+        while nodes and len(nodes) < 8 * self._ncores:
+            nodes = [child for n in nodes for child in self._expand(n)]
+
+        self._shared_minimum = multiprocessing.RawValue(
+            'd', self._current_minimum)
+        self._shared_lock = multiprocessing.Lock()
+        p = multiprocessing.Pool(self._ncores, _init_minimizer_worker,
+                                 (self, self._shared_minimum,
+                                  self._shared_lock))
+        try:
+            for output_lists, visited, pruned in p.imap_unordered(
+                    _search_subtree, nodes, 1):
+                self._nodes_visited += visited
+                self._nodes_pruned += pruned
+                for matrix_sum, m_list in output_lists:
+                    if matrix_sum < self._current_minimum:
+                        self.add_m_list(matrix_sum, m_list)
+        finally:
+            p.close()
+            p.join()
+            self._shared_minimum = None
+            self._shared_lock = None
+
+    def __getstate__(self):
+        # The shared bound can only be passed to a process at its creation.
+        d = self.__dict__.copy()
+        d["_shared_minimum"] = None
+        d["_shared_lock"] = None
+        return d
+
+    @property
+    def best_m_list(self):
+        return self._best_m_list
+
+    @property
+    def minimized_sum(self):
+        return self._minimized_sum
 
-        # recurse through both the modified and unmodified matrices
+    @property
+    def output_lists(self):
+        return self._output_lists
+
+    @property
+    def nodes_visited(self):
+        """
+        Number of nodes of the search tree visited.
+        """
+        return self._nodes_visited
 
-        self._recurse(matrix2, m_list2, indices2, output_m_list2)
-        self._recurse(matrix, m_list, indices, output_m_list)
+    @property
+    def nodes_pruned(self):
+        """
+        Number of nodes of the search tree pruned by the best case bound.
+        """
+        return self._nodes_pruned
+
+    @property
+    def pruning_rate(self):
+        """
+        Number of nodes pruned per second of search.
+        """
+        run_time = getattr(self, "_run_time", None)
+        if run_time is None:
+            run_time = (datetime.utcnow() - self._start_time).total_seconds()
+        return self._nodes_pruned / run_time if run_time > 0 else 0.0
+
+
+_minimizer = None
+
+
+def _init_minimizer_worker(minimizer, shared_minimum, shared_lock):
+    """
+    Initializer of the processes searching subtrees for EwaldMinimizer.
+    """
+    global _minimizer
+    minimizer._shared_minimum = shared_minimum
+    minimizer._shared_lock = shared_lock
+    _minimizer = minimizer
+
+
+def _search_subtree(node):
+    """
+    Helper method for multiprocessing of EwaldMinimizer. Must not be in the
+    class so that it can be pickled.
+
+    Returns:
+        (output lists, number of nodes visited, number of nodes pruned) for
+        the subtree below node.
+    """
+    m = _minimizer
+    m._output_lists = []
+    m._finished = False
+    m._nodes_visited = 0
+    m._nodes_pruned = 0
+    m._current_minimum = m._shared_minimum.value
+    m._recurse(node)
+    return m._output_lists, m._nodes_visited, m._nodes_pruned
+
+
+class EwaldMonteCarloMinimizer:
+    """
+    This class finds low ewald sum orderings by simulated annealing, as an
+    alternative to EwaldMinimizer for problems too large to be searched
+    exhaustively. Starting from a random ordering, pairs of sites belonging
+    to the same set of indices and carrying different species are swapped
+    with the Metropolis criterion while the temperature is lowered
+    geometrically.
+
+    The interaction field of every index is kept up to date, so the energy
+    change of a swap costs O(1) and an accepted swap O(N). Swaps are proposed
+    and evaluated in vectorized batches, up to the first accepted one, which
+    is equivalent to proposing them one at a time.
+
+    Args:
+        matrix: A matrix of the ewald sum interaction energies.
+        m_list: list of manipulations, in the same form as for
+            EwaldMinimizer: (multiplication fraction, number_of_indices,
+            indices, species). Manipulations must act on identical or
+            disjoint lists of indices.
+        num_to_return: The number of lowest energy distinct orderings to
+            return. Orderings are considered distinct if any index has a
+            different species. They may still be equivalent by symmetry.
+        n_steps: Number of swaps attempted by each replica. Defaults to 1000
+            per index that can be manipulated.
+        n_replicas: Number of independent annealing runs.
+        start_temperature: Temperature in K at the start of the annealing.
+        end_temperature: Temperature in K at the end of the annealing. Use
+            the start temperature for Monte Carlo at constant temperature.
+        ncores: Number of processes used to run the replicas. Default is
+            None, which implies serial processing. A negative value uses all
+            the cpus of the machine.
+        seed: Seed of the random number generator.
+    """
+
+    def __init__(self, matrix, m_list, num_to_return=1, n_steps=None,
+                 n_replicas=1, start_temperature=10000, end_temperature=100,
+                 ncores=None, seed=None):
+        matrix = np.array(matrix, dtype=float)
+        self._matrix = (matrix + matrix.T) / 2
+        self._m_list = m_list
+        for m in m_list:
+            if m[0] > 1:
+                raise ValueError('multiplication fractions must be <= 1')
+        if start_temperature <= 0 or end_temperature <= 0:
+            raise ValueError('temperatures must be positive')
+
+        # Group the manipulations acting on the same indices. Each index of
+        # a group is labelled by the manipulation applied to it, or -1.
+        groups = {}
+        for i, m in enumerate(m_list):
+            groups.setdefault(tuple(sorted(set(m[2]))), []).append(i)
+        self._indices = np.array([i for g in groups for i in g], dtype=int)
+        if len(set(self._indices)) != len(self._indices):
+            raise ValueError('manipulations must act on identical or disjoint '
+                             'lists of indices')
+        self._initial_labels = []
+        self._group_starts = []
+        for g, manipulations in groups.items():
+            labels = [i for i in manipulations for _ in range(m_list[i][1])]
+            if len(labels) > len(g):
+                raise ValueError('not enough indices for the manipulations '
+                                 'on %s' % list(g))
+            self._group_starts.append(len(self._initial_labels))
+            self._initial_labels.extend(labels + [-1] * (len(g) - len(labels)))
+        self._initial_labels = np.array(self._initial_labels, dtype=int)
+        self._group_sizes = np.diff(self._group_starts + [len(self._indices)])
+        # Start and size of the group of each position.
+        self._starts = np.repeat(self._group_starts, self._group_sizes)
+        self._sizes = np.repeat(self._group_sizes, self._group_sizes)
+        # Fraction of every label, with the last entry for label -1.
+        self._fractions = np.array([m[0] for m in m_list] + [1], dtype=float)
+
+        self._num_to_return = num_to_return
+        self._n_steps = n_steps if n_steps is not None \
+            else 1000 * len(self._indices)
+        self._temperatures = (start_temperature, end_temperature)
+
+        seeds = np.random.RandomState(seed).randint(0, 2 ** 31 - 1,
+                                                    n_replicas)
+        if ncores is not None and ncores < 0:
+            ncores = multiprocessing.cpu_count()
+        if ncores and ncores > 1 and n_replicas > 1:
+            p = multiprocessing.Pool(min(ncores, n_replicas))
+            try:
+                replicas = p.map(_anneal_replica,
+                                 [(self, s) for s in seeds], 1)
+            finally:
+                p.close()
+                p.join()
+        else:
+            replicas = [self.anneal(s) for s in seeds]
+
+        # Merge the replicas, removing the orderings found more than once.
+        self._output_lists = []
+        found = set()
+        for energy, labels in sorted((o for r in replicas for o in r),
+                                     key=lambda x: x[0]):
+            key = labels.tobytes()
+            if key in found:
+                continue
+            found.add(key)
+            m_list_out = [[int(self._indices[i]), m_list[l][3]]
+                          for i, l in enumerate(labels) if l >= 0]
+            self._output_lists.append([energy, m_list_out])
+            if len(self._output_lists) == num_to_return:
+                break
+
+        self._best_m_list = self._output_lists[0][1]
+        self._minimized_sum = self._output_lists[0][0]
+
+    def get_energy(self, labels):
+        """
+        Returns the ewald sum of an ordering.
+
+        Args:
+            labels: Manipulation applied to each index that can be
+                manipulated, or -1.
+        """
+        scales = np.ones(len(self._matrix))
+        scales[self._indices] = self._fractions[labels]
+        return np.dot(scales, np.dot(self._matrix, scales))
+
+    def anneal(self, seed=None):
+        """
+        Runs one annealing replica.
+
+        Args:
+            seed: Seed of the random number generator.
+
+        Returns:
+            List of the num_to_return lowest energy distinct orderings
+            visited, as (energy, labels) tuples.
+        """
+        rng = np.random.RandomState(seed)
+        matrix = self._matrix
+        indices = self._indices
+        labels = self._initial_labels.copy()
+        for start, size in zip(self._group_starts, self._group_sizes):
+            labels[start:start + size] = rng.permutation(
+                labels[start:start + size])
+        scales = np.ones(len(matrix))
+        scales[indices] = self._fractions[labels]
+        field = np.dot(matrix, scales)
+        energy = np.dot(scales, field)
+
+        kb = constants.k / constants.e
+        t_start, t_end = self._temperatures
+        n_steps = self._n_steps
+        lowest = [(energy, labels.tobytes())]
+        found = {lowest[0][1]}
+        batch_size = 64
+        step = 0
+        while step < n_steps:
+            n = min(batch_size, n_steps - step)
+            a = rng.randint(0, len(indices), n)
+            b = self._starts[a] + (rng.rand(n) * self._sizes[a]).astype(int)
+            ia = indices[a]
+            ib = indices[b]
+            delta = scales[ib] - scales[ia]
+            de = 2 * delta * (field[ia] - field[ib]) + delta ** 2 * (
+                matrix[ia, ia] + matrix[ib, ib] - 2 * matrix[ia, ib])
+            kt = kb * t_start * (t_end / t_start) ** (
+                (step + np.arange(n)) / max(n_steps - 1, 1))
+            with np.errstate(over="ignore"):
+                accepted = (delta != 0) & (
+                    (de <= 0) | (rng.rand(n) < np.exp(-de / kt)))
+            if not accepted.any():
+                step += n
+                batch_size = min(2 * batch_size, 4096)
+                continue
+            j = accepted.argmax()
+            step += j + 1
+            batch_size = max(16, min(4 * (j + 1), 4096))
+
+            # Swap the species and update the field.
+            labels[a[j]], labels[b[j]] = labels[b[j]], labels[a[j]]
+            scales[ia[j]], scales[ib[j]] = scales[ib[j]], scales[ia[j]]
+            field += delta[j] * (matrix[ia[j]] - matrix[ib[j]])
+            energy += de[j]
+
+            if len(lowest) < self._num_to_return or energy < lowest[-1][0]:
+                key = labels.tobytes()
+                if key not in found:
+                    found.add(key)
+                    bisect.insort(lowest, (energy, key))
+                    if len(lowest) > self._num_to_return:
+                        found.remove(lowest.pop()[1])
+
+        # The energies accumulate rounding errors, so they are recomputed.
+        lowest = [np.frombuffer(key, dtype=int) for _, key in lowest]
+        return [(self.get_energy(l), l) for l in lowest]
 
     @property
     def best_m_list(self):
@@ -635,6 +1173,15 @@ class EwaldMinimizer:
         return self._output_lists
 
 
+def _anneal_replica(inputs):
+    """
+    Helper method for multiprocessing of EwaldMonteCarloMinimizer. Must not
+    be in the class so that it can be pickled.
+    """
+    minimizer, seed = inputs
+    return minimizer.anneal(seed)
+
+
 def compute_average_oxidation_state(site):
     """
     Calculates the average oxidation state of a site
@@ -23,6 +23,7 @@ from monty.dev import deprecated
 
 from pymatgen.analysis.molecule_structure_comparator import CovalentRadius
 from pymatgen.core.sites import PeriodicSite, Site
+from pymatgen.core.structure import PeriodicNeighbor
 
 
 __author__ = "Shyue Ping Ong, Geoffroy Hautier, Sai Jayaraman," + \
@@ -219,6 +220,41 @@ class ValenceIonicRadiusEvaluator:
         return valences
 
 
+def _get_frac_coords_key(frac_coords):
+    """
+    Returns the key of fractional coordinates in the hash index of
+    _get_site_hash_index, i.e. the coordinates wrapped into the unit cell
+    and rounded to 1e-4.
+    """
+    key = np.round(np.mod(frac_coords, 1) * 1e4).astype(int) % 10000
+    return tuple(key.tolist())
+
+
+def _get_site_hash_index(structure):
+    """
+    Returns a dict of the keys of _get_frac_coords_key of the sites of a
+    structure to the site indices. The dict is stored on the structure
+    together with the site list and lattice it was built for, and rebuilt
+    when either has been replaced. It is cleared along with the neighbor list
+    cache by the Structure methods that modify sites, but sites modified in
+    place by other means are not detected, so sites found with it have to be
+    checked, and sites which are not found have to be searched for among all
+    sites.
+    """
+    cache = getattr(structure, "_site_hash_index", None)
+    if cache is None or cache["sites"] is not structure._sites or \
+            cache["lattice"] is not structure._lattice or \
+            cache["nsites"] != len(structure._sites):
+        site_hash_index = defaultdict(list)
+        for i, fcoords in enumerate(structure.frac_coords):
+            site_hash_index[_get_frac_coords_key(fcoords)].append(i)
+        cache = {"sites": structure._sites, "lattice": structure._lattice,
+                 "nsites": len(structure._sites),
+                 "index": dict(site_hash_index)}
+        structure._site_hash_index = cache
+    return cache["index"]
+
+
 class NearNeighbors:
     """
     Base class to determine near neighbors that typically include nearest
@@ -390,7 +426,25 @@ class NearNeighbors:
                 entry has the same format as `get_nn_info`
         """
 
-        return [self.get_nn_info(structure, n) for n in range(len(structure))]
+        cutoff = self._get_search_cutoff(structure)
+        if not cutoff or not isinstance(structure, IStructure) or \
+                getattr(structure, "_neighbor_list_cache", None) is not None:
+            return [self.get_nn_info(structure, n) for n in range(len(structure))]
+        # Compute the neighbor list of all sites once; the per-site
+        # get_neighbors calls in get_nn_info are then served from the
+        # neighbor list cache of the structure, which is cleared afterwards.
+        structure.get_neighbor_list(cutoff, use_cache=True)
+        try:
+            return [self.get_nn_info(structure, n) for n in range(len(structure))]
+        finally:
+            structure.clear_neighbor_list_cache()
+
+    def _get_search_cutoff(self, structure):
+        """
+        Radius used by get_nn_info to search for trial neighbors, or None if
+        this class does not search neighbors within a fixed radius.
+        """
+        return None
 
     def get_nn_shell_info(self, structure, site_idx, shell):
         """Get a certain nearest neighbor shell for a certain site.
@@ -519,7 +573,7 @@ class NearNeighbors:
 
         Image is defined as displacement from original site in structure to a given site.
         i.e. if structure has a site at (-0.1, 1.0, 0.3), then (0.9, 0, 2.3) -> jimage = (1, -1, 2).
-        Note that this method takes O(number of sites) due to searching an original site.
+        The original site is found as in _get_original_site.
 
         Args:
             structure: Structure Object
@@ -538,7 +592,29 @@ class NearNeighbors:
     @staticmethod
     def _get_original_site(structure, site):
         """Private convenience method for get_nn_info,
-        gives original site index from ProvidedPeriodicSite."""
+        gives original site index from ProvidedPeriodicSite.
+
+        Neighbors returned by the neighbor searches of a structure
+        (PeriodicNeighbor) carry the index of their original site, so this
+        takes O(1). Other sites are looked up in a hash index of the rounded
+        fractional coordinates of the structure, and only sites which are
+        not found there are searched for among all sites.
+        """
+        index = getattr(site, "index", None)
+        if index is not None and 0 <= index < len(structure):
+            original_site = structure[index]
+            frac_diff = site.frac_coords - original_site.frac_coords
+            if np.allclose(frac_diff, np.round(frac_diff), atol=1e-8) and \
+                    site.species == original_site.species and \
+                    (site.lattice is original_site.lattice or
+                     site.lattice == original_site.lattice):
+                return index
+        if isinstance(structure, IStructure):
+            key = _get_frac_coords_key(site.frac_coords)
+            for i in _get_site_hash_index(structure).get(key, []):
+                if i < len(structure) and \
+                        site.is_periodic_image(structure[i]):
+                    return i
         for i, s in enumerate(structure):
             if site.is_periodic_image(s):
                 return i
@@ -694,10 +770,9 @@ class VoronoiNN(NearNeighbors):
 
         # Assemble the list of neighbors used in the tessellation
         #   Gets all atoms within a certain radius
-        if self.targets is None:
-            targets = structure.composition.elements
-        else:
-            targets = self.targets
+        # None means all elements of the structure, which is not resolved
+        # here since computing the composition takes O(number of sites)
+        targets = self.targets
         center = structure[n]
 
         cutoff = self.cutoff
@@ -710,10 +785,13 @@ class VoronoiNN(NearNeighbors):
 
         while True:
             try:
-                neighbors = structure.get_sites_in_sphere(
-                    center.coords, cutoff)
-                neighbors = [i[0] for i in
-                             sorted(neighbors, key=lambda s: s[1])]
+                # neighbors carry their site index, so that they can be
+                # mapped back to the structure in O(1)
+                neighbors = sorted(structure.get_neighbors(center, cutoff),
+                                   key=lambda s: s.nn_distance)
+                neighbors.insert(0, PeriodicNeighbor(
+                    center.species, center.frac_coords, center.lattice,
+                    properties=center.properties, index=n))
 
                 # Run the Voronoi tessellation
                 qvoronoi_input = [s.coords for s in neighbors]
@@ -764,17 +842,22 @@ class VoronoiNN(NearNeighbors):
             return [self.get_voronoi_polyhedra(structure, 0)]
 
         # Assemble the list of neighbors used in the tessellation
-        if self.targets is None:
-            targets = structure.composition.elements
-        else:
-            targets = self.targets
+        # None means all elements of the structure, which is not resolved
+        # here since computing the composition takes O(number of sites)
+        targets = self.targets
 
         # Initialize the list of sites with the atoms in the origin unit cell
         #  The `get_all_neighbors` function returns neighbors for each site's image in the
         #   original unit cell. We start off with these central atoms to ensure they are
         #   included in the tessellation
 
-        sites = [x.to_unit_cell() for x in structure]
+        sites = []
+        for i, site in enumerate(structure):
+            fcoords = site.to_unit_cell().frac_coords
+            image = tuple(np.round(fcoords - site.frac_coords).astype(int))
+            sites.append(PeriodicNeighbor(
+                site.species, fcoords, site.lattice,
+                properties=site.properties, index=i, image=image))
         indices = [(i, 0, 0, 0) for i, _ in enumerate(structure)]
 
         # Get all neighbors within a certain cutoff
@@ -789,7 +872,7 @@ class VoronoiNN(NearNeighbors):
         # Get the non-duplicates (using the site indices for performance/numerical stability)
         indices = np.array(indices, dtype=np.int)
         indices, uniq_inds = np.unique(indices, return_index=True, axis=0)
-        sites = np.array(sites)[uniq_inds]
+        sites = [sites[i] for i in uniq_inds]
 
         # Sort array such that atoms in the root image are first
         #   Exploit the fact that the array is sorted by the unique operation such that
@@ -829,10 +912,12 @@ class VoronoiNN(NearNeighbors):
 
         Args:
             site (Site): Site to assess
-            targets ([Element]) List of elements
+            targets ([Element]) List of elements, or None for all elements
         Returns:
              (boolean) Whether this site contains a certain list of elements
         """
+        if targets is None:
+            return True
         elems = self._get_elements(site)
         for elem in elems:
             if elem not in targets:
@@ -847,7 +932,7 @@ class VoronoiNN(NearNeighbors):
             structure (Structure) - Structure being assessed
             site_idx (int) - Index of the atom in question
             sites ([Site]) - List of all sites in the tessellation
-            targets ([Element]) - Target elements
+            targets ([Element]) - Target elements, or None for all elements
             voro - Output of qvoronoi
             compute_adj_neighbors (boolean) - Whether to compute which neighbors are adjacent
         Returns:
@@ -932,7 +1017,9 @@ class VoronoiNN(NearNeighbors):
         for nn_index, nstats in results.items():
             # Check if this is a target site
             nn = nstats['site']
-            if nn.is_ordered:
+            if targets is None:
+                resultweighted[nn_index] = nstats
+            elif nn.is_ordered:
                 if nn.specie in targets:
                     resultweighted[nn_index] = nstats
             else:  # is nn site is disordered
@@ -1013,10 +1100,9 @@ class VoronoiNN(NearNeighbors):
         """
 
         # Get the target information
-        if self.targets is None:
-            targets = structure.composition.elements
-        else:
-            targets = self.targets
+        # None means all elements of the structure, which is not resolved
+        # here since computing the composition takes O(number of sites)
+        targets = self.targets
 
         # Extract the NN info
         siw = []
@@ -1132,6 +1218,11 @@ class JmolNN(NearNeighbors):
         return sqrt(
             (self.el_radius[el1_sym] + self.el_radius[el2_sym] + self.tol) ** 2)
 
+    def _get_search_cutoff(self, structure):
+        elements = structure.composition.elements
+        return max(self.get_max_bond_distance(el1.symbol, el2.symbol)
+                   for el1 in elements for el2 in elements)
+
     def get_nn_info(self, structure, n):
         """
         Get all near-neighbor sites as well as the associated image locations
@@ -1157,8 +1248,9 @@ class JmolNN(NearNeighbors):
             bonds[site.specie, el] = self.get_max_bond_distance(
                 site.specie.symbol, el.symbol)
 
-        # Search for neighbors up to max bond length + tolerance
-        max_rad = max(bonds.values()) + self.tol
+        # Search for neighbors up to max bond length, which already includes
+        # the tolerance
+        max_rad = max(bonds.values())
         min_rad = min(bonds.values())
 
         siw = []
@@ -1223,6 +1315,9 @@ class MinimumDistanceNN(NearNeighbors):
         """
         return True
 
+    def _get_search_cutoff(self, structure):
+        return self.cutoff
+
     def get_nn_info(self, structure, n):
         """
         Get all near-neighbor sites as well as the associated image locations
@@ -1629,6 +1724,9 @@ class MinimumOKeeffeNN(NearNeighbors):
         """
         return True
 
+    def _get_search_cutoff(self, structure):
+        return self.cutoff
+
     def get_nn_info(self, structure, n):
         """
         Get all near-neighbor sites as well as the associated image locations
@@ -3205,6 +3303,9 @@ class BrunnerNN_reciprocal(NearNeighbors):
         """
         return False
 
+    def _get_search_cutoff(self, structure):
+        return self.cutoff
+
     def get_nn_info(self, structure, n):
         """
         Get all near-neighbor sites as well as the associated image locations
@@ -3276,6 +3377,9 @@ class BrunnerNN_relative(NearNeighbors):
         """
         return False
 
+    def _get_search_cutoff(self, structure):
+        return self.cutoff
+
     def get_nn_info(self, structure, n):
         """
         Get all near-neighbor sites as well as the associated image locations
@@ -3347,6 +3451,9 @@ class BrunnerNN_real(NearNeighbors):
         """
         return False
 
+    def _get_search_cutoff(self, structure):
+        return self.cutoff
+
     def get_nn_info(self, structure, n):
         """
         Get all near-neighbor sites as well as the associated image locations
@@ -3431,6 +3538,9 @@ class EconNN(NearNeighbors):
         """
         return True
 
+    def _get_search_cutoff(self, structure):
+        return self.cutoff
+
     def get_nn_info(self, structure, n):
         """
         Get all near-neighbor sites as well as the associated image locations
@@ -3534,6 +3644,9 @@ class CrystalNN(NearNeighbors):
         """
         return False
 
+    def _get_search_cutoff(self, structure):
+        return self.search_cutoff
+
     def get_nn_info(self, structure, n):
         """
         Get all near-neighbor information.
@@ -3956,6 +4069,9 @@ class CutOffDictNN(NearNeighbors):
         else:
             raise ValueError("Unrecognised preset: {}".format(preset))
 
+    def _get_search_cutoff(self, structure):
+        return self._max_dist
+
     def get_nn_info(self, structure, n):
         """
         Get all near-neighbor sites as well as the associated image locations
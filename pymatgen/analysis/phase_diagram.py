@@ -319,6 +319,9 @@ class PhaseDiagram(MSONable):
     # Tolerance for determining if formation energy is positive.
     formation_energy_tol = 1e-11
     numerical_tol = 1e-8
+    # Maximum number of barycentric coordinates evaluated at once in batch
+    # hull queries.
+    block_size = 1000000
 
     def __init__(self, entries, elements=None):
         """
@@ -398,6 +401,19 @@ class PhaseDiagram(MSONable):
             self.facets = finalfacets
 
         self.simplexes = [Simplex(qhull_data[f, :-1]) for f in self.facets]
+
+        # Chemical potentials of the elements in each facet. These define the
+        # hyperplanes making up the lower hull, so the hull energy per atom
+        # at any composition is the maximum over facets of fractions . mu.
+        fracs = np.concatenate([1 - qhull_data[:, :-1].sum(axis=1)[:, None],
+                                qhull_data[:, :-1]], axis=1)
+        facets = np.array(self.facets)
+        self._facet_chempots = np.linalg.solve(
+            fracs[facets], qhull_data[facets, -1][..., None])[..., 0]
+        # Inverse augmented matrices of all simplexes, so that the
+        # barycentric coordinates in every facet can be computed in one pass
+        self._facet_aug_inv = np.array([s._aug_inv for s in self.simplexes])
+
         self.all_entries = all_entries
         self.qhull_data = qhull_data
         self.dim = dim
@@ -608,6 +624,125 @@ class PhaseDiagram(MSONable):
         """
         return self.get_decomp_and_e_above_hull(entry)[1]
 
+    def _get_atomic_fractions(self, comps):
+        """
+        Returns the atomic fractions of the elements of the phase diagram in
+        a list of compositions as a (len(comps), dim) array. comps can also
+        be a (M, dim) array of amounts of the elements of the phase diagram,
+        in the order of self.elements.
+        """
+        if isinstance(comps, np.ndarray):
+            if comps.ndim != 2 or comps.shape[1] != self.dim:
+                raise ValueError("Composition matrix must have shape (M, {})"
+                                 "".format(self.dim))
+            return comps / comps.sum(axis=1)[:, None]
+        fracs = np.zeros((len(comps), self.dim))
+        el_inds = {el: i for i, el in enumerate(self.elements)}
+        for i, comp in enumerate(comps):
+            if set(comp.elements).difference(self.elements):
+                raise ValueError('{} has elements not in the phase diagram {}'
+                                 ''.format(comp, self.elements))
+            for el, amt in comp.items():
+                fracs[i, el_inds[el]] = amt
+            fracs[i] /= comp.num_atoms
+        return fracs
+
+    def _get_facets_and_bary_coords(self, fracs):
+        """
+        Vectorized version of _get_facet_and_simplex. Finds, for each row of
+        a matrix of atomic fractions, the first facet containing it and the
+        barycentric coordinates in that facet.
+
+        Returns:
+            (facet indices (M,), barycentric coordinates (M, dim))
+        """
+        m = len(fracs)
+        nfacets = len(self.facets)
+        coords = np.concatenate([fracs[:, 1:], np.ones((m, 1))], axis=1)
+        facet_inds = np.empty(m, dtype=int)
+        bary = np.empty((m, self.dim))
+        step = max(1, self.block_size // (nfacets * self.dim))
+        for start in range(0, m, step):
+            b = np.einsum("mj,fjk->mfk", coords[start:start + step],
+                          self._facet_aug_inv)
+            inside = np.all(b >= -PhaseDiagram.numerical_tol / 10, axis=2)
+            inds = np.argmax(inside, axis=1)
+            missing = ~inside[np.arange(len(inds)), inds]
+            if np.any(missing):
+                raise RuntimeError("No facet found for comp = {}".format(
+                    fracs[start + np.argmax(missing)]))
+            facet_inds[start:start + step] = inds
+            bary[start:start + step] = b[np.arange(len(inds)), inds]
+        return facet_inds, bary
+
+    def get_decompositions(self, comps):
+        """
+        Provides the decompositions of many compositions at once.
+
+        Args:
+            comps: A list of Compositions, or a (M, dim) array of amounts of
+                the elements of the phase diagram, in the order of
+                self.elements.
+
+        Returns:
+            (entry indices, amounts), both (M, dim) arrays. Row i gives the
+            indices in qhull_entries of the phases the i-th composition
+            decomposes into, and their amounts (as in get_decomposition).
+            Amounts below the numerical tolerance are set to 0.
+        """
+        fracs = self._get_atomic_fractions(comps)
+        facet_inds, amts = self._get_facets_and_bary_coords(fracs)
+        amts[np.abs(amts) <= PhaseDiagram.numerical_tol] = 0
+        return np.array(self.facets)[facet_inds], amts
+
+    def get_hull_energies(self, comps):
+        """
+        Provides the hull energies of many compositions at once.
+
+        Args:
+            comps: A list of Compositions, or a (M, dim) array of amounts of
+                the elements of the phase diagram, in the order of
+                self.elements.
+
+        Returns:
+            np.ndarray of the energies of the lowest energy equilibria at the
+            compositions. Not normalized by atoms, as in get_hull_energy.
+        """
+        if isinstance(comps, np.ndarray):
+            num_atoms = comps.sum(axis=1)
+        else:
+            num_atoms = np.array([c.num_atoms for c in comps])
+        fracs = self._get_atomic_fractions(comps)
+        facet_inds, bary = self._get_facets_and_bary_coords(fracs)
+        energies = self.qhull_data[np.array(self.facets), -1][facet_inds]
+        return np.sum(bary * energies, axis=1) * num_atoms
+
+    def get_e_above_hulls(self, entries, allow_negative=False):
+        """
+        Provides the energies above convex hull for many entries at once.
+        The entries are evaluated against the fixed hull of this phase
+        diagram in a single vectorized pass, i.e. they do not affect the
+        hull themselves.
+
+        Args:
+            entries ([PDEntry]): PDEntry like objects
+            allow_negative: Whether to allow negative e_above_hulls, i.e.
+                entries below the hull. Defaults to False.
+
+        Returns:
+            np.ndarray of the energies above convex hull of the entries.
+            Stable entries have energy above hull of 0.
+        """
+        fracs = self._get_atomic_fractions([e.composition for e in entries])
+        hull_energies = np.max(np.dot(fracs, self._facet_chempots.T), axis=1)
+        e_above_hulls = np.array([e.energy_per_atom for e in entries]) - \
+            hull_energies
+        e_above_hulls[[e in self.stable_entries for e in entries]] = 0
+        if not allow_negative and \
+                np.any(e_above_hulls < -PhaseDiagram.numerical_tol):
+            raise ValueError("No valid decomp found!")
+        return e_above_hulls
+
     def get_equilibrium_reaction_energy(self, entry):
         """
         Provides the reaction energy of a stable entry from the neighboring
@@ -960,6 +1095,64 @@ class PhaseDiagram(MSONable):
         return res
 
 
+class IncrementalPhaseDiagram(PhaseDiagram):
+    """
+    A phase diagram that can be updated with new entries (or have entries
+    removed) without recomputing the convex hull, unless the update actually
+    changes the hull. This is useful for screening workflows which add
+    entries one at a time to a large chemical space.
+    """
+
+    def add_entry(self, entry):
+        """
+        Adds an entry to the phase diagram. The hull is only recomputed if the
+        entry lies on or below the current hull.
+
+        Args:
+            entry (PDEntry): A PDEntry-like object.
+
+        Returns:
+            Energy above hull of the entry in the updated phase diagram.
+        """
+        return self.add_entries([entry])[0]
+
+    def add_entries(self, entries):
+        """
+        Adds several entries to the phase diagram. The hull is recomputed at
+        most once, if any of the entries lies on or below the current hull.
+
+        Args:
+            entries ([PDEntry]): PDEntry-like objects.
+
+        Returns:
+            np.ndarray of the energies above hull of the entries in the
+            updated phase diagram.
+        """
+        entries = list(entries)
+        e_above_hulls = self.get_e_above_hulls(entries, allow_negative=True)
+        self.all_entries.extend(entries)
+        if np.any(e_above_hulls < PhaseDiagram.numerical_tol):
+            self._update_hull()
+            e_above_hulls = self.get_e_above_hulls(entries)
+        return e_above_hulls
+
+    def remove_entry(self, entry):
+        """
+        Removes an entry from the phase diagram. The hull is only recomputed
+        if the entry is stable.
+
+        Args:
+            entry (PDEntry): An entry in all_entries.
+        """
+        self.all_entries.remove(entry)
+        if entry in self.stable_entries:
+            self._update_hull()
+
+    def _update_hull(self):
+        self._get_facet_and_simplex.cache_clear()
+        PhaseDiagram.__init__(self, self.all_entries, self.elements)
+
+
 class GrandPotentialPhaseDiagram(PhaseDiagram):
     """
     A class representing a Grand potential phase diagram. Grand potential phase
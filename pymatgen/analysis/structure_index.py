@@ -0,0 +1,245 @@
+# coding: utf-8
+# Copyright (c) Pymatgen Development Team.
+# Distributed under the terms of the MIT License.
+
+"""
+This module provides a persistent, on-disk index of structures that can be
+queried for structures equivalent to a given one according to a
+StructureMatcher. The index is stored in a sqlite3 database, so it can be
+grown incrementally and shared between sessions.
+"""
+
+import json
+import sqlite3
+
+import numpy as np
+from monty.json import MontyEncoder
+
+from pymatgen.core.structure import Structure
+from pymatgen.analysis.structure_matcher import StructureMatcher, \
+    ElementComparator
+
+__author__ = "Pymatgen Development Team"
+__copyright__ = "Copyright 2020, The Materials Project"
+__version__ = "1.0"
+__date__ = "Oct 2020"
+
+
+class StructureIndex:
+    """
+    A persistent index of structures for fast deduplication. Each structure
+    is stored in its reduced form (as used by the StructureMatcher) together
+    with invariant fingerprints. A query only runs StructureMatcher.fit on
+    the stored structures with the same composition hash whose fingerprints
+    are compatible with those of the query, instead of the whole library.
+
+    Usage::
+
+        with StructureIndex("known.sqlite") as index:
+            if structure not in index:
+                index.add(structure)
+    """
+
+    def __init__(self, filename=":memory:", structure_matcher=None):
+        """
+        Args:
+            filename (str): Path to the sqlite3 database file. The file is
+                created if it does not exist. Defaults to an in-memory
+                database.
+            structure_matcher (StructureMatcher): Matcher used to compare
+                structures. For an existing file, the matcher stored in the
+                file is used if None is supplied, and a ValueError is raised
+                if a different matcher is supplied, since the stored
+                fingerprints depend on its settings. Defaults to
+                StructureMatcher(comparator=ElementComparator()) for a new
+                file. Matchers with allow_subset are not supported, since
+                they have no fingerprints.
+        """
+        self.filename = filename
+        self._db = sqlite3.connect(filename)
+        self._db.execute("CREATE TABLE IF NOT EXISTS metadata "
+                         "(key TEXT PRIMARY KEY, value TEXT)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS structures "
+                         "(id INTEGER PRIMARY KEY, comp_hash TEXT, "
+                         "nsites INTEGER, vol_per_site REAL, "
+                         "nn_dists BLOB, skew REAL, structure TEXT, "
+                         "data TEXT)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS structures_hash ON "
+                         "structures (comp_hash, nsites)")
+
+        row = self._db.execute("SELECT value FROM metadata WHERE "
+                               "key='structure_matcher'").fetchone()
+        if row is None:
+            if structure_matcher is None:
+                structure_matcher = StructureMatcher(
+                    comparator=ElementComparator())
+            self._db.execute("INSERT INTO metadata VALUES (?, ?)",
+                             ("structure_matcher",
+                              json.dumps(structure_matcher.as_dict())))
+            self._db.commit()
+        else:
+            stored = json.loads(row[0])
+            if structure_matcher is None:
+                structure_matcher = StructureMatcher.from_dict(stored)
+            elif json.loads(json.dumps(structure_matcher.as_dict())) != stored:
+                raise ValueError("%s was created with a different "
+                                 "StructureMatcher" % filename)
+        self.structure_matcher = structure_matcher
+
+    def _get_key(self, structure):
+        """
+        Returns the reduced structure and its fingerprint, i.e. (comp_hash,
+        nsites, vol_per_site, nn_dists, skew).
+        """
+        return self.structure_matcher.get_fingerprint(structure)
+
+    def _get_candidates(self, key):
+        # Only the fingerprints are read first. The structures are then only
+        # read for the few rows with compatible fingerprints.
+        rows = self._db.execute(
+            "SELECT id, nsites, vol_per_site, nn_dists, skew FROM structures "
+            "WHERE comp_hash=?", (key[0],)).fetchall()
+        for i, n, vol, d, skew in rows:
+            if self.structure_matcher.fingerprints_compatible(
+                    (key[0], n, vol, np.frombuffer(d), skew), key):
+                yield i, self._get_row(i, "structure")
+
+    def _find(self, s, key, break_on_match=False):
+        matches = []
+        for i, d in self._get_candidates(key):
+            existing = Structure.from_dict(json.loads(d))
+            if self.structure_matcher.fit(existing, s,
+                                          skip_structure_reduction=True):
+                matches.append(i)
+                if break_on_match:
+                    break
+        return matches
+
+    def get_matches(self, structure):
+        """
+        Finds the stored structures equivalent to a structure.
+
+        Args:
+            structure (Structure): Structure to look up.
+
+        Returns:
+            List of ids of the matching structures.
+        """
+        s, key = self._get_key(structure)
+        return self._find(s, key)
+
+    def __contains__(self, structure):
+        s, key = self._get_key(structure)
+        return len(self._find(s, key, break_on_match=True)) > 0
+
+    def add(self, structure, data=None, check=False):
+        """
+        Adds a structure to the index.
+
+        Args:
+            structure (Structure): Structure to add.
+            data: Any json serializable data to store along with the
+                structure, e.g. an id in an external database.
+            check (bool): If True, the structure is only added if no
+                equivalent structure is present.
+
+        Returns:
+            The id of the new structure, or the id of an equivalent structure
+            if check is True and one is already present.
+        """
+        i = self._add(structure, data, check)
+        self._db.commit()
+        return i
+
+    def add_structures(self, structures, data=None, check=False):
+        """
+        Adds several structures to the index in a single transaction.
+
+        Args:
+            structures ([Structure]): Structures to add.
+            data (list): Data to store along with each structure.
+            check (bool): If True, structures are only added if no
+                equivalent structure is present.
+
+        Returns:
+            List of ids, as for add.
+        """
+        if data is None:
+            data = [None] * len(structures)
+        ids = [self._add(s, d, check) for s, d in zip(structures, data)]
+        self._db.commit()
+        return ids
+
+    def _add(self, structure, data, check):
+        s, key = self._get_key(structure)
+        if check:
+            matches = self._find(s, key, break_on_match=True)
+            if matches:
+                return matches[0]
+        comp_hash, nsites, vol_per_site, nn_dists, skew = key
+        c = self._db.execute(
+            "INSERT INTO structures (comp_hash, nsites, vol_per_site, "
+            "nn_dists, skew, structure, data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (comp_hash, nsites, vol_per_site, nn_dists.tobytes(), skew,
+             json.dumps(s.as_dict(), cls=MontyEncoder),
+             json.dumps(data, cls=MontyEncoder)))
+        return c.lastrowid
+
+    def get_structure(self, i):
+        """
+        Args:
+            i (int): id of a stored structure.
+
+        Returns:
+            The stored (reduced) structure.
+        """
+        return Structure.from_dict(json.loads(self._get_row(i, "structure")))
+
+    def get_data(self, i):
+        """
+        Args:
+            i (int): id of a stored structure.
+
+        Returns:
+            The data stored along with the structure.
+        """
+        return json.loads(self._get_row(i, "data"))
+
+    def _get_row(self, i, column):
+        row = self._db.execute("SELECT %s FROM structures WHERE id=?" % column,
+                               (i,)).fetchone()
+        if row is None:
+            raise KeyError(i)
+        return row[0]
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM structures").fetchone()[0]
+
+    def close(self):
+        """
+        Closes the underlying database.
+        """
+        self._db.close()
+
+    def __getstate__(self):
+        # A sqlite3 connection cannot be pickled, so only the filename is
+        # kept and the database is reopened on unpickling. An in-memory
+        # database has no file to reopen, so its contents are dumped.
+        d = self.__dict__.copy()
+        del d["_db"]
+        if self.filename == ":memory:":
+            d["_dump"] = "\n".join(self._db.iterdump())
+        return d
+
+    def __setstate__(self, d):
+        dump = d.pop("_dump", None)
+        self.__dict__.update(d)
+        self._db = sqlite3.connect(self.filename)
+        if dump is not None:
+            self._db.executescript(dump)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -9,6 +9,10 @@ This module provides classes to perform fitting of structures.
 import numpy as np
 import itertools
 import abc
+import logging
+import os
+from functools import partial
+from multiprocessing import Pool
 
 from monty.json import MSONable
 from pymatgen.core import PeriodicSite
@@ -31,6 +35,8 @@ __email__ = "wrichard@mit.edu"
 __status__ = "Production"
 __date__ = "Dec 3, 2012"
 
+logger = logging.getLogger(__name__)
+
 
 class AbstractComparator(MSONable, metaclass=abc.ABCMeta):
     """
@@ -395,6 +401,10 @@ class StructureMatcher(MSONable):
         self._subset = allow_subset
         self._ignored_species = [] if ignored_species is None else \
             ignored_species[:]
+        # Numbers of fits performed and avoided by fingerprint screening in
+        # the last call of group_structures.
+        self.nfits_performed = 0
+        self.nfits_avoided = 0
 
     def _get_supercell_size(self, s1, s2):
         """
@@ -571,7 +581,8 @@ class StructureMatcher(MSONable):
             inds = inds[::fu]
         return np.array(mask, dtype=np.int_), inds, i
 
-    def fit(self, struct1, struct2, symmetric=False):
+    def fit(self, struct1, struct2, symmetric=False,
+            skip_structure_reduction=False):
         """
         Fit two structures.
 
@@ -581,6 +592,10 @@ class StructureMatcher(MSONable):
             symmetric (Bool): Defaults to False
                 If True, check the equality both ways.
                 This only impacts a small percentage of structures
+            skip_structure_reduction (bool): Defaults to False
+                If True, the niggli and primitive cell reductions are
+                skipped, i.e. the structures are assumed to have been
+                reduced already with _get_reduced_structure.
 
         Returns:
             True or False.
@@ -592,7 +607,9 @@ class StructureMatcher(MSONable):
             return None
 
         if not symmetric:
-            struct1, struct2, fu, s1_supercell = self._preprocess(struct1, struct2)
+            struct1, struct2, fu, s1_supercell = self._preprocess(
+                struct1, struct2,
+                skip_structure_reduction=skip_structure_reduction)
             match = self._match(struct1, struct2, fu, s1_supercell,
                                 break_on_match=True)
             if match is None:
@@ -600,11 +617,15 @@ class StructureMatcher(MSONable):
             else:
                 return match[0] <= self.stol
         else:
-            struct1, struct2, fu, s1_supercell = self._preprocess(struct1, struct2)
+            struct1, struct2, fu, s1_supercell = self._preprocess(
+                struct1, struct2,
+                skip_structure_reduction=skip_structure_reduction)
             match1 = self._match(struct1, struct2, fu, s1_supercell,
                                  break_on_match=True)
             struct1, struct2 = struct2, struct1
-            struct1, struct2, fu, s1_supercell = self._preprocess(struct1, struct2)
+            struct1, struct2, fu, s1_supercell = self._preprocess(
+                struct1, struct2,
+                skip_structure_reduction=skip_structure_reduction)
             match2 = self._match(struct1, struct2, fu, s1_supercell,
                                  break_on_match=True)
 
@@ -648,7 +669,21 @@ class StructureMatcher(MSONable):
             copied_structures.append(ss)
         return copied_structures
 
-    def _preprocess(self, struct1, struct2, niggli=True):
+    def _get_reduced_structure(self, struct, niggli=True):
+        """
+        Returns the niggli reduced and (if primitive_cell is True) primitive
+        version of a structure, as used for matching.
+        """
+        if niggli:
+            struct = struct.get_reduced_structure(reduction_algo="niggli")
+
+        # primitive cell transformation
+        if self._primitive_cell:
+            struct = struct.get_primitive_structure()
+        return struct
+
+    def _preprocess(self, struct1, struct2, niggli=True,
+                    skip_structure_reduction=False):
         """
         Rescales, finds the reduced structures (primitive and niggli),
         and finds fu, the supercell size to make struct1 comparable to
@@ -657,14 +692,9 @@ class StructureMatcher(MSONable):
         struct1 = struct1.copy()
         struct2 = struct2.copy()
 
-        if niggli:
-            struct1 = struct1.get_reduced_structure(reduction_algo="niggli")
-            struct2 = struct2.get_reduced_structure(reduction_algo="niggli")
-
-        # primitive cell transformation
-        if self._primitive_cell:
-            struct1 = struct1.get_primitive_structure()
-            struct2 = struct2.get_primitive_structure()
+        if not skip_structure_reduction:
+            struct1 = self._get_reduced_structure(struct1, niggli)
+            struct2 = self._get_reduced_structure(struct2, niggli)
 
         if self._supercell:
             fu, s1_supercell = self._get_supercell_size(struct1, struct2)
@@ -760,14 +790,129 @@ class StructureMatcher(MSONable):
         if best_match and best_match[0] < self.stol:
             return best_match
 
-    def group_structures(self, s_list, anonymous=False):
+    def _get_fingerprint(self, struct):
+        """
+        Cheap invariants of a reduced structure used to screen out pairs of
+        structures that cannot possibly match. Returns the number of sites,
+        the volume per site, the sorted nearest neighbor distance of every
+        site in units of the average free length per atom, and the skewness
+        sum(a_i / d_i) of the lattice, where d_i is the spacing of the
+        lattice planes spanned by the two other lattice vectors.
+        """
+        nsites = len(struct)
+        lattice = struct.lattice
+        skew = np.dot(lattice.abc,
+                      lattice.reciprocal_lattice_crystallographic.abc)
+        if nsites == 0:
+            return 0, struct.volume, np.zeros(0), skew
+        vol_per_site = struct.volume / nsites
+        # every site has a periodic image within the shortest cell length,
+        # so this radius always finds the nearest neighbor
+        r = min(lattice.abc) + 1e-8
+        centers, _, _, dists = struct.get_neighbor_list(r)
+        nn_dists = np.full(nsites, r)
+        np.minimum.at(nn_dists, centers[dists > 1e-8], dists[dists > 1e-8])
+        nn_dists = np.sort(nn_dists) / vol_per_site ** (1 / 3)
+        return nsites, vol_per_site, nn_dists, skew
+
+    def _fingerprints_compatible(self, fp1, fp2):
+        """
+        Checks whether two fingerprints from _get_fingerprint are within the
+        tolerances of the matcher. This only rejects pairs that fit would
+        reject as well.
+
+        fit maps the lattice of one structure onto the other with lengths
+        within a factor of 1 + ltol and angles within angle_tol. Every entry
+        of the metric tensor then changes by at most eta = (1 + ltol) ** 2 *
+        (1 + angle_tol) - 1 times the product of the two lengths, and the
+        fractional coordinates of a vector v are bounded by |v| / d_i, so
+        the squared length of any vector changes by at most a factor of
+        1 +/- eta * skew ** 2. On top of that, fit accepts a mapping only if
+        no site is further than stol from its image, in units of the
+        average free length per atom. If the lattice bound is not below 1,
+        nothing can be screened out.
+
+        If attempt_supercell is True, this always returns True, i.e. no pair
+        is screened out, since a structure can match a supercell of another
+        one with a different number of sites and different nearest neighbor
+        distances after scaling.
+        """
+        if self._supercell:
+            return True
+        if fp1[0] != fp2[0]:
+            return False
+        if fp1[0] == 0:
+            return True
+        eta = (1 + self.ltol) ** 2 * (1 + np.radians(self.angle_tol)) - 1
+        strain = eta * max(fp1[3], fp2[3]) ** 2
+        if strain >= 1:
+            return True
+        if not self._scale:
+            ratio = fp1[1] / fp2[1]
+            if not (1 - strain) ** 1.5 <= ratio <= (1 + strain) ** 1.5:
+                return False
+        # bound on the ratio of nearest neighbor distances from the lattice
+        # distortion, and on their difference from the displacement of the
+        # two sites of each pair
+        rho = ((1 + strain) / (1 - strain)) ** 0.5
+        tol = 2 * self.stol * rho
+        return bool(np.all(fp1[2] <= rho * (fp2[2] + tol)) and
+                    np.all(fp2[2] <= rho * (fp1[2] + tol)))
+
+    def get_fingerprint(self, structure):
+        """
+        Reduces a structure as fit does and computes the invariants used to
+        screen out pairs of structures that cannot match, e.g. for an index
+        of known structures.
+
+        Args:
+            structure (Structure): Input structure.
+
+        Returns:
+            (reduced structure, fingerprint). The reduced structures can be
+            compared with fit(..., skip_structure_reduction=True), and the
+            fingerprints with fingerprints_compatible. The fingerprint is a
+            tuple (composition hash, number of sites, volume per site, sorted
+            nearest neighbor distances, lattice skewness).
+        """
+        if self._subset:
+            raise ValueError("allow_subset cannot be used with fingerprints")
+        s = self._get_reduced_structure(self._process_species([structure])[0])
+        comp_hash = str(self._comparator.get_hash(s.composition))
+        return s, (comp_hash,) + self._get_fingerprint(s)
+
+    def fingerprints_compatible(self, fp1, fp2):
+        """
+        Checks whether two structures can match from their fingerprints.
+
+        Args:
+            fp1, fp2: Fingerprints from get_fingerprint.
+
+        Returns:
+            False if fit rejects the two structures for sure, True otherwise.
+        """
+        return fp1[0] == fp2[0] and \
+            self._fingerprints_compatible(fp1[1:], fp2[1:])
+
+    def group_structures(self, s_list, anonymous=False, n_jobs=1):
         """
         Given a list of structures, use fit to group
         them by structural equality.
 
+        Each structure is reduced only once, and pairs of structures whose
+        cheap invariants (number of sites in the reduced cell, volume per
+        site if scale is False and sorted nearest neighbor distances) are
+        incompatible within the tolerances are never fitted. The numbers of
+        fits performed and avoided are stored in the nfits_performed and
+        nfits_avoided attributes, and logged at the INFO level. No fit is
+        avoided if attempt_supercell is True.
+
         Args:
             s_list ([Structure]): List of structures to be grouped
             anonymous (bool): Wheher to use anonymous mode.
+            n_jobs (int): Number of processes used to fit a reference
+                structure against the remaining candidates. Defaults to 1,
+                i.e. no multiprocessing. -1 uses all the cores.
 
         Returns:
             A list of lists of matched structures
@@ -780,38 +925,62 @@ class StructureMatcher(MSONable):
 
         original_s_list = list(s_list)
         s_list = self._process_species(s_list)
+        # Reduce the structures and compute their fingerprints only once
+        s_list = [self._get_reduced_structure(s) for s in s_list]
+        fingerprints = [self._get_fingerprint(s) for s in s_list]
 
         # Use structure hash to pre-group structures
         if anonymous:
             def c_hash(c):
                 return c.anonymized_formula
+            fit = partial(self.fit_anonymous, skip_structure_reduction=True)
         else:
             c_hash = self._comparator.get_hash
+            fit = partial(self.fit, skip_structure_reduction=True)
 
         def s_hash(s):
             return c_hash(s[1].composition)
 
         sorted_s_list = sorted(enumerate(s_list), key=s_hash)
         all_groups = []
-
-        # For each pre-grouped list of structures, perform actual matching.
-        for k, g in itertools.groupby(sorted_s_list, key=s_hash):
-            unmatched = list(g)
-            while len(unmatched) > 0:
-                i, refs = unmatched.pop(0)
-                matches = [i]
-                if anonymous:
-                    inds = filter(lambda i: self.fit_anonymous(refs,
-                                                               unmatched[i][1]), list(range(len(unmatched))))
-                else:
-                    inds = filter(lambda i: self.fit(refs, unmatched[i][1]),
-                                  list(range(len(unmatched))))
-                inds = list(inds)
-                matches.extend([unmatched[i][0] for i in inds])
-                unmatched = [unmatched[i] for i in range(len(unmatched))
-                             if i not in inds]
-                all_groups.append([original_s_list[i] for i in matches])
-
+        nfits = 0
+        nskipped = 0
+
+        if n_jobs == -1:
+            n_jobs = os.cpu_count() or 1
+        pool = Pool(n_jobs) if n_jobs > 1 else None
+        try:
+            # For each pre-grouped list of structures, perform actual matching.
+            for k, g in itertools.groupby(sorted_s_list, key=s_hash):
+                unmatched = list(g)
+                while len(unmatched) > 0:
+                    i, refs = unmatched.pop(0)
+                    matches = [i]
+                    candidates = [
+                        j for j in range(len(unmatched))
+                        if self._fingerprints_compatible(
+                            fingerprints[i], fingerprints[unmatched[j][0]])]
+                    nfits += len(candidates)
+                    nskipped += len(unmatched) - len(candidates)
+                    args = [(refs, unmatched[j][1]) for j in candidates]
+                    if pool is not None and len(args) > 1:
+                        fitted = pool.starmap(fit, args)
+                    else:
+                        fitted = [fit(*a) for a in args]
+                    inds = set(j for j, f in zip(candidates, fitted) if f)
+                    matches.extend([unmatched[j][0] for j in sorted(inds)])
+                    unmatched = [unmatched[j] for j in range(len(unmatched))
+                                 if j not in inds]
+                    all_groups.append([original_s_list[j] for j in matches])
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        self.nfits_performed = nfits
+        self.nfits_avoided = nskipped
+        logger.info("group_structures: %d fits performed, %d fits avoided by "
+                    "fingerprint screening" % (nfits, nskipped))
         return all_groups
 
     def as_dict(self):
@@ -976,7 +1145,8 @@ class StructureMatcher(MSONable):
             else:
                 return [m[0] for m in matches]
 
-    def fit_anonymous(self, struct1, struct2, niggli=True):
+    def fit_anonymous(self, struct1, struct2, niggli=True,
+                      skip_structure_reduction=False):
         """
         Performs an anonymous fitting, which allows distinct species in one
         structure to map to another. E.g., to compare if the Li2O and Na2O
@@ -985,13 +1155,17 @@ class StructureMatcher(MSONable):
         Args:
             struct1 (Structure): 1st structure
             struct2 (Structure): 2nd structure
+            skip_structure_reduction (bool): If True, the structures are
+                assumed to have been reduced already with
+                _get_reduced_structure.
 
         Returns:
             True/False: Whether a species mapping can map struct1 to stuct2
         """
         struct1, struct2 = self._process_species([struct1, struct2])
-        struct1, struct2, fu, s1_supercell = self._preprocess(struct1, struct2,
-                                                              niggli)
+        struct1, struct2, fu, s1_supercell = self._preprocess(
+            struct1, struct2, niggli,
+            skip_structure_reduction=skip_structure_reduction)
 
         matches = self._anonymous_match(struct1, struct2, fu, s1_supercell,
                                         break_on_match=True, single_match=True)
@@ -304,6 +304,89 @@ class DiffusionAnalyzerTest(PymatgenTest):
             self.assertArrayAlmostEqual(data[:, -1], d.mscd)
             os.remove("test.csv")
 
+    def test_block_averaged_diffusivity(self):
+        with open(os.path.join(test_dir, "DiffusionAnalyzer.json")) as f:
+            d = DiffusionAnalyzer.from_dict(json.load(f))
+        diffusivity, std_err = d.get_block_averaged_diffusivity(nblocks=2)
+        blocks = [DiffusionAnalyzer(d.structure, d.disp[:, i:i + 500] - d.disp[:, i][:, None],
+                                    d.specie, d.temperature, d.time_step,
+                                    d.step_skip).diffusivity
+                  for i in [0, 500]]
+        self.assertAlmostEqual(diffusivity, np.mean(blocks))
+        self.assertAlmostEqual(std_err, abs(blocks[0] - blocks[1]) / 2)
+        self.assertRaises(ValueError, d.get_block_averaged_diffusivity, 1)
+        self.assertRaises(ValueError, d.get_block_averaged_diffusivity, 20)
+
+    def test_block_averaged_diffusivity_NPT(self):
+        from pymatgen import Structure, Lattice
+        np.random.seed(0)
+        structures = []
+        coords = np.array([[0.0, 0.0, 0.0], [0.5, 0.5, 0.5]])
+        for i in range(40):
+            coords[1] += np.random.normal(0, 0.05, 3)
+            lattice = Lattice.cubic(2.0 + 0.01 * i)
+            structures.append(Structure(lattice, ['F', 'Li'], coords))
+        d = DiffusionAnalyzer.from_structures(structures, 'Li', 500, 2, 1,
+                                              smoothed=False)
+        self.assertEqual(len(d.lattices), 41)
+        diffusivity, std_err = d.get_block_averaged_diffusivity(nblocks=2)
+        blocks = d._get_blocks(2)
+        for block, start in zip(blocks, [0, 20]):
+            # the lattice of each step of a block is the one of its structure
+            self.assertArrayAlmostEqual(
+                block.lattices[1:],
+                [s.lattice.matrix for s in structures[start:start + 20]])
+            self.assertArrayAlmostEqual(
+                block.disp, d.disp[:, start:start + 20] - d.disp[:, start][:, None])
+        self.assertAlmostEqual(diffusivity,
+                               np.mean([b.diffusivity for b in blocks]))
+
+    def test_from_xdatcars(self):
+        from pymatgen.io.vasp.outputs import Xdatcar
+        filepath = os.path.join(test_dir, "Traj_XDATCAR")
+        structures = Xdatcar(filepath).structures
+        d1 = DiffusionAnalyzer.from_structures(structures, "Li", 1000, 2, 1, smoothed=False)
+        d2 = DiffusionAnalyzer.from_xdatcars([filepath], "Li", 1000, 2, 1, smoothed=False)
+        self.assertArrayAlmostEqual(d1.disp, d2.disp)
+        self.assertArrayAlmostEqual(d1.lattices, d2.lattices)
+        self.assertAlmostEqual(d1.diffusivity, d2.diffusivity)
+        self.assertEqual(d1.structure, d2.structure)
+
+        # Runs split over several files.
+        with ScratchDir("."):
+            with open(filepath) as f:
+                lines = f.readlines()
+            split = lines.index("Direct configuration=     51\n")
+            with open("XDATCAR_1", "w") as f:
+                f.writelines(lines[:split])
+            with open("XDATCAR_2", "w") as f:
+                f.writelines(lines[:7] + lines[split:])
+            d3 = DiffusionAnalyzer.from_xdatcars(["XDATCAR_1", "XDATCAR_2"], "Li", 1000, 2, 1,
+                                                 smoothed=False)
+        self.assertArrayAlmostEqual(d1.disp, d3.disp)
+
+    def test_from_files(self):
+        from pymatgen.io.vasp.outputs import Vasprun
+        filepath = os.path.join(test_dir, "vasprun.xml.unconverged")
+        # The 5 ionic steps of the second run start at an offset of 1 with
+        # step_skip=2. With multiprocessing, every run starts at offset 0.
+        for filepaths, ncores, offsets in [([filepath], None, [0]),
+                                           ([filepath] * 2, None, [0, 1]),
+                                           ([filepath] * 2, 2, [0, 0])]:
+            vaspruns = [Vasprun(filepath, ionic_step_skip=2,
+                                ionic_step_offset=offset, parse_dos=False,
+                                parse_eigen=False) for offset in offsets]
+            d1 = DiffusionAnalyzer.from_vaspruns(vaspruns, "O", smoothed=False, min_obs=1)
+            d2 = DiffusionAnalyzer.from_files(filepaths, "O", step_skip=2, ncores=ncores,
+                                              smoothed=False, min_obs=1)
+            self.assertArrayAlmostEqual(d1.disp, d2.disp)
+            self.assertArrayAlmostEqual(d1.lattices, d2.lattices)
+            self.assertAlmostEqual(d1.diffusivity, d2.diffusivity)
+            self.assertEqual(d1.structure, d2.structure)
+            self.assertEqual(d2.step_skip, 2)
+            self.assertEqual(d2.time_step, vaspruns[0].parameters["POTIM"])
+            self.assertEqual(d2.temperature, vaspruns[0].parameters["TEEND"])
+
     def test_from_structure_NPT(self):
         from pymatgen import Structure, Lattice
         coords1 = np.array([[0.0, 0.0, 0.0], [0.5, 0.5, 0.5]])
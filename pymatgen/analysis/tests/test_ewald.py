@@ -7,8 +7,10 @@ import unittest
 import os
 import warnings
 
-from pymatgen.analysis.ewald import EwaldSummation, EwaldMinimizer
+from pymatgen.analysis.ewald import EwaldSummation, EwaldMinimizer, \
+    EwaldMonteCarloMinimizer
 from pymatgen.io.vasp.inputs import Poscar
+from pymatgen.core.periodic_table import Specie
 import numpy as np
 
 test_dir = os.path.join(os.path.dirname(__file__), "..", "..", "..",
@@ -39,6 +41,8 @@ class EwaldSummationTest(unittest.TestCase):
         self.assertAlmostEqual(ham.forces[0, 0], -1.98818620e-01, 4)
         self.assertAlmostEqual(sum(sum(abs(ham.forces))), 915.925354346, 4,
                                "Forces incorrect")
+        # the real space neighbor list is not cached on the structure
+        self.assertIsNone(s._neighbor_list_cache)
         self.assertAlmostEqual(sum(sum(ham.real_space_energy_matrix)),
                                ham.real_space_energy, 4)
         self.assertAlmostEqual(sum(sum(ham.reciprocal_space_energy_matrix)),
@@ -65,6 +69,57 @@ class EwaldSummationTest(unittest.TestCase):
         ham2 = EwaldSummation(original_s)
         self.assertAlmostEqual(ham2.real_space_energy, -502.23549897772602, 4)
 
+    def test_update_charges(self):
+        filepath = os.path.join(test_dir, 'POSCAR')
+        p = Poscar.from_file(filepath, check_for_POTCAR=False)
+        s = p.structure
+        s.add_oxidation_state_by_element({"Li": 1, "Fe": 2,
+                                          "P": 5, "O": -2})
+        ham = EwaldSummation(s)
+
+        # Neutralize two Li and change a Fe2+ to Fe3+.
+        indices = [0, 1, 4]
+        new_species = [Specie("Li", 0), Specie("Li", 0), Specie("Fe", 3)]
+        s2 = s.copy()
+        for i, sp in zip(indices, new_species):
+            s2.replace(i, sp)
+        ref = EwaldSummation(s2, eta=ham.eta)
+
+        delta = ham.compute_energy_change(indices, [0, 0, 3])
+        self.assertAlmostEqual(ham.total_energy + delta, ref.total_energy, 6)
+        ham.update_charges(indices, [0, 0, 3])
+        self.assertAlmostEqual(ham.total_energy, ref.total_energy, 6)
+        self.assertAlmostEqual(ham.real_space_energy, ref.real_space_energy, 6)
+        self.assertAlmostEqual(ham.reciprocal_space_energy,
+                               ref.reciprocal_space_energy, 6)
+        self.assertTrue(np.allclose(ham.total_energy_matrix,
+                                    ref.total_energy_matrix))
+
+        # Restore a neutralized site.
+        ham.update_charges([0], [1])
+        s2.replace(0, Specie("Li", 1))
+        ref = EwaldSummation(s2, eta=ham.eta)
+        self.assertAlmostEqual(ham.total_energy, ref.total_energy, 6)
+        self.assertRaises(ValueError, EwaldSummation(s, compute_forces=True).update_charges, [0], [0])
+
+    def test_compute_sub_structure_uncharged(self):
+        filepath = os.path.join(test_dir, 'POSCAR')
+        p = Poscar.from_file(filepath, check_for_POTCAR=False)
+        s = p.structure
+        s.add_oxidation_state_by_element({"Li": 1, "Fe": 2,
+                                          "P": 5, "O": -2})
+        ham = EwaldSummation(s)
+        ref = np.sum(ham.total_energy_matrix)
+        self.assertAlmostEqual(ham.compute_sub_structure(s), ref, 6)
+        # Sites neutralized by update_charges are recharged by the
+        # substructure, so the energy of s is recovered.
+        ham.update_charges([0, 4], [0, 0])
+        self.assertAlmostEqual(ham.compute_sub_structure(s), ref, 6)
+        s2 = s.copy()
+        s2.remove_sites([1])
+        ref2 = np.sum(EwaldSummation(s2, eta=ham.eta).total_energy_matrix)
+        self.assertAlmostEqual(ham.compute_sub_structure(s2), ref2, 6)
+
 
 class EwaldMinimizerTest(unittest.TestCase):
     def setUp(self):
@@ -95,6 +150,29 @@ class EwaldMinimizerTest(unittest.TestCase):
                                "Returned wrong minimum value")
         self.assertEqual(len(e_min.best_m_list), 6,
                          "Returned wrong number of permutations")
+        self.assertEqual(len(m_list[0][2]), 5)
+        self.assertGreater(e_min.nodes_visited, e_min.nodes_pruned)
+        self.assertGreaterEqual(e_min.pruning_rate, 0)
+
+    def test_parallel(self):
+        matrix = np.random.RandomState(0).uniform(-5, 15, (16, 16))
+        m_list = [[.5, 4, list(range(8)), 'a'], [0, 3, list(range(6, 16)),
+                                                 None]]
+        serial = EwaldMinimizer(matrix, m_list, 5)
+        parallel = EwaldMinimizer(matrix, m_list, 5, ncores=2)
+        self.assertEqual(len(parallel.output_lists), 5)
+        for o1, o2 in zip(serial.output_lists, parallel.output_lists):
+            self.assertAlmostEqual(o1[0], o2[0])
+        self.assertAlmostEqual(serial.minimized_sum,
+                               EwaldMinimizer(matrix, m_list, 1,
+                                              ncores=2).minimized_sum)
+        # best first searches are run serially
+        serial = EwaldMinimizer(matrix, m_list, 5,
+                                EwaldMinimizer.ALGO_BEST_FIRST)
+        parallel = EwaldMinimizer(matrix, m_list, 5,
+                                  EwaldMinimizer.ALGO_BEST_FIRST, ncores=2)
+        self.assertEqual(serial.output_lists, parallel.output_lists)
+        self.assertEqual(serial.nodes_visited, parallel.nodes_visited)
 
     def test_site(self):
         """Test that uses an uncharged structure"""
@@ -112,5 +190,40 @@ class EwaldMinimizerTest(unittest.TestCase):
         self.assertAlmostEquals(-27.2978, ham.get_site_energy(8), 3)
 
 
+class EwaldMonteCarloMinimizerTest(unittest.TestCase):
+
+    def test_init(self):
+        matrix = np.random.RandomState(0).uniform(-5, 15, (16, 16))
+        m_list = [[.5, 3, list(range(8)), 'a'], [0, 2, list(range(8)), None],
+                  [-1, 3, list(range(8, 16)), 'b']]
+        e_min = EwaldMinimizer(matrix, m_list, 3)
+        mc = EwaldMonteCarloMinimizer(matrix, m_list, 3, n_steps=5000,
+                                      n_replicas=2, seed=0)
+        self.assertEqual(len(mc.output_lists), 3)
+        self.assertAlmostEqual(mc.minimized_sum, e_min.minimized_sum)
+        self.assertEqual(sorted(mc.best_m_list),
+                         sorted(e_min.best_m_list))
+        energies = [o[0] for o in mc.output_lists]
+        self.assertEqual(energies, sorted(energies))
+
+        # The energies are those of the orderings.
+        matrix = (matrix + matrix.T) / 2
+        scales = {'a': .5, None: 0, 'b': -1}
+        for energy, m in mc.output_lists:
+            s = np.ones(16)
+            for i, sp in m:
+                s[i] = scales[sp]
+            self.assertAlmostEqual(energy, np.dot(s, np.dot(matrix, s)))
+
+        parallel = EwaldMonteCarloMinimizer(matrix, m_list, 3, n_steps=5000,
+                                            n_replicas=2, seed=0, ncores=2)
+        self.assertEqual(parallel.output_lists, mc.output_lists)
+
+        self.assertRaises(ValueError, EwaldMonteCarloMinimizer, matrix,
+                          [[0, 2, [0, 1, 2], None], [0, 1, [2, 3], None]])
+        self.assertRaises(ValueError, EwaldMonteCarloMinimizer, matrix,
+                          [[0, 4, [0, 1, 2], None]])
+
+
 if __name__ == "__main__":
     unittest.main()
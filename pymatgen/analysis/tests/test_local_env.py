@@ -18,6 +18,8 @@ from pymatgen.analysis.local_env import ValenceIonicRadiusEvaluator, \
     BrunnerNN_real, BrunnerNN_relative, EconNN, CrystalNN, CutOffDictNN, \
     Critic2NN, solid_angle
 from pymatgen import Element, Molecule, Structure, Lattice
+from pymatgen.core.structure import PeriodicNeighbor
+from pymatgen.core.sites import PeriodicSite
 from pymatgen.util.testing import PymatgenTest
 
 try:
@@ -256,6 +258,17 @@ class JmolNNTest(PymatgenTest):
         # Verify get_nn function works
         self.assertEqual(len(self.jmol_update.get_nn(s, 0)), 6)
 
+    def test_get_all_nn_info(self):
+        s = self.get_structure('LiFePO4')
+        # the bond lengths already include the tolerance
+        self.assertAlmostEqual(
+            self.jmol._get_search_cutoff(s),
+            max(self.jmol.get_max_bond_distance(el1.symbol, el2.symbol)
+                for el1 in s.composition for el2 in s.composition))
+        all_nn_info = self.jmol.get_all_nn_info(s)
+        self.assertEqual([len(nn) for nn in all_nn_info],
+                         [self.jmol.get_cn(s, i) for i in range(len(s))])
+
     def tearDown(self):
         del self.jmol
         del self.jmol_update
@@ -376,6 +389,19 @@ class MiniDistNNTest(PymatgenTest):
             ['Mo', 'S', 'S'], [[-1e-06, 1.842, 3.72], [1.595, 0.92, 5.29],
                                [1.595, 0.92, 2.155]], coords_are_cartesian=True)
 
+    def test_get_all_nn_info(self):
+        s = self.nacl * 2
+        for nn in [MinimumDistanceNN(), CutOffDictNN({("Na1+", "Cl1-"): 3}),
+                   BrunnerNN_real(), JmolNN()]:
+            all_nn_info = nn.get_all_nn_info(s)
+            self.assertIsNone(s._neighbor_list_cache)
+            for i in range(len(s)):
+                nn_info = nn.get_nn_info(s.copy(), i)
+                self.assertEqual(
+                    sorted((d["site_index"], d["image"]) for d in nn_info),
+                    sorted((d["site_index"], d["image"])
+                           for d in all_nn_info[i]))
+
     def test_all_nn_classes(self):
         self.assertAlmostEqual(MinimumDistanceNN(cutoff=5, get_all_sites=True).get_cn(
             self.cscl, 0), 14)
@@ -575,6 +601,33 @@ class NearNeighborTest(PymatgenTest):
                 self.assertEqual(nn_info[0]['site_index'], 1)
                 self.assertEqual(nn_info[0]['image'][0], 1)
 
+    def test_get_original_site(self):
+        s = self.diamond * 2
+        for nn in s.get_neighbors(s[3], 3):
+            self.assertTrue(nn.is_periodic_image(
+                s[NearNeighbors._get_original_site(s, nn)]))
+            site = PeriodicSite(nn.species, nn.frac_coords, nn.lattice)
+            self.assertEqual(NearNeighbors._get_original_site(s, site),
+                             nn.index)
+            self.assertEqual(NearNeighbors._get_image(s, site),
+                             NearNeighbors._get_image(s, nn))
+        # sites modified in place are found by the linear search
+        s.translate_sites([3], [0.1, 0, 0])
+        site = PeriodicSite(s[3].species, s[3].frac_coords + [1, 0, -1],
+                            s.lattice)
+        self.assertEqual(NearNeighbors._get_original_site(s, site), 3)
+        self.assertEqual(NearNeighbors._get_image(s, site), (1, 0, -1))
+        # and rebuilt if the site list is replaced
+        s._sites = s._sites[::-1]
+        self.assertEqual(NearNeighbors._get_original_site(s, site),
+                         len(s) - 4)
+        # the index of a neighbor is only used if the species match
+        s[0] = "Si"
+        site = PeriodicNeighbor(s[1].species, s[0].frac_coords, s.lattice,
+                                index=0)
+        self.assertRaises(Exception, NearNeighbors._get_original_site, s,
+                          site)
+
     def tearDown(self):
         del self.diamond
 
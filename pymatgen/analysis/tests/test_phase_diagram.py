@@ -219,6 +219,16 @@ class PhaseDiagramTest(unittest.TestCase):
                 self.assertGreaterEqual(e_ah, 0)
                 self.assertTrue(isinstance(e_ah, Number))
 
+    def test_get_e_above_hulls(self):
+        e_ahs = self.pd.get_e_above_hulls(self.pd.all_entries)
+        for entry, e_ah in zip(self.pd.all_entries, e_ahs):
+            self.assertAlmostEqual(e_ah, self.pd.get_e_above_hull(entry))
+        low = PDEntry("Li2O", -100)
+        self.assertRaises(ValueError, self.pd.get_e_above_hulls, [low])
+        self.assertLess(self.pd.get_e_above_hulls([low], allow_negative=True)[0], 0)
+        self.assertRaises(ValueError, self.pd.get_e_above_hulls,
+                          [PDEntry("LiCl", 0)])
+
     def test_get_equilibrium_reaction_energy(self):
         for entry in self.pd.stable_entries:
             self.assertLessEqual(
@@ -300,6 +310,31 @@ class PhaseDiagramTest(unittest.TestCase):
             n_h_e = self.pd.get_hull_energy(entry.composition.fractional_composition)
             self.assertAlmostEqual(n_h_e, entry.energy_per_atom)
 
+    def test_get_hull_energies(self):
+        comps = [e.composition for e in self.pd.all_entries]
+        h_es = self.pd.get_hull_energies(comps)
+        for comp, h_e in zip(comps, h_es):
+            self.assertAlmostEqual(h_e, self.pd.get_hull_energy(comp))
+        # composition matrix in the order of pd.elements
+        amts = np.array([[comp[el] for el in self.pd.elements]
+                         for comp in comps])
+        np.testing.assert_array_almost_equal(
+            self.pd.get_hull_energies(amts), h_es)
+        self.assertRaises(ValueError, self.pd.get_hull_energies,
+                          np.ones((2, 2)))
+
+    def test_get_decompositions(self):
+        comps = [e.composition for e in self.pd.all_entries]
+        inds, amts = self.pd.get_decompositions(comps)
+        self.assertEqual(inds.shape, (len(comps), 3))
+        for comp, i, a in zip(comps, inds, amts):
+            decomp = self.pd.get_decomposition(comp)
+            self.assertEqual(len(decomp), np.count_nonzero(a))
+            for j, amt in zip(i, a):
+                if amt:
+                    self.assertAlmostEqual(
+                        decomp[self.pd.qhull_entries[j]], amt)
+
     def test_1d_pd(self):
         entry = PDEntry('H', 0)
         pd = PhaseDiagram([entry])
@@ -413,6 +448,46 @@ class PhaseDiagramTest(unittest.TestCase):
                          pd_roundtrip.all_entries[0].entry_id)
 
 
+class IncrementalPhaseDiagramTest(unittest.TestCase):
+    def setUp(self):
+        self.entries = list(EntrySet.from_csv(
+            str(module_dir / "pdentries_test.csv")))
+        self.pd = PhaseDiagram(self.entries)
+
+    def test_add_entry(self):
+        elements = [e for e in self.entries if e.is_element]
+        others = [e for e in self.entries if not e.is_element]
+        pd = IncrementalPhaseDiagram(elements)
+        for entry in others:
+            facets = pd.facets
+            e_ah = pd.add_entry(entry)
+            self.assertAlmostEqual(e_ah, pd.get_e_above_hull(entry))
+            if e_ah > 0:
+                # unstable entries do not trigger a hull recomputation
+                self.assertIs(pd.facets, facets)
+        self.assertEqual(len(pd.all_entries), len(self.entries))
+        self.assertEqual(
+            sorted(e.composition.reduced_formula for e in pd.stable_entries),
+            sorted(e.composition.reduced_formula
+                   for e in self.pd.stable_entries))
+        for entry in self.entries:
+            self.assertAlmostEqual(pd.get_e_above_hull(entry),
+                                   self.pd.get_e_above_hull(entry))
+
+    def test_remove_entry(self):
+        pd = IncrementalPhaseDiagram(self.entries)
+        unstable = pd.unstable_entries[0]
+        facets = pd.facets
+        pd.remove_entry(unstable)
+        self.assertIs(pd.facets, facets)
+        li2o = [e for e in pd.stable_entries
+                if e.composition.reduced_formula == "Li2O"][0]
+        pd.remove_entry(li2o)
+        self.assertNotIn(li2o, pd.stable_entries)
+        self.assertLess(pd.get_e_above_hulls([li2o],
+                                             allow_negative=True)[0], 0)
+
+
 class GrandPotentialPhaseDiagramTest(unittest.TestCase):
     def setUp(self):
         self.entries = EntrySet.from_csv(str(module_dir / "pdentries_test.csv"))
@@ -0,0 +1,92 @@
+# coding: utf-8
+# Copyright (c) Pymatgen Development Team.
+# Distributed under the terms of the MIT License.
+
+
+import unittest
+import os
+import json
+import pickle
+
+from monty.json import MontyDecoder
+from monty.tempfile import ScratchDir
+
+from pymatgen.analysis.structure_index import StructureIndex
+from pymatgen.analysis.structure_matcher import StructureMatcher
+from pymatgen.core import Lattice, Structure
+from pymatgen.util.testing import PymatgenTest
+
+test_dir = os.path.join(os.path.dirname(__file__), "..", "..", "..",
+                        'test_files')
+
+
+class StructureIndexTest(PymatgenTest):
+
+    def setUp(self):
+        with open(os.path.join(test_dir, "TiO2_entries.json"), 'r') as fp:
+            entries = json.load(fp, cls=MontyDecoder)
+        self.struct_list = [e.structure for e in entries]
+
+    def test_add_and_query(self):
+        sm = StructureMatcher()
+        index = StructureIndex(structure_matcher=sm)
+        ids = index.add_structures(self.struct_list, check=True)
+        groups = sm.group_structures(self.struct_list)
+        self.assertEqual(len(index), len(groups))
+        self.assertEqual(len(set(ids)), len(groups))
+        for s in self.struct_list:
+            self.assertIn(s, index)
+            matches = index.get_matches(s)
+            self.assertEqual(len(matches), 1)
+            self.assertTrue(sm.fit(index.get_structure(matches[0]), s))
+        self.assertNotIn(self.get_structure("Li2O"), index)
+
+    def test_large_displacement(self):
+        # a duplicate with one site moved by almost stol is found
+        sm = StructureMatcher(ltol=0.001, stol=0.3, angle_tol=0.01,
+                              primitive_cell=False)
+        s1 = Structure(Lattice.cubic(4), ["Na"] * 4 + ["Cl"] * 4,
+                       [[0, 0, 0], [0.5, 0.5, 0], [0.5, 0, 0.5],
+                        [0, 0.5, 0.5], [0.5, 0, 0], [0, 0.5, 0],
+                        [0, 0, 0.5], [0.5, 0.5, 0.5]])
+        s2 = s1.copy()
+        s2.translate_sites([0], [0.17, 0, 0])
+        index = StructureIndex(structure_matcher=sm)
+        i = index.add(s1)
+        self.assertEqual(index.add(s2, check=True), i)
+        self.assertEqual(len(index), 1)
+        index = StructureIndex(structure_matcher=StructureMatcher(
+            allow_subset=True))
+        self.assertRaises(ValueError, index.add, s1)
+
+    def test_persistence(self):
+        with ScratchDir("."):
+            with StructureIndex("index.sqlite") as index:
+                i = index.add(self.struct_list[0], data={"id": "mp-1"})
+            with StructureIndex("index.sqlite") as index:
+                self.assertEqual(len(index), 1)
+                self.assertEqual(index.get_data(i), {"id": "mp-1"})
+                self.assertEqual(index.get_matches(self.struct_list[0]), [i])
+                self.assertEqual(index.add(self.struct_list[0], check=True), i)
+                self.assertRaises(KeyError, index.get_structure, i + 1)
+            self.assertRaises(ValueError, StructureIndex, "index.sqlite",
+                              StructureMatcher(stol=0.1))
+
+    def test_pickle(self):
+        index = StructureIndex()
+        i = index.add(self.struct_list[0], data={"id": "mp-1"})
+        index2 = pickle.loads(pickle.dumps(index))
+        self.assertEqual(len(index2), 1)
+        self.assertEqual(index2.get_data(i), {"id": "mp-1"})
+        self.assertEqual(index2.get_matches(self.struct_list[0]), [i])
+        with ScratchDir("."):
+            with StructureIndex("index.sqlite") as index:
+                i = index.add(self.struct_list[0])
+                index2 = pickle.loads(pickle.dumps(index))
+            self.assertEqual(index2.filename, "index.sqlite")
+            self.assertEqual(index2.get_matches(self.struct_list[0]), [i])
+            index2.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
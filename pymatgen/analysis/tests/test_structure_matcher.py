@@ -317,6 +317,56 @@ class StructureMatcherTest(PymatgenTest):
         out = sm.group_structures(self.struct_list, anonymous=True)
         self.assertEqual(list(map(len, out)), [4, 1, 1, 1, 1, 1, 1, 1, 2, 2, 1])
 
+    def test_group_structures_screening(self):
+        sm = StructureMatcher()
+        with self.assertLogs("pymatgen.analysis.structure_matcher",
+                             level="INFO") as cm:
+            out = sm.group_structures(self.struct_list, n_jobs=2)
+        self.assertEqual(list(map(len, out)), [4, 1, 1, 1, 1, 1, 1, 1, 2, 2, 1])
+        self.assertIn("fits avoided", cm.output[0])
+        self.assertGreater(sm.nfits_avoided, 0)
+        n = len(self.struct_list)
+        self.assertLessEqual(sm.nfits_performed + sm.nfits_avoided,
+                             n * (n - 1) // 2)
+        self.assertEqual(list(map(len, sm.group_structures(
+            self.struct_list, n_jobs=-1))), list(map(len, out)))
+        # supercell matching does not screen out any pair
+        sm = StructureMatcher(attempt_supercell=True)
+        sm.group_structures(self.struct_list)
+        self.assertEqual(sm.nfits_avoided, 0)
+        self.assertGreater(sm.nfits_performed, 0)
+        # no pair rejected by the fingerprints can be fitted
+        fps = [sm._get_fingerprint(sm._get_reduced_structure(s))
+               for s in self.struct_list]
+        for i, j in itertools.combinations(range(len(fps)), 2):
+            if not sm._fingerprints_compatible(fps[i], fps[j]):
+                self.assertFalse(sm.fit(self.struct_list[i],
+                                        self.struct_list[j]))
+
+    def test_group_structures_screening_large_displacement(self):
+        # a single site moved by almost stol, with tight lattice tolerances
+        sm = StructureMatcher(ltol=0.001, stol=0.3, angle_tol=0.01,
+                              primitive_cell=False)
+        s1 = Structure(Lattice.cubic(4), ["Na"] * 4 + ["Cl"] * 4,
+                       [[0, 0, 0], [0.5, 0.5, 0], [0.5, 0, 0.5],
+                        [0, 0.5, 0.5], [0.5, 0, 0], [0, 0.5, 0],
+                        [0, 0, 0.5], [0.5, 0.5, 0.5]])
+        # the average free length per atom is 2 A, so 0.68 A is 0.34 of it
+        s2 = s1.copy()
+        s2.translate_sites([0], [0.17, 0, 0])
+        self.assertGreater(sm.get_rms_dist(s1, s2)[1], 0.29)
+        self.assertTrue(sm.fit(s1, s2))
+        fps = [sm._get_fingerprint(sm._get_reduced_structure(s))
+               for s in (s1, s2)]
+        self.assertTrue(sm._fingerprints_compatible(*fps))
+        self.assertEqual(list(map(len, sm.group_structures([s1, s2]))), [2])
+        # the screening is still effective with these tolerances
+        s3 = s1.copy()
+        s3.translate_sites([0], [0.4, 0, 0])
+        sm.group_structures([s1, s3])
+        self.assertEqual(sm.nfits_avoided, 1)
+        self.assertFalse(sm.fit(s1, s3))
+
     def test_mix(self):
         structures = [self.get_structure("Li2O"),
                       self.get_structure("Li2O2"),
@@ -18,8 +18,11 @@ __date__ = "Mar 18, 2012"
 
 
 import os
+import re
 import json
+import time
 import logging
+from functools import partial
 
 from monty.io import zopen
 from monty.json import MontyEncoder, MontyDecoder
@@ -102,6 +105,103 @@ class BorgQueen:
         for d in data:
             self._data.append(json.loads(d, cls=MontyDecoder))
 
+    def stream_assimilate(self, rootpath, output_dir, shard_size=1000,
+                          compress=True):
+        """
+        Assimilate the entire subdirectory structure in rootpath, writing the
+        results incrementally instead of keeping them in memory. Directory
+        discovery is overlapped with assimilation, and paths are handed out
+        to the drones as they become free.
+
+        The results are written as JSON lines of {"path": path, "data": data}
+        to shard files named assimilated_NNNNN.jsonl(.gz) in output_dir,
+        each holding at most shard_size results. The shards double as a
+        checkpoint: paths already present in output_dir (e.g., from an
+        interrupted run) are skipped. Paths for which the drone raised an
+        exception are not recorded, so they are retried on the next run.
+        Progress and throughput are logged as the assimilation runs. Use
+        load_shards to read the data back.
+
+        Args:
+            rootpath (str): Root directory to assimilate.
+            output_dir (str): Directory to write the shards to. Created if
+                it does not exist.
+            shard_size (int): Maximum number of results per shard.
+            compress (bool): Whether to gzip the shards.
+
+        Returns:
+            Number of paths assimilated in this run.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        done = set(path for path, _ in _iter_shard_records(output_dir))
+        shard_ids = [int(m.group(1)) for m in
+                     (_SHARD_PATTERN.match(f) for f in os.listdir(output_dir))
+                     if m]
+        shard_id = max(shard_ids) + 1 if shard_ids else 0
+        if done:
+            logger.info('{} paths already assimilated.'.format(len(done)))
+
+        def get_paths():
+            for (parent, subdirs, files) in os.walk(rootpath):
+                for path in self._drone.get_valid_paths((parent, subdirs,
+                                                         files)):
+                    if path not in done:
+                        yield path
+
+        func = partial(assimilate_path, self._drone)
+        if self._num_drones > 1:
+            pool = Pool(self._num_drones)
+            results = pool.imap_unordered(func, get_paths())
+        else:
+            pool = None
+            results = map(func, get_paths())
+
+        count = 0
+        f = None
+        nlines = 0
+        start = time.time()
+        try:
+            for line in results:
+                if line is None:
+                    continue
+                if f is None:
+                    fname = "assimilated_{:05d}.jsonl".format(shard_id)
+                    if compress:
+                        fname += ".gz"
+                    f = zopen(os.path.join(output_dir, fname), "wt")
+                    shard_id += 1
+                f.write(line + "\n")
+                nlines += 1
+                count += 1
+                if nlines == shard_size:
+                    f.close()
+                    f = None
+                    nlines = 0
+                if count % 100 == 0:
+                    logger.info('{} done ({:.2f} paths/s)'.format(
+                        count, count / (time.time() - start)))
+        finally:
+            if f is not None:
+                f.close()
+            if pool is not None:
+                pool.terminate()
+        logger.info('{} done ({:.2f} paths/s)'.format(
+            count, count / max(time.time() - start, 1e-8)))
+        return count
+
+    def load_shards(self, output_dir):
+        """
+        Load data assimilated by stream_assimilate. Paths for which the drone
+        returned None are omitted.
+
+        Args:
+            output_dir (str): Directory containing the shards.
+        """
+        self._data = []
+        for path, d in _iter_shard_records(output_dir):
+            if d is not None:
+                self._data.append(MontyDecoder().process_decoded(d))
+
     def get_data(self):
         """
         Returns an list of assimilated objects
@@ -141,3 +241,40 @@ def order_assimilation(args):
     total = status['total']
     logger.info('{}/{} ({:.2f}%) done'.format(count, total,
                                               count / total * 100))
+
+
+_SHARD_PATTERN = re.compile(r"assimilated_(\d+)\.jsonl(\.gz)?$")
+
+
+def _iter_shard_records(output_dir):
+    """
+    Iterates over the (path, data) records in the shards written by
+    BorgQueen.stream_assimilate. A truncated shard, e.g., from a crash, is
+    read up to the last complete record.
+    """
+    if not os.path.isdir(output_dir):
+        return
+    for fname in sorted(os.listdir(output_dir)):
+        if not _SHARD_PATTERN.match(fname):
+            continue
+        with zopen(os.path.join(output_dir, fname), "rt") as f:
+            try:
+                for line in f:
+                    record = json.loads(line)
+                    yield record["path"], record["data"]
+            except (ValueError, EOFError, OSError):
+                logger.warning("{} is truncated.".format(fname))
+
+
+def assimilate_path(drone, path):
+    """
+    Internal helper method for BorgQueen.stream_assimilate. Returns the
+    json-serialized record of the path and its data, or None if the drone
+    failed.
+    """
+    try:
+        return json.dumps({"path": path, "data": drone.assimilate(path)},
+                          cls=MontyEncoder)
+    except Exception as ex:
+        logger.warning("Failed to assimilate {}: {}".format(path, ex))
+        return None
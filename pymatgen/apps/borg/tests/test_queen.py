@@ -19,11 +19,14 @@ import unittest
 import os
 import warnings
 
+from monty.tempfile import ScratchDir
+
 from pymatgen.apps.borg.hive import VaspToComputedEntryDrone
 from pymatgen.apps.borg.queen import BorgQueen
 
 test_dir = os.path.join(os.path.dirname(__file__), "..", "..", "..", "..",
                         'test_files')
+test_dir = os.path.abspath(test_dir)
 
 
 class BorgQueenTest(unittest.TestCase):
@@ -45,6 +48,21 @@ class BorgQueenTest(unittest.TestCase):
         queen.load_data(os.path.join(test_dir, "assimilated.json"))
         self.assertEqual(len(queen.get_data()), 1)
 
+    def test_stream_assimilate(self):
+        drone = VaspToComputedEntryDrone()
+        queen = BorgQueen(drone)
+        data = [d for d in BorgQueen(drone, test_dir, 1).get_data() if d]
+        with ScratchDir("."):
+            n = queen.stream_assimilate(test_dir, "shards", shard_size=5)
+            self.assertGreaterEqual(n, len(data))
+            self.assertEqual(len(os.listdir("shards")), (n + 4) // 5)
+            # paths in existing shards are skipped
+            self.assertEqual(queen.stream_assimilate(test_dir, "shards"), 0)
+            os.remove(os.path.join("shards", "assimilated_00000.jsonl.gz"))
+            self.assertEqual(queen.stream_assimilate(test_dir, "shards"), 5)
+            queen.load_shards("shards")
+            self.assertEqual(len(queen.get_data()), len(data))
+
 
 if __name__ == "__main__":
     unittest.main()
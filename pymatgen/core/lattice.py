@@ -42,7 +42,8 @@ class Lattice(MSONable):
 
     # Properties lazily generated for efficiency.
 
-    def __init__(self, matrix: Union[List[float], List[List[float]], np.ndarray]):
+    def __init__(self, matrix: Union[List[float], List[List[float]], np.ndarray],
+                 pbc: Tuple[bool, bool, bool] = (True, True, True)):
         """
         Create a lattice from any sequence of 9 numbers. Note that the sequence
         is assumed to be read one row at a time. Each row represents one
@@ -58,7 +59,14 @@ class Lattice(MSONable):
                 Each row should correspond to a lattice vector.
                 E.g., [[10, 0, 0], [20, 10, 0], [0, 0, 30]] specifies a lattice
                 with lattice vectors [10, 0, 0], [20, 10, 0] and [0, 0, 30].
-        """
+            pbc: Whether the lattice is periodic along each of the three
+                lattice vectors. Neighbor searches do not consider periodic
+                images along non-periodic directions, e.g., the vacuum
+                direction of a slab. Defaults to (True, True, True).
+        """
+        if len(pbc) != 3:
+            raise ValueError("pbc must be a sequence of 3 booleans.")
+        self._pbc = tuple(bool(i) for i in pbc)
         m = np.array(matrix, dtype=np.float64).reshape((3, 3))
         m.setflags(write=False)
         self._matrix = m  # type: np.ndarray
@@ -89,6 +97,20 @@ class Lattice(MSONable):
         angles = np.arccos(angles) * 180.0 / pi
         return tuple(angles.tolist())  # type: ignore
 
+    @property
+    def pbc(self) -> Tuple[bool, bool, bool]:
+        """
+        :return: Whether the lattice is periodic along each lattice vector.
+        """
+        return self._pbc  # type: ignore
+
+    @property
+    def is_3d_periodic(self) -> bool:
+        """
+        :return: Whether the lattice is periodic along all lattice vectors.
+        """
+        return all(self._pbc)
+
     @property
     def is_orthogonal(self) -> bool:
         """
@@ -124,7 +146,7 @@ class Lattice(MSONable):
 
     def copy(self):
         """Deep copy of self."""
-        return self.__class__(self.matrix.copy())
+        return self.__class__(self.matrix.copy(), pbc=self.pbc)
 
     @property
     def matrix(self) -> np.ndarray:
@@ -320,6 +342,7 @@ class Lattice(MSONable):
             beta: float,
             gamma: float,
             vesta: bool = False,
+            pbc: Tuple[bool, bool, bool] = (True, True, True),
     ):
         """
         Create a Lattice using unit cell lengths and angles (in degrees).
@@ -332,6 +355,8 @@ class Lattice(MSONable):
             beta (float): *beta* angle in degrees.
             gamma (float): *gamma* angle in degrees.
             vesta: True if you import Cartesian coordinates from VESTA.
+            pbc: Whether the lattice is periodic along each of the three
+                lattice vectors. Defaults to fully periodic.
 
         Returns:
             Lattice with the specified lattice parameters.
@@ -363,7 +388,7 @@ class Lattice(MSONable):
             ]
             vector_c = [0.0, 0.0, float(c)]
 
-        return Lattice([vector_a, vector_b, vector_c])
+        return Lattice([vector_a, vector_b, vector_c], pbc=pbc)
 
     @classmethod
     def from_dict(cls, d: Dict, fmt: str = None, **kwargs):
@@ -386,7 +411,7 @@ class Lattice(MSONable):
             return lattice_from_abivars(cls=cls, **kwargs)
 
         if "matrix" in d:
-            return cls(d["matrix"])
+            return cls(d["matrix"], pbc=d.get("pbc", (True, True, True)))
         return cls.from_parameters(d["a"], d["b"], d["c"],
                                    d["alpha"], d["beta"], d["gamma"])
 
@@ -523,13 +548,15 @@ class Lattice(MSONable):
     def __eq__(self, other):
         """
         A lattice is considered to be equal to another if the internal matrix
-        representation satisfies np.allclose(matrix1, matrix2) to be True.
+        representation satisfies np.allclose(matrix1, matrix2) to be True and
+        the periodic boundary conditions are the same.
         """
         if other is None:
             return False
         # shortcut the np.allclose if the memory addresses are the same
         # (very common in Structure.from_sites)
-        return self is other or np.allclose(self.matrix, other.matrix)
+        return self is other or (np.allclose(self.matrix, other.matrix) and
+                                 self.pbc == getattr(other, "pbc", self.pbc))
 
     def __ne__(self, other):
         return not self.__eq__(other)
@@ -554,6 +581,8 @@ class Lattice(MSONable):
             "@class": self.__class__.__name__,
             "matrix": self._matrix.tolist(),
         }
+        if not self.is_3d_periodic:
+            d["pbc"] = self._pbc
         a, b, c, alpha, beta, gamma = self.parameters
         if verbosity > 0:
             d.update(
@@ -607,7 +636,10 @@ class Lattice(MSONable):
         lengths = other_lattice.lengths
         (alpha, beta, gamma) = other_lattice.angles
 
-        frac, dist, _, _ = self.get_points_in_sphere(
+        # The lattice points are searched along all three directions, the pbc
+        # of the lattice only apply to neighbor searches.
+        lattice = self if self.is_3d_periodic else Lattice(self.matrix)
+        frac, dist, _, _ = lattice.get_points_in_sphere(
             [[0, 0, 0]], [0, 0, 0], max(lengths) * (1 + ltol), zip_results=False
         )
         cart = self.get_cartesian_coords(frac)
@@ -958,7 +990,7 @@ class Lattice(MSONable):
 
         new_c = (new_volume / (geo_factor * np.prod(ratios))) ** (1 / 3.0)
 
-        return Lattice(versors * (new_c * ratios))
+        return Lattice(versors * (new_c * ratios), pbc=self.pbc)
 
     def get_wigner_seitz_cell(self) -> List[List[np.ndarray]]:
         """
@@ -1066,7 +1098,7 @@ class Lattice(MSONable):
         """
         Find all points within a sphere from the point taking into account
         periodic boundary conditions. This includes sites in other periodic
-        images.
+        images along the periodic directions of the lattice (see pbc).
 
         Algorithm:
 
@@ -1107,7 +1139,8 @@ class Lattice(MSONable):
             _, indices, images, distances = \
                 find_points_in_spheres(all_coords=cart_coords,
                                        center_coords=np.ascontiguousarray([center], dtype=float),
-                                       r=r, pbc=np.array([1, 1, 1]), lattice=lattice_matrix, tol=1e-8)
+                                       r=r, pbc=np.array(self.pbc, dtype=int), lattice=lattice_matrix,
+                                       tol=1e-8)
             if len(indices) < 1:
                 return [] if zip_results else [()] * 4
             fcoords = frac_points[indices] + images
@@ -1140,7 +1173,7 @@ class Lattice(MSONable):
         """
         Find all points within a sphere from the point taking into account
         periodic boundary conditions. This includes sites in other periodic
-        images.
+        images along the periodic directions of the lattice (see pbc).
 
         Algorithm:
 
@@ -1169,7 +1202,7 @@ class Lattice(MSONable):
                 fcoords, dists, inds, image
         """
         cart_coords = self.get_cartesian_coords(frac_points)
-        neighbors = get_points_in_spheres(all_coords=cart_coords, center_coords=np.array([center]), r=r, pbc=True,
+        neighbors = get_points_in_spheres(all_coords=cart_coords, center_coords=np.array([center]), r=r, pbc=self.pbc,
                                           numerical_tol=1e-8, lattice=self, return_fcoords=True)[0]
         if len(neighbors) < 1:
             return [] if zip_results else [()] * 4
@@ -1301,9 +1334,31 @@ class Lattice(MSONable):
             2d array of cartesian distances. E.g the distance between
             fcoords1[i] and fcoords2[j] is distances[i,j]
         """
-        v, d2 = pbc_shortest_vectors(self, fcoords1, fcoords2, return_d2=True)
+        v, d2 = self._get_shortest_vectors(fcoords1, fcoords2)
         return np.sqrt(d2)
 
+    def _get_shortest_vectors(self, fcoords1, fcoords2):
+        """
+        Returns the shortest vectors between two lists of fractional
+        coordinates and their squared lengths, as pbc_shortest_vectors, but
+        only taking periodic images along the periodic directions of the
+        lattice (see pbc).
+        """
+        if self.is_3d_periodic:
+            return pbc_shortest_vectors(self, fcoords1, fcoords2, return_d2=True)
+        fcoords1 = np.reshape(np.array(fcoords1, dtype=float), (-1, 3))
+        fcoords2 = np.reshape(np.array(fcoords2, dtype=float), (-1, 3))
+        pbc = np.array(self.pbc)
+        diff = fcoords2[None, :, :] - fcoords1[:, None, :]
+        diff[..., pbc] -= np.round(diff[..., pbc])
+        images = np.array(list(itertools.product(
+            *[(-1, 0, 1) if p else (0,) for p in self.pbc])))
+        vectors = np.dot(diff[:, :, None, :] + images, self._matrix)
+        d2 = np.sum(vectors ** 2, axis=-1)
+        best = np.argmin(d2, axis=-1)[..., None]
+        return (np.take_along_axis(vectors, best[..., None], axis=2)[:, :, 0],
+                np.take_along_axis(d2, best, axis=2)[:, :, 0])
+
     def is_hexagonal(
             self, hex_angle_tol: float = 5, hex_length_tol: float = 0.01
     ) -> bool:
@@ -1354,9 +1409,7 @@ class Lattice(MSONable):
             equal to distance.
         """
         if jimage is None:
-            v, d2 = pbc_shortest_vectors(
-                self, frac_coords1, frac_coords2, return_d2=True
-            )
+            v, d2 = self._get_shortest_vectors(frac_coords1, frac_coords2)
             fc = self.get_fractional_coords(v[0][0]) + frac_coords1 - frac_coords2
             fc = np.array(np.round(fc), dtype=np.int)
             return np.sqrt(d2[0, 0]), fc
@@ -47,6 +47,21 @@ __status__ = "Production"
 __date__ = "Sep 23, 2011"
 
 
+def _get_site_species(species):
+    """
+    Converts a species specification accepted by Site into a Composition,
+    with the same checks as Site.
+    """
+    if not isinstance(species, Composition):
+        try:
+            species = Composition({get_el_sp(species): 1})
+        except TypeError:
+            species = Composition(species)
+    if species.num_atoms > 1 + Composition.amount_tolerance:
+        raise ValueError("Species occupancies sum to more than 1!")
+    return species
+
+
 class Neighbor(Site):
     """
     Simple Site subclass to contain a neighboring atom that skips all the
@@ -681,23 +696,45 @@ class IStructure(SiteCollection, MSONable):
         else:
             self._lattice = Lattice(lattice)
 
+        # Convert all coordinates in one go. The sites hold views into this
+        # contiguous array.
+        coords = np.reshape(np.array(coords, dtype=np.float_), (-1, 3))
+        if coords_are_cartesian:
+            frac_coords = self._lattice.get_fractional_coords(coords)
+        else:
+            frac_coords = coords
+        if to_unit_cell:
+            frac_coords = np.mod(frac_coords, 1)
+
+        # Parse each distinct species only once. Compositions are immutable,
+        # so sites with the same species share the same object.
+        species_cache = {}  # type: Dict
         sites = []
         for i, sp in enumerate(species):
+            if isinstance(sp, Composition):
+                comp = _get_site_species(sp)
+            else:
+                try:
+                    comp = species_cache[sp]
+                except KeyError:
+                    comp = species_cache[sp] = _get_site_species(sp)
+                except TypeError:
+                    # unhashable, e.g. a dict of species and occupancies
+                    comp = _get_site_species(sp)
             prop = None
             if site_properties:
                 prop = {k: v[i]
                         for k, v in site_properties.items()}
 
             sites.append(
-                PeriodicSite(sp, coords[i], self._lattice,
-                             to_unit_cell,
-                             coords_are_cartesian=coords_are_cartesian,
-                             properties=prop))
+                PeriodicSite(comp, frac_coords[i], self._lattice,
+                             properties=prop, skip_checks=True))
         self._sites = tuple(sites)
         if validate_proximity and not self.is_valid():
             raise StructureError(("Structure contains sites that are ",
                                   "less than 0.01 Angstrom apart!"))
         self._charge = charge
+        self._neighbor_list_cache = None
 
     @classmethod
     def from_sites(cls,
@@ -975,6 +1012,15 @@ class IStructure(SiteCollection, MSONable):
         """
         return self._lattice
 
+    @property
+    def pbc(self):
+        """
+        Whether the structure is periodic along each lattice vector, as set
+        on its lattice. Neighbor searches only consider periodic images along
+        the periodic directions.
+        """
+        return self._lattice.pbc
+
     @property
     def density(self):
         """
@@ -1072,23 +1118,23 @@ class IStructure(SiteCollection, MSONable):
         scale_matrix = np.array(scaling_matrix, np.int16)
         if scale_matrix.shape != (3, 3):
             scale_matrix = np.array(scale_matrix * np.eye(3), np.int16)
-        new_lattice = Lattice(np.dot(scale_matrix, self._lattice.matrix))
+        new_lattice = Lattice(np.dot(scale_matrix, self._lattice.matrix),
+                              pbc=self._lattice.pbc)
 
         f_lat = lattice_points_in_supercell(scale_matrix)
         c_lat = new_lattice.get_cartesian_coords(f_lat)
 
-        new_sites = []
-        for site in self:
-            for v in c_lat:
-                s = PeriodicSite(
-                    site.species, site.coords + v,
-                    new_lattice, properties=site.properties,
-                    coords_are_cartesian=True, to_unit_cell=False,
-                    skip_checks=True)
-                new_sites.append(s)
+        # every site is repeated at all lattice points, site by site
+        nimages = len(c_lat)
+        cart_coords = self.cart_coords[:, None, :] + c_lat[None, :, :]
+        species = [site.species for site in self for _ in range(nimages)]
+        props = {k: [v for v in vals for _ in range(nimages)]
+                 for k, vals in self.site_properties.items()}
 
         new_charge = self._charge * np.linalg.det(scale_matrix) if self._charge else None
-        return Structure.from_sites(new_sites, charge=new_charge)
+        return Structure(new_lattice, species, cart_coords.reshape(-1, 3),
+                         charge=new_charge, coords_are_cartesian=True,
+                         site_properties=props)
 
     def __rmul__(self, scaling_matrix):
         """
@@ -1103,6 +1149,14 @@ class IStructure(SiteCollection, MSONable):
         """
         return np.array([site.frac_coords for site in self._sites])
 
+    @property
+    def cart_coords(self):
+        """
+        Returns a np.array of the cartesian coordinates of sites in the
+        structure.
+        """
+        return self._lattice.get_cartesian_coords(self.frac_coords)
+
     @property
     def volume(self):
         """
@@ -1163,7 +1217,9 @@ class IStructure(SiteCollection, MSONable):
             [(site, dist) ...] since most of the time, subsequent processing
             requires the distance.
         """
-        site_fcoords = np.mod(self.frac_coords, 1)
+        # only wrap the periodic directions into the unit cell
+        site_fcoords = self.frac_coords
+        site_fcoords = np.where(self.pbc, np.mod(site_fcoords, 1), site_fcoords)
         neighbors = []  # type: List[Tuple[PeriodicSite, float, Optional[int], Optional[Tuple[int]]]]
         for fcoord, dist, i, img in self._lattice.get_points_in_sphere(
                 site_fcoords, pt, r):
@@ -1272,7 +1328,8 @@ class IStructure(SiteCollection, MSONable):
     def get_neighbor_list(self, r: float,
                           sites: List[PeriodicSite] = None,
                           numerical_tol: float = 1e-8,
-                          exclude_self: bool = True) -> Tuple[np.ndarray, ...]:
+                          exclude_self: bool = True,
+                          use_cache: bool = False) -> Tuple[np.ndarray, ...]:
         """
         Get neighbor lists using numpy array representations without constructing
         Neighbor objects. If the cython extension is installed,  this method will
@@ -1296,13 +1353,39 @@ class IStructure(SiteCollection, MSONable):
                 ok in most instances.
             exclude_self (bool): whether to exclude atom neighboring with itself within
                 numerical tolerance distance, default to True
+            use_cache (bool): whether to keep the neighbor list of all sites
+                on the structure, default to False
         Returns: (center_indices, points_indices, offset_vectors, distances)
 
+        With use_cache=True, the neighbor list of all sites at radius r is
+        kept on the structure. Later queries for smaller radii or for some
+        sites of the structure (e.g., get_neighbors) are then answered by
+        filtering it, as long as the fractional coordinates and the lattice
+        are the same as when it was computed. Only one neighbor list is kept,
+        and clear_neighbor_list_cache frees it. The Structure methods that
+        modify sites clear it, and a call with use_cache=True discards it if
+        sites have been modified in place by other means.
+        """
+        neighbor_list = self._get_cached_neighbor_list(
+            r, numerical_tol, sites=sites, fill=use_cache)
+        if neighbor_list is None:
+            neighbor_list = self._compute_neighbor_list(r, sites, numerical_tol)
+        center_indices, points_indices, images, distances = neighbor_list
+        cond = np.array([True] * len(center_indices))
+        if exclude_self:
+            self_pair = (center_indices == points_indices) & (distances <= numerical_tol)
+            cond = ~self_pair
+        return tuple((center_indices[cond], points_indices[cond],
+                     images[cond], distances[cond]))
+
+    def _compute_neighbor_list(self, r, sites=None, numerical_tol=1e-8):
+        """
+        Computes the neighbor list of get_neighbor_list, including self pairs.
         """
         try:
             from pymatgen.optimization.neighbors import find_points_in_spheres  # type: ignore
         except ImportError:
-            return self._get_neighbor_list_py(r, sites, exclude_self=exclude_self)
+            return self._get_neighbor_list_py(r, sites, exclude_self=False)
         else:
             if sites is None:
                 sites = self.sites
@@ -1310,16 +1393,98 @@ class IStructure(SiteCollection, MSONable):
             cart_coords = np.ascontiguousarray(np.array(self.cart_coords), dtype=float)
             lattice_matrix = np.ascontiguousarray(np.array(self.lattice.matrix), dtype=float)
             r = float(r)
+            return find_points_in_spheres(cart_coords, site_coords, r=r,
+                                          pbc=np.array(self.pbc, dtype=int),
+                                          lattice=lattice_matrix, tol=numerical_tol)
+
+    def _get_cached_neighbor_list(self, r, numerical_tol=1e-8, sites=None,
+                                  fill=False):
+        """
+        Returns the neighbor list (including self pairs) from the neighbor
+        list cache of the structure, or None if the cache does not cover the
+        query. If fill is True, a query for all sites (sites=None) which is
+        not covered replaces the cache by the neighbor list at radius r.
+
+        The cache keeps references to the site list and lattice it was
+        computed for, and is not used once either has been replaced. The
+        Structure methods that modify sites clear it. Sites modified in place
+        by other means are only detected by queries with fill=True, which
+        compare the fractional coordinates and the lattice with those the
+        neighbor list was computed for.
+        """
+        cache = getattr(self, "_neighbor_list_cache", None)
+        if cache is not None:
+            if cache["sites"] is not self._sites or \
+                    cache["lattice"] is not self._lattice or \
+                    cache["nsites"] != len(self._sites) or \
+                    cache["pbc"] != self.pbc:
+                cache = self._neighbor_list_cache = None
+            elif fill and (
+                    not np.array_equal(self.frac_coords,
+                                       cache["frac_coords"]) or
+                    not np.array_equal(self._lattice.matrix,
+                                       cache["lattice_matrix"])):
+                cache = self._neighbor_list_cache = None
+        if cache is None or cache["r"] < r or \
+                cache["numerical_tol"] != numerical_tol:
+            if sites is not None or not fill:
+                return None
             center_indices, points_indices, images, distances = \
-                find_points_in_spheres(cart_coords, site_coords, r=r,
-                                       pbc=np.array([1, 1, 1], dtype=int),
-                                       lattice=lattice_matrix, tol=numerical_tol)
-            cond = np.array([True] * len(center_indices))
-            if exclude_self:
-                self_pair = (center_indices == points_indices) & (distances <= numerical_tol)
-                cond = ~self_pair
-            return tuple((center_indices[cond], points_indices[cond],
-                         images[cond], distances[cond]))
+                self._compute_neighbor_list(r, None, numerical_tol)
+            # sort by center, so the neighbors of a site are a slice
+            order = np.argsort(center_indices, kind="stable")
+            cache = {"r": r, "numerical_tol": numerical_tol,
+                     "sites": self._sites, "lattice": self._lattice,
+                     "nsites": len(self._sites),
+                     "frac_coords": self.frac_coords,
+                     "lattice_matrix": self._lattice.matrix.copy(),
+                     "pbc": self.pbc,
+                     "neighbor_list": (center_indices[order],
+                                       points_indices[order], images[order],
+                                       distances[order]),
+                     "offsets": np.searchsorted(center_indices[order],
+                                                np.arange(len(self) + 1)),
+                     "site_indices": {id(site): i for i, site in
+                                      enumerate(self._sites)}}
+            self._neighbor_list_cache = cache
+
+        center_indices, points_indices, images, distances = \
+            cache["neighbor_list"]
+        if sites is not None:
+            try:
+                indices = [cache["site_indices"][id(site)] for site in sites]
+            except KeyError:
+                return None
+            if any(self._sites[i] is not site for i, site in zip(indices, sites)):
+                return None
+            offsets = cache["offsets"]
+            rows = np.concatenate(
+                [np.arange(offsets[i], offsets[i + 1]) for i in indices] +
+                [np.zeros(0, dtype=int)])
+            center_indices = np.repeat(np.arange(len(indices)),
+                                       [offsets[i + 1] - offsets[i]
+                                        for i in indices])
+            points_indices, images, distances = \
+                points_indices[rows], images[rows], distances[rows]
+        if cache["r"] > r:
+            # same criterion as find_points_in_spheres, which uses a single
+            # precision radius
+            r = float(np.float32(r))
+            cond = distances ** 2 < r ** 2 + numerical_tol
+            center_indices, points_indices, images, distances = \
+                center_indices[cond], points_indices[cond], images[cond], \
+                distances[cond]
+        return center_indices, points_indices, images, distances
+
+    def clear_neighbor_list_cache(self):
+        """
+        Clears the neighbor list kept by get_neighbor_list(use_cache=True),
+        e.g. after the sites of the structure have been modified in place.
+        The site index used by pymatgen.analysis.local_env to look up the
+        original sites of neighbors is cleared as well.
+        """
+        self._neighbor_list_cache = None
+        self._site_hash_index = None
 
     def get_all_neighbors(self, r: float,
                           include_index: bool = False,
@@ -1365,17 +1530,25 @@ class IStructure(SiteCollection, MSONable):
             [PeriodicNeighbor] where PeriodicNeighbor is a namedtuple containing
             (site, distance, index, image).
         """
+        query_sites = sites
         if sites is None:
             sites = self.sites
         center_indices, points_indices, images, distances = \
-            self.get_neighbor_list(r=r, sites=sites, numerical_tol=numerical_tol)
+            self.get_neighbor_list(r=r, sites=query_sites,
+                                   numerical_tol=numerical_tol)
         if len(points_indices) < 1:
             return [[]] * len(sites)
-        f_coords = self.frac_coords[points_indices] + images
+        all_sites = self.sites
+        if query_sites is None:
+            f_coords = self.frac_coords[points_indices] + images
+        else:
+            # only gather the coordinates of the neighbors, since building
+            # frac_coords takes O(number of sites)
+            f_coords = np.array([all_sites[i].frac_coords
+                                 for i in points_indices]) + images
         neighbor_dict: Dict[int, List] = collections.defaultdict(list)
         lattice = self.lattice
         atol = Site.position_atol
-        all_sites = self.sites
         for cindex, pindex, image, f_coord, d in zip(center_indices, points_indices, images, f_coords, distances):
             psite = all_sites[pindex]
             csite = sites[cindex]
@@ -1450,7 +1623,7 @@ class IStructure(SiteCollection, MSONable):
         if sites is None:
             sites = self.sites
         site_coords = np.array([site.coords for site in sites])
-        point_neighbors = get_points_in_spheres(self.cart_coords, site_coords, r=r, pbc=True,
+        point_neighbors = get_points_in_spheres(self.cart_coords, site_coords, r=r, pbc=self.pbc,
                                                 numerical_tol=numerical_tol, lattice=self.lattice)
         neighbors: List[List[PeriodicNeighbor]] = []
         for point_neighbor, site in zip(point_neighbors, sites):
@@ -2617,14 +2790,74 @@ class IMolecule(SiteCollection, MSONable):
             [Neighbor] since most of the time, subsequent processing
             requires the distance.
         """
+        dists = np.linalg.norm(self.cart_coords - np.array(pt), axis=1)
         neighbors = []
-        for i, site in enumerate(self._sites):
-            dist = site.distance_from_point(pt)
-            if dist <= r:
-                neighbors.append(Neighbor(site.species, site.coords,
-                                          site.properties, dist, i))
+        for i in np.nonzero(dists <= r)[0].tolist():
+            site = self._sites[i]
+            neighbors.append(Neighbor(site.species, site.coords,
+                                      site.properties, dists[i], i))
         return neighbors
 
+    def get_neighbor_list(self, r: float, sites: List[Site] = None,
+                          numerical_tol: float = 1e-8,
+                          exclude_self: bool = True) -> Tuple[np.ndarray, ...]:
+        """
+        Get neighbor lists using numpy array representations without
+        constructing Neighbor objects. This is the non-periodic counterpart
+        of IStructure.get_neighbor_list and uses the same linear-time cell
+        list search. The returned values are a tuple of numpy arrays
+        (center_indices, points_indices, distances). Atom `center_indices[i]`
+        has neighbor atom `points_indices[i]` at a distance `distances[i]`.
+
+        Args:
+            r (float): Radius of sphere
+            sites (list of Sites or None): sites for getting all neighbors,
+                default is None, which means neighbors will be obtained for all
+                sites.
+            numerical_tol (float): This is a numerical tolerance for distances.
+                Sites which are < numerical_tol are determined to be conincident
+                with the site. Sites which are r + numerical_tol away is deemed
+                to be within r from the site.
+            exclude_self (bool): whether to exclude atom neighboring with itself within
+                numerical tolerance distance, default to True
+        Returns: (center_indices, points_indices, distances)
+        """
+        cart_coords = np.ascontiguousarray(self.cart_coords, dtype=float)
+        if sites is None:
+            site_coords = cart_coords
+        else:
+            site_coords = np.array([site.coords for site in sites], dtype=float)
+        if len(site_coords) == 0 or len(cart_coords) == 0:
+            return np.array([], dtype=int), np.array([], dtype=int), \
+                np.array([], dtype=float)
+        try:
+            from pymatgen.optimization.neighbors import find_points_in_spheres  # type: ignore
+        except ImportError:
+            center_indices, points_indices, distances = [], [], []
+            for i, nns in enumerate(get_points_in_spheres(
+                    cart_coords, site_coords, r=r, pbc=False,
+                    numerical_tol=numerical_tol)):
+                for _, d, index, _ in nns:
+                    center_indices.append(i)
+                    points_indices.append(index)
+                    distances.append(d)
+            center_indices = np.array(center_indices, dtype=int)
+            points_indices = np.array(points_indices, dtype=int)
+            distances = np.array(distances, dtype=float)
+        else:
+            # the lattice only sets the frame of the cell list, since no
+            # direction is periodic
+            center_indices, points_indices, _, distances = find_points_in_spheres(
+                cart_coords, np.ascontiguousarray(site_coords), r=float(r),
+                pbc=np.array([0, 0, 0], dtype=int), lattice=np.eye(3),
+                tol=numerical_tol)
+        if exclude_self:
+            cond = ~((center_indices == points_indices) &
+                     (distances <= numerical_tol))
+            center_indices, points_indices, distances = \
+                center_indices[cond], points_indices[cond], distances[cond]
+        return center_indices, points_indices, distances
+
     def get_neighbors(self, site, r):
         """
         Get all neighbors to a site within a sphere of radius r.  Excludes the
@@ -2999,6 +3232,7 @@ class Structure(IStructure, collections.abc.MutableSequence):
                 Replaces all Mn in the structure with Fe: 0.5, Co: 0.5, i.e.,
                 creates a disordered structure!
         """
+        self.clear_neighbor_list_cache()
 
         if isinstance(i, int):
             indices = [i]
@@ -3036,6 +3270,7 @@ class Structure(IStructure, collections.abc.MutableSequence):
         """
         Deletes a site from the Structure.
         """
+        self.clear_neighbor_list_cache()
         self._sites.__delitem__(i)
 
     @property
@@ -3047,6 +3282,7 @@ class Structure(IStructure, collections.abc.MutableSequence):
 
     @lattice.setter
     def lattice(self, lattice):
+        self.clear_neighbor_list_cache()
         self._lattice = lattice
         for site in self._sites:
             site.lattice = lattice
@@ -3091,6 +3327,7 @@ class Structure(IStructure, collections.abc.MutableSequence):
         Returns:
             New structure with inserted site.
         """
+        self.clear_neighbor_list_cache()
         if not coords_are_cartesian:
             new_site = PeriodicSite(species, coords, self._lattice,
                                     properties=properties)
@@ -3122,6 +3359,7 @@ class Structure(IStructure, collections.abc.MutableSequence):
                 Defaults to False.
             properties (dict): Properties associated with the site.
         """
+        self.clear_neighbor_list_cache()
         if coords is None:
             frac_coords = self[i].frac_coords
         elif coords_are_cartesian:
@@ -3156,6 +3394,7 @@ class Structure(IStructure, collections.abc.MutableSequence):
                 length between the attached functional group and the nearest
                 neighbor site. Defaults to 1.
         """
+        self.clear_neighbor_list_cache()
 
         # Find the nearest neighbor that is not a terminal atom.
         all_non_terminal_nn = []
@@ -3241,6 +3480,7 @@ class Structure(IStructure, collections.abc.MutableSequence):
         Args:
             species: Sequence of species to remove, e.g., ["Li", "Na"].
         """
+        self.clear_neighbor_list_cache()
         new_sites = []
         species = [get_el_sp(s) for s in species]
 
@@ -3260,6 +3500,7 @@ class Structure(IStructure, collections.abc.MutableSequence):
         Args:
             indices: Sequence of indices of sites to delete.
         """
+        self.clear_neighbor_list_cache()
         self._sites = [s for i, s in enumerate(self._sites)
                        if i not in indices]
 
@@ -3275,30 +3516,22 @@ class Structure(IStructure, collections.abc.MutableSequence):
                 fractional space. Defaults to False, i.e., symmetry operation
                 is applied in cartesian coordinates.
         """
+        self.clear_neighbor_list_cache()
         if not fractional:
+            new_cart = symmop.operate_multi(self.cart_coords)
             self._lattice = Lattice([symmop.apply_rotation_only(row)
-                                     for row in self._lattice.matrix])
-
-            def operate_site(site):
-                new_cart = symmop.operate(site.coords)
-                new_frac = self._lattice.get_fractional_coords(new_cart)
-                return PeriodicSite(site.species, new_frac,
-                                    self._lattice,
-                                    properties=site.properties,
-                                    skip_checks=True)
-
+                                     for row in self._lattice.matrix],
+                                    pbc=self._lattice.pbc)
+            new_frac = self._lattice.get_fractional_coords(new_cart)
         else:
+            new_frac = symmop.operate_multi(self.frac_coords)
             new_latt = np.dot(symmop.rotation_matrix, self._lattice.matrix)
-            self._lattice = Lattice(new_latt)
+            self._lattice = Lattice(new_latt, pbc=self._lattice.pbc)
 
-            def operate_site(site):
-                return PeriodicSite(site.species,
-                                    symmop.operate(site.frac_coords),
-                                    self._lattice,
+        self._sites = [PeriodicSite(site.species, fc, self._lattice,
                                     properties=site.properties,
                                     skip_checks=True)
-
-        self._sites = [operate_site(s) for s in self._sites]
+                       for site, fc in zip(self._sites, new_frac)]
 
     @deprecated(message="Simply set using Structure.lattice = lattice. This will be removed in pymatgen v2020.")
     def modify_lattice(self, new_lattice):
@@ -3309,6 +3542,7 @@ class Structure(IStructure, collections.abc.MutableSequence):
         Args:
             new_lattice (Lattice): New lattice
         """
+        self.clear_neighbor_list_cache()
         self._lattice = new_lattice
         for site in self._sites:
             site.lattice = new_lattice
@@ -3325,7 +3559,8 @@ class Structure(IStructure, collections.abc.MutableSequence):
                 are 1% larger.
         """
         s = (1 + np.array(strain)) * np.eye(3)
-        self.lattice = Lattice(np.dot(self._lattice.matrix.T, s).T)
+        self.lattice = Lattice(np.dot(self._lattice.matrix.T, s).T,
+                               pbc=self._lattice.pbc)
 
     def sort(self, key=None, reverse=False):
         """
@@ -3343,6 +3578,7 @@ class Structure(IStructure, collections.abc.MutableSequence):
             reverse (bool): If set to True, then the list elements are sorted
                 as if each comparison were reversed.
         """
+        self.clear_neighbor_list_cache()
         self._sites.sort(key=key, reverse=reverse)
 
     def translate_sites(self, indices, vector, frac_coords=True,
@@ -3354,25 +3590,30 @@ class Structure(IStructure, collections.abc.MutableSequence):
         Args:
             indices: Integer or List of site indices on which to perform the
                 translation.
-            vector: Translation vector for sites.
+            vector: Translation vector for sites, or an array of one
+                translation vector per site in indices.
             frac_coords (bool): Whether the vector corresponds to fractional or
                 cartesian coordinates.
             to_unit_cell (bool): Whether new sites are transformed to unit
                 cell
         """
+        self.clear_neighbor_list_cache()
         if not isinstance(indices, collections.abc.Iterable):
             indices = [indices]
+        indices = list(indices)
+        if not indices:
+            return
 
-        for i in indices:
-            site = self._sites[i]
-            if frac_coords:
-                fcoords = site.frac_coords + vector
-            else:
-                fcoords = self._lattice.get_fractional_coords(
-                    site.coords + vector)
-            if to_unit_cell:
-                fcoords = np.mod(fcoords, 1)
-            self._sites[i].frac_coords = fcoords
+        fcoords = np.array([self._sites[i].frac_coords for i in indices])
+        if frac_coords:
+            fcoords = fcoords + vector
+        else:
+            fcoords = self._lattice.get_fractional_coords(
+                self._lattice.get_cartesian_coords(fcoords) + vector)
+        if to_unit_cell:
+            fcoords = np.mod(fcoords, 1)
+        for i, fc in zip(indices, fcoords):
+            self._sites[i].frac_coords = fc
 
     def rotate_sites(self, indices=None, theta=0, axis=None, anchor=None,
                      to_unit_cell=True):
@@ -3388,6 +3629,7 @@ class Structure(IStructure, collections.abc.MutableSequence):
             to_unit_cell (bool): Whether new sites are transformed to unit
                 cell
         """
+        self.clear_neighbor_list_cache()
 
         from numpy.linalg import norm
         from numpy import cross, eye
@@ -3433,17 +3675,20 @@ class Structure(IStructure, collections.abc.MutableSequence):
 
         """
 
-        def get_rand_vec():
-            # deals with zero vectors.
-            vector = np.random.randn(3)
-            vnorm = np.linalg.norm(vector)
-            dist = distance
-            if isinstance(min_distance, (float, int)):
-                dist = np.random.uniform(min_distance, dist)
-            return vector / vnorm * dist if vnorm != 0 else get_rand_vec()
-
-        for i in range(len(self._sites)):
-            self.translate_sites([i], get_rand_vec(), frac_coords=False)
+        vectors = np.random.randn(len(self._sites), 3)
+        vnorms = np.linalg.norm(vectors, axis=1)
+        # deals with zero vectors.
+        while np.any(vnorms == 0):
+            zero = vnorms == 0
+            vectors[zero] = np.random.randn(np.sum(zero), 3)
+            vnorms = np.linalg.norm(vectors, axis=1)
+        if isinstance(min_distance, (float, int)):
+            dists = np.random.uniform(min_distance, distance, len(self._sites))
+        else:
+            dists = distance
+        vectors *= (dists / vnorms)[:, None]
+        self.translate_sites(range(len(self._sites)), vectors,
+                             frac_coords=False)
 
     def make_supercell(self, scaling_matrix, to_unit_cell=True):
         """
@@ -3465,10 +3710,11 @@ class Structure(IStructure, collections.abc.MutableSequence):
                    same factor.
             to_unit_cell: Whether or not to fall back sites into the unit cell
         """
+        self.clear_neighbor_list_cache()
         s = self * scaling_matrix
         if to_unit_cell:
-            for site in s:
-                site.to_unit_cell(in_place=True)
+            for site, fc in zip(s, np.mod(s.frac_coords, 1)):
+                site.frac_coords = fc
         self._sites = s.sites
         self._lattice = s.lattice
 
@@ -3495,6 +3741,7 @@ class Structure(IStructure, collections.abc.MutableSequence):
                 Only first letter is considered.
 
         """
+        self.clear_neighbor_list_cache()
         mode = mode.lower()[0]
         from scipy.spatial.distance import squareform
         from scipy.cluster.hierarchy import fcluster, linkage
@@ -3928,6 +4175,75 @@ class StructureError(Exception):
     pass
 
 
+def get_neighbor_lists(structures: Sequence[IStructure], r: float,
+                       numerical_tol: float = 1e-8, exclude_self: bool = True,
+                       n_jobs: int = 1) -> Tuple[np.ndarray, ...]:
+    """
+    Get the neighbor lists of many structures at once, e.g. for featurizing a
+    large data set. This is equivalent to calling
+    IStructure.get_neighbor_list on each structure, but the results are
+    returned as concatenated arrays, and the structures can be processed in
+    parallel threads, since the Cython neighbor search releases the GIL.
+
+    Args:
+        structures ([Structure]): Structures.
+        r (float): Radius of sphere.
+        numerical_tol (float): Numerical tolerance for distances, as for
+            IStructure.get_neighbor_list.
+        exclude_self (bool): whether to exclude atom neighboring with itself
+            within numerical tolerance distance, default to True
+        n_jobs (int): Number of threads. -1 uses all cpus.
+
+    Returns: (center_indices, points_indices, offset_vectors, distances,
+        offsets). The neighbor pairs of structures[i] are the rows
+        offsets[i]:offsets[i + 1] of the other arrays, and their indices refer
+        to the sites of structures[i].
+    """
+    try:
+        from pymatgen.optimization.neighbors import find_points_in_spheres  # type: ignore
+    except ImportError:
+        def get_neighbor_list(structure):
+            return structure._get_neighbor_list_py(r, exclude_self=False)
+    else:
+        def get_neighbor_list(structure):
+            cart_coords = np.ascontiguousarray(structure.cart_coords, dtype=float)
+            return find_points_in_spheres(
+                cart_coords, cart_coords, r=float(r),
+                pbc=np.array(structure.pbc, dtype=int),
+                lattice=np.array(structure.lattice.matrix, dtype=float),
+                tol=numerical_tol)
+
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    if n_jobs > 1 and len(structures) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            neighbor_lists = list(executor.map(get_neighbor_list, structures))
+    else:
+        neighbor_lists = [get_neighbor_list(s) for s in structures]
+
+    structure_indices = np.repeat(np.arange(len(structures)),
+                                  [len(nl[0]) for nl in neighbor_lists])
+    center_indices = np.concatenate(
+        [np.zeros(0, dtype=int)] + [nl[0] for nl in neighbor_lists]).astype(int)
+    points_indices = np.concatenate(
+        [np.zeros(0, dtype=int)] + [nl[1] for nl in neighbor_lists]).astype(int)
+    images = np.concatenate(
+        [np.zeros((0, 3))] + [np.reshape(nl[2], (-1, 3)) for nl in neighbor_lists])
+    distances = np.concatenate(
+        [np.zeros(0)] + [nl[3] for nl in neighbor_lists]).astype(float)
+    if exclude_self:
+        cond = ~((center_indices == points_indices) &
+                 (distances <= numerical_tol))
+        center_indices, points_indices, images, distances, structure_indices = \
+            center_indices[cond], points_indices[cond], images[cond], \
+            distances[cond], structure_indices[cond]
+    offsets = np.zeros(len(structures) + 1, dtype=int)
+    offsets[1:] = np.cumsum(np.bincount(structure_indices,
+                                        minlength=len(structures)))
+    return center_indices, points_indices, images, distances, offsets
+
+
 with open(os.path.join(os.path.dirname(__file__),
                        "func_groups.json"), "rt") as f:
     FunctionalGroups = {k: Molecule(v["species"], v["coords"])
@@ -518,6 +518,40 @@ class LatticeTestCase(PymatgenTest):
                                     lattice=lattice)
         self.assertEqual(len(nns[0]), 4)
 
+    def test_pbc(self):
+        self.assertEqual(self.cubic.pbc, (True, True, True))
+        self.assertTrue(self.cubic.is_3d_periodic)
+        lattice = Lattice(self.cubic.matrix, pbc=(True, True, False))
+        self.assertFalse(lattice.is_3d_periodic)
+        self.assertNotEqual(lattice, self.cubic)
+        self.assertEqual(Lattice.from_dict(lattice.as_dict()).pbc,
+                         (True, True, False))
+        self.assertNotIn("pbc", self.cubic.as_dict())
+        self.assertEqual(lattice.copy().pbc, (True, True, False))
+        self.assertEqual(lattice.scale(2000).pbc, (True, True, False))
+        # no periodic images along c
+        nns = lattice.get_points_in_sphere([[0, 0, 0]], [0, 0, 0], 10.1)
+        self.assertEqual(len(nns), 5)
+        self.assertTrue(all(image[2] == 0 for _, _, _, image in nns))
+        self.assertEqual(len(lattice.get_points_in_sphere_py(
+            [[0, 0, 0]], [0, 0, 0], 10.1)), 5)
+        self.assertRaises(ValueError, Lattice, self.cubic.matrix, pbc=(True,))
+        # distances are not wrapped along c
+        self.assertAlmostEqual(
+            lattice.get_distance_and_image([0, 0, 0.1], [0, 0, 0.9])[0], 8)
+        self.assertAlmostEqual(
+            self.cubic.get_distance_and_image([0, 0, 0.1], [0, 0, 0.9])[0], 2)
+        self.assertArrayAlmostEqual(
+            lattice.get_all_distances([[0, 0, 0.1]], [[0.9, 0, 0.9]]),
+            [[np.sqrt(65)]])
+        # lattice mappings and reductions are always fully periodic
+        self.assertIsNotNone(lattice.find_mapping(lattice))
+        self.assertArrayAlmostEqual(
+            lattice.get_niggli_reduced_lattice().abc, self.cubic.abc)
+        self.assertEqual(Lattice.from_parameters(
+            3, 4, 5, 90, 90, 90, pbc=(True, False, True)).pbc,
+            (True, False, True))
+
 
 if __name__ == '__main__':
     import unittest
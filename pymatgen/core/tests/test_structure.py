@@ -14,9 +14,10 @@ from pymatgen.core.periodic_table import Element, Specie
 from pymatgen.core.composition import Composition
 from pymatgen.core.operations import SymmOp
 from pymatgen.core.structure import IStructure, Structure, IMolecule, \
-    StructureError, Molecule
+    StructureError, Molecule, get_neighbor_lists
 from pymatgen.core.lattice import Lattice
 from pymatgen.electronic_structure.core import Magmom
+from pymatgen.analysis.structure_matcher import StructureMatcher
 
 
 class IStructureTest(PymatgenTest):
@@ -830,6 +831,106 @@ class StructureTest(PymatgenTest):
         self.assertArrayAlmostEqual(self.structure.lattice.abc,
                                     [15.360792, 35.195996, 7.680396], 5)
 
+    def test_shared_species(self):
+        s = self.structure * 3
+        self.assertIs(s[0].species, s[1].species)
+        s.make_supercell(2)
+        self.assertIs(s[0].species, s[-1].species)
+        s.add_site_property("magmom", list(range(len(s))))
+        s.translate_sites([0, 1], [[0.1, 0, 0], [0, 0.2, 0]])
+        self.assertAlmostEqual(s.cart_coords[1][1], s[1].coords[1])
+        s2 = s * [2, 1, 1]
+        self.assertEqual(s2.site_properties["magmom"][:3], [0, 0, 1])
+
+    def test_get_neighbor_lists(self):
+        structures = [self.structure * 2, self.structure,
+                      Structure(Lattice.cubic(20), ["H"], [[0, 0, 0]])]
+        for n_jobs in [1, 2]:
+            center_indices, points_indices, images, distances, offsets = \
+                get_neighbor_lists(structures, 4, n_jobs=n_jobs)
+            self.assertEqual(len(offsets), 4)
+            self.assertEqual(offsets[-1], len(distances))
+            for i, s in enumerate(structures):
+                rows = slice(offsets[i], offsets[i + 1])
+                nl = s.get_neighbor_list(4)
+                self.assertArrayEqual(center_indices[rows], nl[0])
+                self.assertArrayEqual(points_indices[rows], nl[1])
+                self.assertArrayAlmostEqual(images[rows], nl[2])
+                self.assertArrayAlmostEqual(distances[rows], nl[3])
+        self.assertArrayEqual(get_neighbor_lists([], 4)[4], [0])
+
+    def test_partial_pbc(self):
+        lattice = Lattice(Lattice.cubic(3).matrix, pbc=(True, True, False))
+        s = Structure(lattice, ["Si"], [[0, 0, 0.5]])
+        self.assertEqual(s.pbc, (True, True, False))
+        self.assertEqual(len(s.get_neighbors(s[0], 3.1)), 4)
+        self.assertEqual(len(s.get_sites_in_sphere(s[0].coords, 3.1)), 5)
+        self.assertEqual(len(s.get_neighbor_list(3.1)[0]), 4)
+        self.assertEqual(len(s._get_neighbor_list_py(3.1)[0]), 4)
+        s.make_supercell([2, 2, 1])
+        self.assertEqual(s.pbc, (True, True, False))
+        self.assertEqual(len(s.get_all_neighbors(3.1)[0]), 4)
+        s = Structure(Lattice(np.diag([3, 3, 20]), pbc=(True, True, False)),
+                      ["Si", "Si"], [[0, 0, 0.02], [0.5, 0.5, 0.98]])
+        self.assertAlmostEqual(s.get_distance(0, 1), np.sqrt(4.5 + 19.2 ** 2))
+        self.assertAlmostEqual(s.distance_matrix[0, 1], s.get_distance(0, 1))
+        centers, points, _, distances = s.get_neighbor_list(20)
+        self.assertAlmostEqual(
+            np.min(distances[(centers == 0) & (points == 1)]),
+            s.get_distance(0, 1))
+        self.assertEqual(s.get_reduced_structure().lattice.abc, (3, 3, 20))
+        self.assertTrue(StructureMatcher().fit(s, s))
+
+    def test_neighbor_list_cache(self):
+        s = self.structure * 2
+        s.get_neighbor_list(5)
+        self.assertIsNone(s._neighbor_list_cache)
+        nl = s.get_neighbor_list(5, use_cache=True)
+        self.assertEqual(s._neighbor_list_cache["r"], 5)
+        # smaller radii are filtered from the cached neighbor list
+        cached = s.get_neighbor_list(3)
+        self.assertEqual(s._neighbor_list_cache["r"], 5)
+        direct = s.copy().get_neighbor_list(3)
+        self.assertEqual(len(cached[0]), len(direct[0]))
+        self.assertArrayAlmostEqual(sorted(cached[3]), sorted(direct[3]))
+        self.assertEqual(len(s.get_neighbors(s[3], 5)),
+                         np.sum(nl[0] == 3))
+
+        def check(s):
+            nl = s.get_neighbor_list(3)
+            direct = s.copy().get_neighbor_list(3)
+            for i in range(len(s)):
+                self.assertArrayAlmostEqual(sorted(nl[3][nl[0] == i]),
+                                            sorted(direct[3][direct[0] == i]))
+                self.assertArrayEqual(sorted(nl[1][nl[0] == i]),
+                                      sorted(direct[1][direct[0] == i]))
+
+        # modifications through Structure methods or by replacing the site
+        # list are detected
+        s.translate_sites([0], [0.1, 0, 0])
+        self.assertIsNone(s._neighbor_list_cache)
+        check(s)
+        s.get_neighbor_list(5, use_cache=True)
+        del s[len(s) - 1]
+        self.assertIsNone(s._neighbor_list_cache)
+        check(s)
+        s.get_neighbor_list(5, use_cache=True)
+        s._sites = sorted(s._sites, key=lambda site: site.frac_coords[0])
+        check(s)
+        # sites modified in place are detected when the cache is filled
+        s.get_neighbor_list(5, use_cache=True)
+        s[0].frac_coords = s[0].frac_coords + [0.05, 0, 0]
+        nl = s.get_neighbor_list(5, use_cache=True)
+        direct = s.copy().get_neighbor_list(5)
+        self.assertArrayAlmostEqual(sorted(nl[3]), sorted(direct[3]))
+        check(s)
+        s[1].coords = s[1].coords + [0, 0.2, 0]
+        s.clear_neighbor_list_cache()
+        self.assertIsNone(s._neighbor_list_cache)
+        self.assertEqual(len(s.get_neighbors(s[1], 3)),
+                         len(s.copy().get_neighbors(s[1], 3)))
+        check(s)
+
     def test_disordered_supercell_primitive_cell(self):
         l = Lattice.cubic(2)
         f = [[0.5, 0.5, 0.5]]
@@ -1234,6 +1335,15 @@ Site: H (-0.5134, 0.8892, -0.3630)"""
         nn = self.mol.get_neighbors(self.mol[0], 2)
         self.assertEqual(len(nn), 4)
 
+    def test_get_neighbor_list(self):
+        center_indices, points_indices, distances = \
+            self.mol.get_neighbor_list(2)
+        for i, site in enumerate(self.mol):
+            nn = self.mol.get_neighbors(site, 2)
+            self.assertEqual(sorted(points_indices[center_indices == i]),
+                             sorted(n.index for n in nn))
+        self.assertEqual(len(self.mol.get_neighbor_list(1.5)[0]), 8)
+
     def test_get_neighbors_in_shell(self):
         nn = self.mol.get_neighbors_in_shell([0, 0, 0], 0, 1)
         self.assertEqual(len(nn), 1)
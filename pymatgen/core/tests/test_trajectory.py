@@ -1,5 +1,5 @@
 from pymatgen.util.testing import PymatgenTest
-from pymatgen.io.vasp.outputs import Xdatcar
+from pymatgen.io.vasp.outputs import Xdatcar, Vasprun
 from pymatgen.io.vasp.inputs import Poscar
 from pymatgen.core.trajectory import Trajectory
 from pymatgen.core.structure import Structure
@@ -336,6 +336,38 @@ class TrajectoryTest(PymatgenTest):
         self.assertTrue(
             all([np.allclose(struct.lattice.matrix, structures[i].lattice.matrix) for i, struct in enumerate(traj)]))
 
+    def test_variable_lattice_xdatcar(self):
+        structure = self.structures[0]
+        structures = []
+        for i in range(5):
+            new_lattice = np.dot(structure.lattice.matrix, np.diag(1 + np.random.random_sample(3) / 20))
+            temp_struct = structure.copy()
+            temp_struct.lattice = Lattice(new_lattice)
+            structures.append(temp_struct)
+
+        traj = Trajectory.from_structures(structures, constant_lattice=False)
+        traj.write_Xdatcar(filename="traj_test_XDATCAR")
+        written_traj = Trajectory.from_file("traj_test_XDATCAR", constant_lattice=False)
+        os.remove("traj_test_XDATCAR")
+        self.assertEqual(len(written_traj), 5)
+        for i, struct in enumerate(written_traj):
+            self.assertArrayAlmostEqual(struct.lattice.matrix, structures[i].lattice.matrix, decimal=5)
+            self.assertArrayAlmostEqual(struct.frac_coords, structures[i].frac_coords, decimal=5)
+
+    def test_slice_is_view(self):
+        sliced_traj = self.traj[2:99:3]
+        self.assertTrue(np.shares_memory(sliced_traj.frac_coords, self.traj.frac_coords))
+
+    def test_from_vasprun(self):
+        filename = os.path.join(test_dir, "vasprun.xml.unconverged")
+        traj = Trajectory.from_file(filename, constant_lattice=False)
+        structures = Vasprun(filename, parse_potcar_file=False).structures
+        self.assertEqual(len(traj), len(structures))
+        for struct, vasprun_struct in zip(traj, structures):
+            self.assertArrayAlmostEqual(struct.lattice.matrix, vasprun_struct.lattice.matrix)
+            diff = struct.frac_coords - vasprun_struct.frac_coords
+            self.assertArrayAlmostEqual(diff - np.round(diff), np.zeros(diff.shape))
+
     def test_to_from_dict(self):
         d = self.traj.as_dict()
         traj = Trajectory.from_dict(d)
@@ -8,6 +8,7 @@ This module provides classes used to define a MD trajectory.
 
 import itertools
 import os
+import re
 import warnings
 from fnmatch import fnmatch
 from typing import List, Union, Sequence
@@ -16,7 +17,8 @@ import numpy as np
 from monty.io import zopen
 from monty.json import MSONable
 from pymatgen.core.structure import Structure, Lattice, Element, Specie, DummySpecie, Composition
-from pymatgen.io.vasp.outputs import Xdatcar, Vasprun
+from pymatgen.io.vasp.inputs import Poscar
+from pymatgen.io.vasp.outputs import Vasprun
 
 
 __author__ = "Eric Sivonxay, Shyam Dwaraknath"
@@ -128,7 +130,7 @@ class Trajectory(MSONable):
             displacements = np.subtract(self.frac_coords, np.roll(self.frac_coords, 1, axis=0))
             displacements[0] = np.zeros(np.shape(self.frac_coords[0]))
             # Deal with PBC
-            displacements = [np.subtract(item, np.round(item)) for item in displacements]
+            displacements = np.subtract(displacements, np.round(displacements))
 
             self.frac_coords = displacements
             self.coords_are_displacement = True
@@ -207,11 +209,12 @@ class Trajectory(MSONable):
                              site_properties=site_properties,
                              to_unit_cell=True)
         if isinstance(frames, slice):
-            # For slice input, return a trajectory of the sliced time
+            # For slice input, return a trajectory of the sliced time. The coordinates
+            # (and lattices) of the new trajectory are views into this one, not copies.
             start, stop, step = frames.indices(len(self))
             pruned_frames = range(start, stop, step)
-            lattice = self.lattice if self.constant_lattice else [self.lattice[i] for i in pruned_frames]
-            frac_coords = [self.frac_coords[i] for i in pruned_frames]
+            lattice = self.lattice if self.constant_lattice else self.lattice[frames]
+            frac_coords = self.frac_coords[frames]
             if self.site_properties is not None:
                 site_properties = [self.site_properties[i] for i in pruned_frames]
             else:
@@ -232,7 +235,7 @@ class Trajectory(MSONable):
             if len(pruned_frames) < len(frames):
                 warnings.warn('Some or all selected frames exceed trajectory length')
             lattice = self.lattice if self.constant_lattice else [self.lattice[i] for i in pruned_frames]
-            frac_coords = [self.frac_coords[i] for i in pruned_frames]
+            frac_coords = np.asarray(self.frac_coords)[pruned_frames]
             if self.site_properties is not None:
                 site_properties = [self.site_properties[i] for i in pruned_frames]
             else:
@@ -297,13 +300,80 @@ class Trajectory(MSONable):
 
         fname = os.path.basename(filename)
         if fnmatch(fname, "*XDATCAR*"):
-            structures = Xdatcar(filename).structures
+            lattices, species, frac_coords = cls._read_xdatcar(filename)
         elif fnmatch(fname, "vasprun*.xml*"):
-            structures = Vasprun(filename).structures
+            lattices, species, frac_coords = cls._read_vasprun(filename)
         else:
             raise ValueError("Unsupported file")
 
-        return cls.from_structures(structures, constant_lattice=constant_lattice, **kwargs)
+        lattice = lattices[0] if constant_lattice else lattices
+        return cls(lattice, species, frac_coords, constant_lattice=constant_lattice, **kwargs)
+
+    @staticmethod
+    def _read_xdatcar(filename):
+        """
+        Reads the lattices, species and fractional coordinates of all frames in
+        an XDATCAR file directly into arrays, without creating a Structure for
+        each frame. Supports both fixed and variable cell XDATCAR files.
+
+        Args:
+            filename (str): The XDATCAR file to read from.
+        Returns:
+            (lattices, species, frac_coords) as a Mx3x3 array, a list of species
+            and a MxNx3 array.
+        """
+        with zopen(filename, "rt") as f:
+            blocks = re.split(r"^.*Direct configuration=.*$", f.read(), flags=re.MULTILINE)
+        header = blocks.pop(0).strip().split("\n")
+        poscar = Poscar.from_string("\n".join(header + ["Direct"] + ["0 0 0"] * sum(
+            int(i) for i in header[-1].split())))
+        natoms = len(poscar.structure)
+        species = poscar.structure.species
+
+        lattices = [poscar.structure.lattice.matrix]
+        coord_lines = []
+        for i, block in enumerate(blocks):
+            lines = block.strip().split("\n")
+            coord_lines.extend(lines[:natoms])
+            if i < len(blocks) - 1:
+                # In variable cell XDATCARs, the header with the lattice of the next
+                # frame is repeated after the coordinates.
+                if len(lines) > natoms:
+                    scale = float(lines[natoms + 1])
+                    latt = np.array([l.split() for l in lines[natoms + 2:natoms + 5]], dtype=float)
+                    if scale < 0:
+                        latt *= (-scale / abs(np.linalg.det(latt))) ** (1 / 3)
+                    else:
+                        latt *= scale
+                    lattices.append(latt)
+                else:
+                    lattices.append(lattices[-1])
+        # Only the first three columns are coordinates. Some writers append site labels.
+        frac_coords = np.array([l.split()[:3] for l in coord_lines], dtype=float)
+        frac_coords = frac_coords.reshape((len(blocks), natoms, 3))
+        return np.array(lattices), species, frac_coords
+
+    @staticmethod
+    def _read_vasprun(filename):
+        """
+        Reads the lattices, species and fractional coordinates of all ionic steps
+        in a vasprun.xml file directly into arrays, streaming through the file
+        without creating a Structure for each step.
+
+        Args:
+            filename (str): The vasprun.xml file to read from.
+        Returns:
+            (lattices, species, frac_coords) as a Mx3x3 array, a list of species
+            and a MxNx3 array.
+        """
+        lattices = []
+        frac_coords = []
+        species = None
+        for step in Vasprun.iter_ionic_steps(filename, fields=["lattice", "frac_coords", "species"]):
+            lattices.append(step["lattice"])
+            frac_coords.append(step["frac_coords"])
+            species = step["species"]
+        return np.array(lattices), species, np.array(frac_coords)
 
     def as_dict(self):
         """
@@ -446,8 +516,8 @@ class Trajectory(MSONable):
         natoms = [len(tuple(a[1])) for a in itertools.groupby(syms)]
 
         for si, frac_coords in enumerate(self.frac_coords):
-            # Only print out the info block if
-            if self.constant_lattice and si == 0:
+            # Only print out the info block for the first frame, unless the lattice changes
+            if not self.constant_lattice or si == 0:
                 lines.extend([system, "1.0"])
 
                 if self.constant_lattice:
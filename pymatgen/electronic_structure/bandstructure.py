@@ -11,6 +11,8 @@ import re
 import math
 import itertools
 import collections
+import collections.abc
+import json
 import warnings
 
 from monty.json import MSONable
@@ -130,13 +132,52 @@ class Kpoint(MSONable):
                 "@class": self.__class__.__name__}
 
 
+class _KpointList(collections.abc.Sequence):
+    """
+    Read-only list of the kpoints of a band structure. The Kpoint objects are
+    only created, and then cached, when they are accessed, so that band
+    structures on dense meshes can be handled with arrays.
+    """
+
+    def __init__(self, frac_coords, lattice, labels):
+        """
+        Args:
+            frac_coords: (N, 3) array of fractional coordinates.
+            lattice: The reciprocal lattice.
+            labels: List of the N labels (None if no label).
+        """
+        self._frac_coords = frac_coords
+        self._lattice = lattice
+        self._labels = labels
+        self._kpoints = {}
+
+    def __len__(self):
+        return len(self._frac_coords)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        i = range(len(self))[i]
+        if i not in self._kpoints:
+            self._kpoints[i] = Kpoint(self._frac_coords[i].copy(),
+                                      self._lattice, label=self._labels[i])
+        return self._kpoints[i]
+
+
 class BandStructure:
     """
     This is the most generic band structure data possible
     it's defined by a list of kpoints + energies for each of them
 
     .. attribute:: kpoints:
-        the list of kpoints (as Kpoint objects) in the band structure
+        the list of kpoints (as Kpoint objects) in the band structure. The
+        Kpoint objects are created when they are accessed.
+
+    .. attribute:: kpoint_frac_coords:
+        the fractional coordinates of the kpoints as a (N, 3) array
+
+    .. attribute:: kpoint_labels:
+        the list of the labels of the kpoints (None for unlabelled kpoints)
 
     .. attribute:: lattice_rec
 
@@ -202,7 +243,6 @@ class BandStructure:
         """
         self.efermi = efermi
         self.lattice_rec = lattice
-        self.kpoints = []
         self.labels_dict = {}
         self.structure = structure
         self.projections = projections or {}
@@ -215,18 +255,28 @@ class BandStructure:
             raise Exception("if projections are provided a structure object"
                             " needs also to be given")
 
-        for k in kpoints:
-            # let see if this kpoint has been assigned a label
-            label = None
-            for c in labels_dict:
-                if np.linalg.norm(k - np.array(labels_dict[c])) < 0.0001:
-                    label = c
-                    self.labels_dict[label] = Kpoint(
-                        k, lattice, label=label,
-                        coords_are_cartesian=coords_are_cartesian)
-            self.kpoints.append(
-                Kpoint(k, lattice, label=label,
-                       coords_are_cartesian=coords_are_cartesian))
+        coords = np.array(kpoints, dtype=np.float64).reshape(-1, 3)
+        # a kpoint gets the last label within 0.0001 of it and a label
+        # refers to the last kpoint within 0.0001 of it
+        labels = [None] * len(coords)
+        matches = {}
+        for c in labels_dict:
+            inds = np.flatnonzero(np.linalg.norm(
+                coords - np.array(labels_dict[c]), axis=1) < 0.0001)
+            for i in inds:
+                labels[i] = c
+            if len(inds):
+                matches[c] = inds
+        # labels in the order in which they first appear along the kpoints
+        for c in sorted(matches, key=lambda c: matches[c][0]):
+            self.labels_dict[c] = Kpoint(
+                coords[matches[c][-1]], lattice, label=c,
+                coords_are_cartesian=coords_are_cartesian)
+        if coords_are_cartesian:
+            coords = lattice.get_fractional_coords(coords)
+        self.kpoint_frac_coords = coords
+        self.kpoint_labels = labels
+        self.kpoints = _KpointList(coords, lattice, labels)
         self.bands = {spin: np.array(v) for spin, v in eigenvals.items()}
         self.nb_bands = len(eigenvals[Spin.up])
         self.is_spin_polarized = len(self.bands) == 2
@@ -334,19 +384,18 @@ class BandStructure:
                     "kpoint": [], "energy": None, "projections": {}}
         max_tmp = -float("inf")
         index = None
-        kpointvbm = None
         for spin, v in self.bands.items():
-            for i, j in zip(*np.where(v < self.efermi)):
-                if v[i, j] > max_tmp:
-                    max_tmp = float(v[i, j])
-                    index = j
-                    kpointvbm = self.kpoints[j]
+            below = np.where(v < self.efermi, v, -np.inf)
+            i, j = np.unravel_index(np.argmax(below), below.shape)
+            if v[i, j] < self.efermi and v[i, j] > max_tmp:
+                max_tmp = float(v[i, j])
+                index = j
+        kpointvbm = self.kpoints[index]
 
         list_ind_kpts = []
         if kpointvbm.label is not None:
-            for i in range(len(self.kpoints)):
-                if self.kpoints[i].label == kpointvbm.label:
-                    list_ind_kpts.append(i)
+            list_ind_kpts = [i for i, label in enumerate(self.kpoint_labels)
+                             if label == kpointvbm.label]
         else:
             list_ind_kpts.append(index)
         # get all other bands sharing the vbm
@@ -393,19 +442,19 @@ class BandStructure:
         max_tmp = float("inf")
 
         index = None
-        kpointcbm = None
         for spin, v in self.bands.items():
-            for i, j in zip(*np.where(v >= self.efermi)):
-                if v[i, j] < max_tmp:
-                    max_tmp = float(v[i, j])
-                    index = j
-                    kpointcbm = self.kpoints[j]
+            above = np.where(v >= self.efermi, v, np.inf)
+            i, j = np.unravel_index(np.argmin(above), above.shape)
+            if v[i, j] >= self.efermi and v[i, j] < max_tmp:
+                max_tmp = float(v[i, j])
+                index = j
+        kpointcbm = self.kpoints[index]
 
         list_index_kpoints = []
         if kpointcbm.label is not None:
-            for i in range(len(self.kpoints)):
-                if self.kpoints[i].label == kpointcbm.label:
-                    list_index_kpoints.append(i)
+            list_index_kpoints = [i for i, label in
+                                  enumerate(self.kpoint_labels)
+                                  if label == kpointcbm.label]
         else:
             list_index_kpoints.append(index)
 
@@ -548,8 +597,7 @@ class BandStructure:
              "kpoints": []}
         # kpoints are not kpoint objects dicts but are frac coords (this makes
         # the dict smaller and avoids the repetition of the lattice
-        for k in self.kpoints:
-            d["kpoints"].append(k.as_dict()["fcoords"])
+        d["kpoints"] = self.kpoint_frac_coords.tolist()
         d["bands"] = {str(int(spin)): self.bands[spin]
                       for spin in self.bands}
         d["is_metal"] = self.is_metal()
@@ -609,6 +657,56 @@ class BandStructure:
             Lattice(d['lattice_rec']['matrix']), d['efermi'],
             labels_dict, structure=structure, projections=projections)
 
+    def to_npz(self, filename):
+        """
+        Writes the band structure to a numpy .npz file. The kpoints, bands
+        and projections are stored as binary arrays and the rest as json,
+        which is much faster and smaller than as_dict for band structures
+        with many kpoints. The projections must be numerical arrays.
+
+        Args:
+            filename (str): Name of the .npz file.
+        """
+        arrays = {"kpoints": self.kpoint_frac_coords}
+        for spin, v in self.bands.items():
+            arrays["bands_%d" % int(spin)] = v
+        for spin, v in self.projections.items():
+            arrays["projections_%d" % int(spin)] = v
+        meta = {"lattice_rec": self.lattice_rec.matrix.tolist(),
+                "efermi": self.efermi,
+                "labels_dict": {c: k.frac_coords.tolist()
+                                for c, k in self.labels_dict.items()},
+                "structure": self.structure.as_dict()
+                if self.structure else None}
+        arrays["meta"] = np.array(json.dumps(meta))
+        with open(filename, "wb") as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def from_npz(cls, filename):
+        """
+        Reads a band structure written by to_npz.
+
+        Args:
+            filename (str): Name of the .npz file.
+
+        Returns:
+            A band structure of this class.
+        """
+        with np.load(filename) as data:
+            meta = json.loads(str(data["meta"]))
+            eigenvals = {Spin(int(k.split("_")[1])): data[k]
+                         for k in data.files if k.startswith("bands_")}
+            projections = {Spin(int(k.split("_")[1])): data[k]
+                           for k in data.files
+                           if k.startswith("projections_")}
+            kpoints = data["kpoints"]
+        structure = Structure.from_dict(meta["structure"]) \
+            if meta["structure"] else None
+        return cls(kpoints, eigenvals, Lattice(meta["lattice_rec"]),
+                   meta["efermi"], meta["labels_dict"], structure=structure,
+                   projections=projections)
+
     @classmethod
     def from_old_dict(cls, d):
         """
@@ -687,26 +785,21 @@ class BandStructureSymmLine(BandStructure, MSONable):
         super().__init__(
             kpoints, eigenvals, lattice, efermi, labels_dict,
             coords_are_cartesian, structure, projections)
-        self.distance = []
         self.branches = []
         one_group = []
         branches_tmp = []
         # get labels and distance for each kpoint
-        previous_kpoint = self.kpoints[0]
-        previous_distance = 0.0
-
-        previous_label = self.kpoints[0].label
-        for i in range(len(self.kpoints)):
-            label = self.kpoints[i].label
-            if label is not None and previous_label is not None:
-                self.distance.append(previous_distance)
-            else:
-                self.distance.append(
-                    np.linalg.norm(self.kpoints[i].cart_coords -
-                                   previous_kpoint.cart_coords) +
-                    previous_distance)
-            previous_kpoint = self.kpoints[i]
-            previous_distance = self.distance[i]
+        labels = self.kpoint_labels
+        labelled = np.array([label is not None for label in labels])
+        cart_coords = lattice.get_cartesian_coords(self.kpoint_frac_coords)
+        steps = np.zeros(len(labels))
+        steps[1:] = np.linalg.norm(np.diff(cart_coords, axis=0), axis=1)
+        # no distance between two consecutive labelled kpoints
+        steps[1:][labelled[1:] & labelled[:-1]] = 0
+        self.distance = np.cumsum(steps).tolist()
+
+        previous_label = labels[0]
+        for i, label in enumerate(labels):
             if label:
                 if previous_label:
                     if len(one_group) != 0:
@@ -720,7 +813,7 @@ class BandStructureSymmLine(BandStructure, MSONable):
         for b in branches_tmp:
             self.branches.append(
                 {"start_index": b[0], "end_index": b[-1],
-                 "name": str(self.kpoints[b[0]].label) + "-" + str(self.kpoints[b[-1]].label)})
+                 "name": str(labels[b[0]]) + "-" + str(labels[b[-1]])})
 
         self.is_spin_polarized = False
         if len(self.bands) == 2:
@@ -743,15 +836,11 @@ class BandStructureSymmLine(BandStructure, MSONable):
         # if the kpoint has no label it can"t have a repetition along the band
         # structure line object
 
-        if self.kpoints[index].label is None:
+        label = self.kpoint_labels[index]
+        if label is None:
             return [index]
 
-        list_index_kpoints = []
-        for i in range(len(self.kpoints)):
-            if self.kpoints[i].label == self.kpoints[index].label:
-                list_index_kpoints.append(i)
-
-        return list_index_kpoints
+        return [i for i, l in enumerate(self.kpoint_labels) if l == label]
 
     def get_branch(self, index):
         r"""
@@ -851,8 +940,7 @@ class BandStructureSymmLine(BandStructure, MSONable):
              "kpoints": []}
         # kpoints are not kpoint objects dicts but are frac coords (this makes
         # the dict smaller and avoids the repetition of the lattice
-        for k in self.kpoints:
-            d["kpoints"].append(k.as_dict()["fcoords"])
+        d["kpoints"] = self.kpoint_frac_coords.tolist()
         d["branches"] = self.branches
         d["bands"] = {str(int(spin)): self.bands[spin].tolist()
                       for spin in self.bands}
@@ -976,8 +1064,7 @@ class LobsterBandStructureSymmLine(BandStructureSymmLine):
              "kpoints": []}
         # kpoints are not kpoint objects dicts but are frac coords (this makes
         # the dict smaller and avoids the repetition of the lattice
-        for k in self.kpoints:
-            d["kpoints"].append(k.as_dict()["fcoords"])
+        d["kpoints"] = self.kpoint_frac_coords.tolist()
         d["branches"] = self.branches
         d["bands"] = {str(int(spin)): self.bands[spin].tolist()
                       for spin in self.bands}
@@ -9,7 +9,9 @@ import json
 from io import open
 import warnings
 
-from pymatgen.electronic_structure.bandstructure import Kpoint
+import numpy as np
+
+from pymatgen.electronic_structure.bandstructure import Kpoint, BandStructure
 from pymatgen.electronic_structure.plotter import BSPlotterProjected
 from pymatgen import Lattice
 from pymatgen.electronic_structure.core import Spin, Orbital
@@ -19,6 +21,7 @@ from pymatgen.electronic_structure.bandstructure import BandStructureSymmLine, g
 from pymatgen.util.testing import PymatgenTest
 
 from monty.serialization import loadfn
+from monty.tempfile import ScratchDir
 
 test_dir = os.path.join(os.path.dirname(__file__), "..", "..", "..",
                         'test_files')
@@ -202,6 +205,35 @@ class BandStructureSymmLine_test(PymatgenTest):
         s = json.dumps(self.bs_spin.as_dict())
         self.assertIsNotNone(s)
 
+    def test_npz(self):
+        with ScratchDir("."):
+            for bs in [self.bs, self.bs_spin]:
+                bs.to_npz("bs.npz")
+                bs_npz = BandStructureSymmLine.from_npz("bs.npz")
+                self.assertEqual(bs_npz.as_dict(), bs.as_dict())
+                self.assertEqual(bs_npz.branches, bs.branches)
+
+    def test_kpoints(self):
+        self.assertEqual(len(self.bs2.kpoints), len(self.bs2.kpoint_labels))
+        self.assertIs(self.bs2.kpoints[31], self.bs2.kpoints[31])
+        self.assertEqual(self.bs2.kpoints[-1].label, "X")
+        self.assertEqual([k.label for k in self.bs2.kpoints[29:32]],
+                         [None, None, "W"])
+        self.assertTrue(np.allclose(self.bs2.kpoint_frac_coords[31],
+                                    [0.5, 0.25, 0.75]))
+
+        # A uniform mesh.
+        lattice = Lattice.cubic(2)
+        mesh = np.array(np.meshgrid(*[np.linspace(0, 0.5, 6)] * 3)) \
+            .reshape(3, -1).T
+        bands = {Spin.up: np.array([np.linalg.norm(mesh, axis=1),
+                                    np.linalg.norm(mesh, axis=1) + 2])}
+        bs = BandStructure(mesh, bands, lattice, 1,
+                           {"\\Gamma": [0, 0, 0], "R": [0.5, 0.5, 0.5]})
+        self.assertEqual(bs.kpoint_labels.count("\\Gamma"), 1)
+        self.assertEqual(bs.kpoints[-1].label, "R")
+        self.assertEqual(bs.get_band_gap()["transition"], "R-\\Gamma")
+
     def test_old_format_load(self):
         with open(os.path.join(test_dir, "bs_ZnS_old.json"),
                   "r", encoding='utf-8') as f:
@@ -49,7 +49,7 @@ class AseAtomsAdaptor:
         positions = [site.coords for site in structure]
         if hasattr(structure, "lattice"):
             cell = structure.lattice.matrix
-            pbc = True
+            pbc = structure.lattice.pbc
         else:
             cell = None
             pbc = None
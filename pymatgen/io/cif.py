@@ -6,7 +6,6 @@
 Wrapper classes for Cif input and output from Structures.
 """
 
-import math
 import re
 import os
 import textwrap
@@ -14,13 +13,13 @@ import warnings
 from collections import OrderedDict, deque
 from io import StringIO
 import numpy as np
-from functools import partial
+from functools import partial, lru_cache
+from multiprocessing import Pool
 from pathlib import Path
 from inspect import getfullargspec as getargspec
 from itertools import groupby
 from pymatgen.core.periodic_table import Element, Specie, get_el_sp, DummySpecie
 from monty.io import zopen
-from pymatgen.util.coord import in_coord_list_pbc, find_in_coord_list_pbc
 from monty.string import remove_non_ascii
 from pymatgen.core.lattice import Lattice
 from pymatgen.core.structure import Structure
@@ -584,39 +583,32 @@ class CifParser:
         Generate unique coordinates using coord and symmetry positions
         and also their corresponding magnetic moments, if supplied.
         """
-        coords = []
+        if magmoms_in and len(magmoms_in) != len(coords_in):
+            raise ValueError
+        ops = self.symmetry_operations
+        # All the images, ordered by input coord and then by symmetry op.
+        images = _operate_all(ops, coords_in).reshape(-1, 3)
+        images -= np.floor(images)
+        inds = _get_unique_coord_indices(images, self._site_tolerance)
+        coords = list(images[inds])
         if magmoms_in:
             magmoms = []
-            if len(magmoms_in) != len(coords_in):
-                raise ValueError
-            for tmp_coord, tmp_magmom in zip(coords_in, magmoms_in):
-                for op in self.symmetry_operations:
-                    coord = op.operate(tmp_coord)
-                    coord = np.array([i - math.floor(i) for i in coord])
-                    if isinstance(op, MagSymmOp):
-                        # Up to this point, magmoms have been defined relative
-                        # to crystal axis. Now convert to Cartesian and into
-                        # a Magmom object.
-                        magmom = Magmom.from_moment_relative_to_crystal_axes(
-                            op.operate_magmom(tmp_magmom),
-                            lattice=lattice
-                        )
-                    else:
-                        magmom = Magmom(tmp_magmom)
-                    if not in_coord_list_pbc(coords, coord,
-                                             atol=self._site_tolerance):
-                        coords.append(coord)
-                        magmoms.append(magmom)
+            for i in inds:
+                op = ops[i % len(ops)]
+                tmp_magmom = magmoms_in[i // len(ops)]
+                if isinstance(op, MagSymmOp):
+                    # Up to this point, magmoms have been defined relative
+                    # to crystal axis. Now convert to Cartesian and into
+                    # a Magmom object.
+                    magmom = Magmom.from_moment_relative_to_crystal_axes(
+                        op.operate_magmom(tmp_magmom),
+                        lattice=lattice
+                    )
+                else:
+                    magmom = Magmom(tmp_magmom)
+                magmoms.append(magmom)
             return coords, magmoms
-        else:
-            for tmp_coord in coords_in:
-                for op in self.symmetry_operations:
-                    coord = op.operate(tmp_coord)
-                    coord = np.array([i - math.floor(i) for i in coord])
-                    if not in_coord_list_pbc(coords, coord,
-                                             atol=self._site_tolerance):
-                        coords.append(coord)
-            return coords, [Magmom(0)] * len(coords)  # return dummy magmoms
+        return coords, [Magmom(0)] * len(coords)  # return dummy magmoms
 
     def get_lattice(self, data, length_strings=("a", "b", "c"),
                     angle_strings=("alpha", "beta", "gamma"),
@@ -681,7 +673,7 @@ class CifParser:
                     self.warnings.append(msg)
                     xyz = [xyz]
                 try:
-                    symops = [SymmOp.from_xyz_string(s)
+                    symops = [_symmop_from_xyz_string(s)
                               for s in xyz]
                     break
                 except ValueError:
@@ -722,7 +714,7 @@ class CifParser:
                             if sg == re.sub(r"\s+", "",
                                             d["hermann_mauguin"]):
                                 xyz = d["symops"]
-                                symops = [SymmOp.from_xyz_string(s)
+                                symops = [_symmop_from_xyz_string(s)
                                           for s in xyz]
                                 msg = "No _symmetry_equiv_pos_as_xyz type key found. " \
                                       "Spacegroup from %s used." % symmetry_label
@@ -753,7 +745,7 @@ class CifParser:
                   "Defaulting to P1."
             warnings.warn(msg)
             self.warnings.append(msg)
-            symops = [SymmOp.from_xyz_string(s) for s in ['x', 'y', 'z']]
+            symops = [_symmop_from_xyz_string(s) for s in ['x', 'y', 'z']]
 
         return symops
 
@@ -935,18 +927,22 @@ class CifParser:
 
         coord_to_species = OrderedDict()
         coord_to_magmoms = OrderedDict()
+        keys = []
+        key_coords = np.zeros((len(data["_atom_site_label"]), 3))
 
         def get_matching_coord(coord):
-            keys = list(coord_to_species.keys())
-            coords = np.array(keys)
-            for op in self.symmetry_operations:
-                c = op.operate(coord)
-                inds = find_in_coord_list_pbc(coords, c,
-                                              atol=self._site_tolerance)
-                # cant use if inds, because python is dumb and np.array([0]) evaluates
-                # to False
-                if len(inds):
-                    return keys[inds[0]]
+            # Compare the images of coord under all the symmetry operations
+            # with all the coords found so far at once. The first match in
+            # the order of the operations is returned.
+            if not keys:
+                return False
+            images = _operate_all(self.symmetry_operations, [coord])[0]
+            fdist = key_coords[None, :len(keys)] - images[:, None]
+            fdist -= np.round(fdist)
+            matches = np.all(np.abs(fdist) < self._site_tolerance, axis=2)
+            ops = np.flatnonzero(matches.any(axis=1))
+            if len(ops):
+                return keys[matches[ops[0]].argmax()]
             return False
 
         for i in range(len(data["_atom_site_label"])):
@@ -999,6 +995,8 @@ class CifParser:
                 if not match:
                     coord_to_species[coord] = comp
                     coord_to_magmoms[coord] = magmom
+                    key_coords[len(keys)] = coord
+                    keys.append(coord)
                 else:
                     coord_to_species[match] += comp
                     # disordered magnetic not currently supported
@@ -1390,6 +1388,143 @@ class CifWriter:
             f.write(self.__str__())
 
 
+@lru_cache(maxsize=1024)
+def _symmop_from_xyz_string(xyz_string):
+    """
+    Cached SymmOp.from_xyz_string. The same few hundred operations appear in
+    almost every CIF, so the parsing is done only once for each string.
+    """
+    return SymmOp.from_xyz_string(xyz_string)
+
+
+def _operate_all(ops, coords):
+    """
+    Applies all the symmetry operations to all the coords.
+
+    Args:
+        ops ([SymmOp]): Symmetry operations.
+        coords: List of fractional coords.
+
+    Returns:
+        (len(coords), len(ops), 3) array of images.
+    """
+    affine = np.array([op.affine_matrix for op in ops])
+    coords = np.array(coords, dtype=float)
+    return np.einsum("oij,cj->coi", affine[:, :3, :3], coords) + affine[:, :3, 3]
+
+
+def _get_unique_coord_indices(fcoords, atol):
+    """
+    Returns the indices of the coords which do not match, with periodic
+    boundary conditions, any coord before them that is itself retained. This
+    is the same as adding the coords one by one to a list if they are not
+    yet in it according to in_coord_list_pbc, but the coords are binned on a
+    grid so that each coord is only compared with the retained coords in the
+    same or adjacent bins.
+
+    Args:
+        fcoords: (n, 3) array of fractional coords in [0, 1].
+        atol: Absolute tolerance for each fractional coordinate.
+
+    Returns:
+        List of indices.
+    """
+    # Bins must be wider than atol so that matches are in adjacent bins.
+    nbins = int(max(1, min(64, 1 / (2 * atol))))
+    scaled = np.asarray(fcoords) * nbins
+    bins = np.floor(scaled).astype(int)
+    rem = scaled - bins
+    bins %= nbins
+    lower = (rem < atol * nbins).tolist()
+    upper = (rem > 1 - atol * nbins).tolist()
+    bins = bins.tolist()
+    retained = {}
+    inds = []
+    for i, b in enumerate(bins):
+        offsets = [[0] + ([-1] if lower[i][j] else []) +
+                   ([1] if upper[i][j] else []) for j in range(3)]
+        found = False
+        for dx in offsets[0]:
+            for dy in offsets[1]:
+                for dz in offsets[2]:
+                    key = ((b[0] + dx) % nbins, (b[1] + dy) % nbins,
+                           (b[2] + dz) % nbins)
+                    for k in retained.get(key, []):
+                        fdist = fcoords[k] - fcoords[i]
+                        fdist -= np.round(fdist)
+                        if np.all(np.abs(fdist) < atol):
+                            found = True
+                            break
+                    if found:
+                        break
+                if found:
+                    break
+            if found:
+                break
+        if not found:
+            retained.setdefault(tuple(b), []).append(i)
+            inds.append(i)
+    return inds
+
+
+def _parse_cif(args):
+    """
+    Helper method for multiprocessing of parse_cifs. Must not be in
+    parse_cifs so that it can be pickled.
+
+    Returns:
+        (structures, error message) with one of the two being None.
+    """
+    path, kwargs = args
+    parser_kwargs = {k: kwargs.pop(k) for k in ("occupancy_tolerance",
+                                                "site_tolerance")
+                     if k in kwargs}
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            parser = CifParser(path, **parser_kwargs)
+            return parser.get_structures(**kwargs), None
+    except Exception as ex:
+        return None, "%s: %s" % (ex.__class__.__name__, ex)
+
+
+def parse_cifs(paths, n_jobs=1, **kwargs):
+    """
+    Parses many CIF files, optionally in parallel. A file that cannot be
+    parsed does not stop the batch; the error is returned instead.
+
+    Args:
+        paths ([str]): Paths of the CIF files.
+        n_jobs (int): Number of processes to use. Defaults to 1, i.e., no
+            multiprocessing. -1 uses all the cores.
+        **kwargs: Passed to CifParser (occupancy_tolerance,
+            site_tolerance) and CifParser.get_structures (e.g., primitive).
+
+    Returns:
+        (structures, errors), where structures is a dict of path to the list
+        of structures in that file and errors is a dict of path to the error
+        message for each file that failed.
+    """
+    paths = [str(p) for p in paths]
+    args = [(p, dict(kwargs)) for p in paths]
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    if n_jobs and n_jobs > 1:
+        with Pool(n_jobs) as p:
+            results = p.map(_parse_cif, args,
+                            max(1, len(args) // (4 * n_jobs)))
+    else:
+        results = map(_parse_cif, args)
+    structures = {}
+    errors = {}
+    for path, (s, error) in zip(paths, results):
+        if error is None:
+            structures[path] = s
+        else:
+            errors[path] = error
+    return structures, errors
+
+
 def str2float(text):
     """
     Remove uncertainty brackets from strings and return the float.
@@ -8,7 +8,7 @@ import warnings
 
 import numpy as np
 
-from pymatgen.io.cif import CifParser, CifWriter, CifBlock
+from pymatgen.io.cif import CifParser, CifWriter, CifBlock, parse_cifs
 from pymatgen.io.vasp.inputs import Poscar
 from pymatgen import Element, Specie, Lattice, Structure, Composition, DummySpecie
 from pymatgen.analysis.structure_matcher import StructureMatcher
@@ -876,6 +876,29 @@ loop_
             self.assertIn("Some fractional co-ordinates rounded to ideal "
                           "values to avoid issues with finite precision.", p.warnings)
 
+    def test_parse_cifs(self):
+        files = [self.TEST_FILES_DIR / f for f in
+                 ["LiFePO4.cif", "bad_occu.cif", "Li2O.cif", "non_existent.cif"]]
+        for n_jobs in [1, 2, -1]:
+            structures, errors = parse_cifs(files, n_jobs=n_jobs)
+            self.assertEqual(structures[str(files[0])][0].formula,
+                             "Li4 Fe4 P4 O16")
+            self.assertEqual(structures[str(files[2])][0].formula, "Li2 O1")
+            self.assertEqual(sorted(errors), [str(files[1]), str(files[3])])
+            self.assertIn("ValueError", errors[str(files[1])])
+        structures, errors = parse_cifs(files[1:2], occupancy_tolerance=2,
+                                        primitive=False)
+        self.assertEqual(errors, {})
+
+    def test_large_supercell(self):
+        # The site merging must give the same structure for a P1 supercell
+        # as for the symmetrized cell.
+        s = self.get_structure("LiFePO4") * (3, 3, 3)
+        p = CifParser.from_string(str(CifWriter(s)))
+        self.assertTrue(StructureMatcher().fit(
+            p.get_structures(primitive=False)[0], s))
+        self.assertEqual(len(p.get_structures(primitive=False)[0]), len(s))
+
     def test_empty_deque(self):
         s = """data_1526655
 _journal_name_full
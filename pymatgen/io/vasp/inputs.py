@@ -21,6 +21,7 @@ import numpy as np
 
 from numpy.linalg import det
 from collections import OrderedDict, namedtuple
+from functools import lru_cache
 from hashlib import md5
 
 from monty.io import zopen
@@ -1641,6 +1642,19 @@ def _parse_list(s):
     return [float(y) for y in re.split(r"\s+", s.strip()) if not y.isalpha()]
 
 
+@lru_cache()
+def _load_potcar_hashes(filename):
+    # The hash databases are large, so they are only read once.
+    return loadfn(filename)
+
+
+@lru_cache(maxsize=None)
+def _get_potcar_single(filename, mtime):
+    # PotcarSingles read from the psp dir, keyed by the modification time of
+    # the file so that changes on disk are picked up.
+    return PotcarSingle.from_file(filename)
+
+
 Orbital = namedtuple("Orbital", ["n", "l", "j", "E", "occ"])
 OrbitalDescription = namedtuple(
     "OrbitalDescription", ["l", "E", "Type", "Rcut", "Type2", "Rcut2"]
@@ -1920,7 +1934,9 @@ class PotcarSingle:
     @staticmethod
     def from_symbol_and_functional(symbol: str, functional: str = None):
         """
-        Makes a PotcarSingle from a symbol and functional.
+        Makes a PotcarSingle from a symbol and functional. The PotcarSingles
+        are cached, so that the same POTCAR file is only read and validated
+        once, and the same object is returned by subsequent calls.
 
         :param symbol: Symbol, e.g., Li_sv
         :param functional: E.g., PBE
@@ -1946,7 +1962,7 @@ class PotcarSingle:
             p = os.path.expanduser(p)
             p = zpath(p)
             if os.path.exists(p):
-                psingle = PotcarSingle.from_file(p)
+                psingle = _get_potcar_single(p, os.path.getmtime(p))
                 return psingle
         raise IOError(
             "You do not have the right POTCAR with functional "
@@ -2101,10 +2117,10 @@ class PotcarSingle:
         cwd = os.path.abspath(os.path.dirname(__file__))
 
         if mode == 'data':
-            hash_db = loadfn(os.path.join(cwd, "vasp_potcar_pymatgen_hashes.json"))
+            hash_db = _load_potcar_hashes(os.path.join(cwd, "vasp_potcar_pymatgen_hashes.json"))
             potcar_hash = self.hash
         elif mode == 'file':
-            hash_db = loadfn(os.path.join(cwd, "vasp_potcar_file_hashes.json"))
+            hash_db = _load_potcar_hashes(os.path.join(cwd, "vasp_potcar_file_hashes.json"))
             potcar_hash = self.file_hash
         else:
             raise ValueError("Bad 'mode' argument. Specify 'data' or 'file'.")
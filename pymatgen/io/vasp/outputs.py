@@ -473,6 +473,57 @@ class Vasprun(MSONable):
         self.ionic_steps = ionic_steps
         self.vasp_version = self.generator["version"]
 
+    @classmethod
+    def iter_ionic_steps(cls, filename, fields=None, ionic_step_skip=None,
+                         ionic_step_offset=0):
+        """
+        Generator over the ionic steps in a vasprun.xml file. Unlike
+        initializing a Vasprun, only one ionic step is held in memory at a
+        time and processed elements are cleared from the xml tree, so memory
+        use stays constant regardless of the length of the run. This is the
+        recommended way of processing long AIMD runs.
+
+        Args:
+            filename (str): Filename to parse.
+            fields ([str]): Fields to decode for each ionic step, e.g.,
+                ["structure", "forces", "e_fr_energy"]. The available fields
+                are the keys of the dicts in Vasprun.ionic_steps, i.e.,
+                "structure", "electronic_steps", the energy terms and the
+                names of varrays such as "forces" and "stress". The raw
+                "lattice" and "frac_coords" arrays and the "species" of each
+                step can also be requested, which avoids creating Structure
+                objects. Defaults to None, which decodes everything except
+                these raw fields.
+            ionic_step_skip (int): If set, only every ionic_step_skip ionic
+                step is decoded.
+            ionic_step_offset (int): Index of the first ionic step to be
+                decoded when used together with ionic_step_skip.
+
+        Yields:
+            Ionic step dicts, in the same format as Vasprun.ionic_steps.
+        """
+        parser = cls.__new__(cls)
+        parser.filename = filename
+        fields = set(fields) if fields is not None else None
+        istep = 0
+        with zopen(filename, "rt") as f:
+            context = ET.iterparse(f, events=("start", "end"))
+            _, root = next(context)
+            for event, elem in context:
+                if event != "end":
+                    continue
+                tag = elem.tag
+                if tag == "atominfo":
+                    parser.atomic_symbols, _ = parser._parse_atominfo(elem)
+                elif tag == "calculation":
+                    if not ionic_step_skip or (
+                            istep >= ionic_step_offset and
+                            (istep - ionic_step_offset) % ionic_step_skip == 0):
+                        yield parser._parse_calculation(elem, fields=fields)
+                    istep += 1
+                    elem.clear()
+                    root.clear()
+
     @property
     def structures(self):
         """
@@ -1166,30 +1217,51 @@ class Vasprun(MSONable):
         calculation[-1].update(calculation[-1]["electronic_steps"][-1])
         return calculation
 
-    def _parse_calculation(self, elem):
+    def _parse_calculation(self, elem, fields=None):
+        def wanted(name):
+            return fields is None or name in fields
+
         try:
             istep = {i.attrib["name"]: float(i.text)
-                     for i in elem.find("energy").findall("i")}
+                     for i in elem.find("energy").findall("i")
+                     if wanted(i.attrib["name"])}
         except AttributeError:  # not all calculations have an energy
             istep = {}
             pass
         esteps = []
-        for scstep in elem.findall("scstep"):
+        if wanted("electronic_steps"):
+            for scstep in elem.findall("scstep"):
+                try:
+                    d = {i.attrib["name"]: _vasprun_float(i.text)
+                         for i in scstep.find("energy").findall("i")}
+                    esteps.append(d)
+                except AttributeError:  # not all calculations have an energy
+                    pass
+        s = None
+        if wanted("structure"):
             try:
-                d = {i.attrib["name"]: _vasprun_float(i.text)
-                     for i in scstep.find("energy").findall("i")}
-                esteps.append(d)
-            except AttributeError:  # not all calculations have an energy
+                s = self._parse_structure(elem.find("structure"))
+            except AttributeError:  # not all calculations have a structure
                 pass
-        try:
-            s = self._parse_structure(elem.find("structure"))
-        except AttributeError:  # not all calculations have a structure
-            s = None
-            pass
         for va in elem.findall("varray"):
-            istep[va.attrib["name"]] = _parse_varray(va)
-        istep["electronic_steps"] = esteps
-        istep["structure"] = s
+            if wanted(va.attrib["name"]):
+                istep[va.attrib["name"]] = _parse_varray(va)
+        if wanted("electronic_steps"):
+            istep["electronic_steps"] = esteps
+        if wanted("structure"):
+            istep["structure"] = s
+        # Raw array fields are only decoded on request, e.g., for building
+        # a Trajectory without creating intermediate Structure objects.
+        if fields is not None:
+            selem = elem.find("structure")
+            if "lattice" in fields:
+                istep["lattice"] = np.array(
+                    _parse_varray(selem.find("crystal").find("varray")))
+            if "frac_coords" in fields:
+                istep["frac_coords"] = np.array(
+                    _parse_varray(selem.find("varray")))
+            if "species" in fields:
+                istep["species"] = self.atomic_symbols
         elem.clear()
         return istep
 
@@ -1401,6 +1473,92 @@ class BSVasprun(Vasprun):
         return jsanitize(d, strict=True)
 
 
+def _get_prefilter(regexes):
+    """
+    Combines regexes into a single one that matches the lines matched by any
+    of them, so that a pass over a large OUTCAR only has to run one search on
+    most lines.
+
+    Args:
+        regexes: Sequence of str or compiled regexes.
+
+    Returns:
+        Compiled regex, or None if the regexes cannot be safely combined (e.g.,
+        they use backreferences or flags).
+    """
+    patterns = []
+    for r in regexes:
+        if not isinstance(r, str):
+            if r.flags != re.UNICODE:
+                return None
+            r = r.pattern
+        if re.search(r"\\\d|\(\?P=", r):
+            return None
+        patterns.append("(?:%s)" % r)
+    if not patterns:
+        return None
+    try:
+        return re.compile("|".join(patterns))
+    except re.error:
+        return None
+
+
+def _grep_lines(lines, patterns, terminate_on_match=False, postprocess=str):
+    """
+    Same as monty's regrep for a forward read, but over an iterable of lines.
+    Lines that none of the patterns match are skipped with a single search.
+    """
+    compiled = {k: re.compile(v) for k, v in patterns.items()}
+    prefilter = _get_prefilter(list(compiled.values()))
+    matches = defaultdict(list)
+    for i, l in enumerate(lines):
+        if prefilter is not None and not prefilter.search(l):
+            continue
+        for k, p in compiled.items():
+            m = p.search(l)
+            if m:
+                matches[k].append([[postprocess(g) for g in m.groups()], i])
+        if terminate_on_match and all(len(matches.get(k, [])) for k in compiled.keys()):
+            break
+    return matches
+
+
+def _micro_pyawk_lines(lines, search, results):
+    """
+    Same as pymatgen.util.io_utils.micro_pyawk, but over an iterable of lines.
+    Lines that none of the regexes of the search program match are skipped
+    with a single search.
+    """
+    for entry in search:
+        entry[0] = re.compile(entry[0])
+    prefilter = _get_prefilter([entry[0] for entry in search])
+    for line in lines:
+        if prefilter is not None and not prefilter.search(line):
+            continue
+        for entry in search:
+            match = entry[0].search(line)
+            if match and (entry[1] is None or entry[1](results, line)):
+                entry[2](results, match)
+    return results
+
+
+def _reraise_as(func, error):
+    """
+    Wraps func so that any exception it raises is re-raised as
+    Exception(error). Returns func unchanged if func or error is None.
+    """
+    if func is None or error is None:
+        return func
+
+    def wrapped(*args):
+        try:
+            return func(*args)
+        except Exception:
+            raise Exception(error)
+
+    return wrapped
+
+
 class Outcar:
     """
     Parser for data in OUTCAR that is not available in Vasprun.xml
@@ -1497,18 +1655,39 @@ class Outcar:
 
     One can then call a specific reader depending on the type of run being
     performed. These are currently: read_igpar(), read_lepsilon() and
-    read_lcalcpol(), read_core_state_eign(), read_avg_core_pot().
+    read_lcalcpol(), read_core_state_eign(), read_avg_core_pot(). Several
+    readers can be run together with read_multiple(), which reads the OUTCAR
+    once for all of them.
 
     See the documentation of those methods for more documentation.
 
     Authors: Rickard Armiento, Shyue Ping Ong
     """
 
-    def __init__(self, filename):
+    SECTIONS = ("nplwv", "drift", "dfpt", "lepsilon", "lcalcpol", "electrostatic",
+                "nmr_cs", "nmr_efg", "onsite_density_matrices", "final_energy_contribs")
+
+    def __init__(self, filename, sections=None):
         """
         Args:
             filename (str): OUTCAR filename to parse.
-        """
+            sections ([str]): Sections of the OUTCAR to parse, among
+                Outcar.SECTIONS. Defaults to None, i.e., all of them. The data
+                at the end of the OUTCAR (charge, magnetization, run_stats,
+                etc.) and the spin and noncollinear flags are always parsed.
+                The flags of the sections that are not parsed (dfpt,
+                lepsilon, lcalcpol, nmr_cs, nmr_efg,
+                has_onsite_density_matrices) are False. When none of the nplwv,
+                electrostatic, nmr_cs, nmr_efg and onsite_density_matrices
+                sections are requested, the OUTCAR is streamed instead of
+                being read in memory, which is useful for very large files.
+        """
+        if sections is None:
+            sections = self.SECTIONS
+        unknown = set(sections).difference(self.SECTIONS)
+        if unknown:
+            raise ValueError("Unknown OUTCAR sections: %s. Supported sections "
+                             "are %s." % (sorted(unknown), list(self.SECTIONS)))
         self.filename = filename
         self.is_stopped = False
 
@@ -1645,124 +1824,257 @@ class Outcar:
         self.total_mag = total_mag
         self.final_energy = total_energy
         self.data = {}
+        self.spin = False
+        self.noncollinear = False
+        self.dfpt = False
+        self.lepsilon = False
+        self.lcalcpol = False
+        self.nmr_cs = False
+        self.nmr_efg = False
+        self.has_onsite_density_matrices = False
+        # data of the sections that may not be parsed
+        self.drift = []
+        self.final_energy_contribs = {}
+        self.ngf = None
+        self.sampling_radii = None
+        self.electrostatic_potential = None
+
+        # The tables are matched against the whole text, which is read once
+        # and shared by all the passes below.
+        self._text = None
+        try:
+            if "nplwv" in sections:
+                self._text = self._read_text()
+            self._read_sections(sections)
+        finally:
+            self._text = None
+
+    def _read_sections(self, sections):
+        """
+        Reads the given sections of the OUTCAR. All the patterns are grepped in
+        a single pass, after which the search programs of the sections that
+        are present are run in a second single pass. Only the tables of those
+        sections need the text of the whole file.
+        """
+        patterns = {"spin": r"ISPIN  =      2",
+                    "noncollinear": r"LNONCOLLINEAR =      T",
+                    "ibrion": r"IBRION =\s+([\-\d]+)"}
+        if "nplwv" in sections:
+            patterns["nplwv"] = r"total plane-waves  NPLWV =\s+(\*{6}|\d+)"
+        if "drift" in sections:
+            patterns["drift"] = r"total drift:\s+([\.\-\d]+)\s+([\.\-\d]+)\s+([\.\-\d]+)"
+        if "lepsilon" in sections:
+            patterns["epsilon"] = r"LEPSILON=     T"
+        if "lcalcpol" in sections:
+            patterns["calcpol"] = r"LCALCPOL   =     T"
+        if "electrostatic" in sections:
+            patterns["electrostatic"] = r"average \(electrostatic\) potential at core"
+        if "nmr_cs" in sections:
+            patterns["nmr_cs"] = r"LCHIMAG   =     (T)"
+        if "nmr_efg" in sections:
+            patterns["nmr_efg"] = r"NMR quadrupolar parameters"
+        if "onsite_density_matrices" in sections:
+            patterns["has_onsite_density_matrices"] = r"onsite density matrix"
+        energy_contribs = ["PSCENC", "TEWEN", "DENC", "EXHF", "XCENC", "PAW double counting",
+                           "EENTRO", "EBANDS", "EATOM", "Ediel_sol"]
+        if "final_energy_contribs" in sections:
+            for k in energy_contribs:
+                if k == "PAW double counting":
+                    patterns[k] = r"%s\s+=\s+([\.\-\d]+)\s+([\.\-\d]+)" % (k)
+                else:
+                    patterns[k] = r"%s\s+=\s+([\d\-\.]+)" % (k)
+        self.read_pattern(patterns)
+
+        # These keys were only ever matched once
+        for k in ["nplwv", "ibrion", "has_onsite_density_matrices"]:
+            if k in self.data:
+                self.data[k] = self.data[k][:1]
+        self.data["ibrion"] = [[int(i) for i in m] for m in self.data["ibrion"]]
 
         # Read "total number of plane waves", NPLWV:
-        self.read_pattern(
-            {"nplwv": r"total plane-waves  NPLWV =\s+(\*{6}|\d+)"},
-            terminate_on_match=True
-        )
-        try:
-            self.data["nplwv"] = [[int(self.data["nplwv"][0][0])]]
-        except ValueError:
-            self.data["nplwv"] = [[None]]
-
-        nplwvs_at_kpoints = [
-            n for [n] in self.read_table_pattern(
-                r"\n{3}-{104}\n{3}",
-                r".+plane waves:\s+(\*{6,}|\d+)",
-                r"maximum and minimum number of plane-waves"
-            )
-        ]
-        self.data["nplwvs_at_kpoints"] = [None for n in nplwvs_at_kpoints]
-        for (n, nplwv) in enumerate(nplwvs_at_kpoints):
+        if "nplwv" in sections:
             try:
-                self.data["nplwvs_at_kpoints"][n] = int(nplwv)
+                self.data["nplwv"] = [[int(self.data["nplwv"][0][0])]]
             except ValueError:
-                pass
+                self.data["nplwv"] = [[None]]
+
+            nplwvs_at_kpoints = [
+                n for [n] in self.read_table_pattern(
+                    r"\n{3}-{104}\n{3}",
+                    r".+plane waves:\s+(\*{6,}|\d+)",
+                    r"maximum and minimum number of plane-waves"
+                )
+            ]
+            self.data["nplwvs_at_kpoints"] = [None for n in nplwvs_at_kpoints]
+            for (n, nplwv) in enumerate(nplwvs_at_kpoints):
+                try:
+                    self.data["nplwvs_at_kpoints"][n] = int(nplwv)
+                except ValueError:
+                    pass
 
         # Read the drift:
-        self.read_pattern({
-            "drift": r"total drift:\s+([\.\-\d]+)\s+([\.\-\d]+)\s+([\.\-\d]+)"},
-            terminate_on_match=False,
-            postprocess=float)
-        self.drift = self.data.get('drift', [])
+        if "drift" in sections:
+            self.data["drift"] = [[float(i) for i in m] for m in self.data["drift"]]
+            self.drift = self.data["drift"]
 
         # Check if calculation is spin polarized
-        self.spin = False
-        self.read_pattern({'spin': 'ISPIN  =      2'})
         if self.data.get('spin', []):
             self.spin = True
 
         # Check if calculation is noncollinear
-        self.noncollinear = False
-        self.read_pattern({'noncollinear': 'LNONCOLLINEAR =      T'})
         if self.data.get('noncollinear', []):
             self.noncollinear = False
 
+        programs = []
+
         # Check if the calculation type is DFPT
-        self.dfpt = False
-        self.read_pattern({'ibrion': r"IBRION =\s+([\-\d]+)"},
-                          terminate_on_match=True,
-                          postprocess=int)
-        if self.data.get("ibrion", [[0]])[0][0] > 6:
+        if "dfpt" in sections and self.data.get("ibrion", [[0]])[0][0] > 6:
             self.dfpt = True
-            self.read_internal_strain_tensor()
+            programs.append(self._internal_strain_tensor_program())
 
         # Check to see if LEPSILON is true and read piezo data if so
-        self.lepsilon = False
-        self.read_pattern({'epsilon': 'LEPSILON=     T'})
         if self.data.get('epsilon', []):
             self.lepsilon = True
-            self.read_lepsilon()
+            programs.append(self._lepsilon_program())
             # only read ionic contribution if DFPT is turned on
-            if self.dfpt:
-                self.read_lepsilon_ionic()
+            if self.data.get("ibrion", [[0]])[0][0] > 6:
+                programs.append(self._lepsilon_ionic_program())
 
         # Check to see if LCALCPOL is true and read polarization data if so
-        self.lcalcpol = False
-        self.read_pattern({'calcpol': 'LCALCPOL   =     T'})
         if self.data.get('calcpol', []):
             self.lcalcpol = True
-            self.read_lcalcpol()
-            self.read_pseudo_zval()
+            programs.append(self._lcalcpol_program())
+            programs.append(self._pseudo_zval_program())
+
+        if programs:
+            self._run_search_programs(programs)
+
+        tables = []
 
         # Read electrostatic potential
-        self.read_pattern({
-            'electrostatic': r"average \(electrostatic\) potential at core"})
         if self.data.get('electrostatic', []):
-            self.read_electrostatic_potential()
+            tables.append(self.read_electrostatic_potential)
 
-        self.nmr_cs = False
-        self.read_pattern({"nmr_cs": r"LCHIMAG   =     (T)"})
         if self.data.get("nmr_cs", None):
             self.nmr_cs = True
-            self.read_chemical_shielding()
-            self.read_cs_g0_contribution()
-            self.read_cs_core_contribution()
-            self.read_cs_raw_symmetrized_tensors()
+            tables.extend([self.read_chemical_shielding,
+                           self.read_cs_g0_contribution,
+                           self.read_cs_core_contribution,
+                           self.read_cs_raw_symmetrized_tensors])
 
-        self.nmr_efg = False
-        self.read_pattern({"nmr_efg": r"NMR quadrupolar parameters"})
         if self.data.get("nmr_efg", None):
             self.nmr_efg = True
-            self.read_nmr_efg()
-            self.read_nmr_efg_tensor()
+            tables.extend([self.read_nmr_efg,
+                           self.read_nmr_efg_tensor])
 
-        self.has_onsite_density_matrices = False
-        self.read_pattern({"has_onsite_density_matrices": r"onsite density matrix"},
-                          terminate_on_match=True)
         if "has_onsite_density_matrices" in self.data:
             self.has_onsite_density_matrices = True
-            self.read_onsite_density_matrices()
+            tables.append(self.read_onsite_density_matrices)
+
+        if tables and self._text is None:
+            self._text = self._read_text()
+        for read_table in tables:
+            read_table()
 
         # Store the individual contributions to the final total energy
-        final_energy_contribs = {}
-        for k in ["PSCENC", "TEWEN", "DENC", "EXHF", "XCENC", "PAW double counting",
-                  "EENTRO", "EBANDS", "EATOM", "Ediel_sol"]:
-            if k == "PAW double counting":
-                self.read_pattern({k: r"%s\s+=\s+([\.\-\d]+)\s+([\.\-\d]+)" % (k)})
-            else:
-                self.read_pattern({k: r"%s\s+=\s+([\d\-\.]+)" % (k)})
-            if not self.data[k]:
-                continue
-            final_energy_contribs[k] = sum([float(f) for f in self.data[k][-1]])
-        self.final_energy_contribs = final_energy_contribs
+        if "final_energy_contribs" in sections:
+            final_energy_contribs = {}
+            for k in energy_contribs:
+                if not self.data[k]:
+                    continue
+                final_energy_contribs[k] = sum([float(f) for f in self.data[k][-1]])
+            self.final_energy_contribs = final_energy_contribs
+
+    def _read_text(self):
+        """
+        Returns the text of the OUTCAR, from the cache filled by __init__ if
+        there is one.
+        """
+        if getattr(self, "_text", None) is not None:
+            return self._text
+        with zopen(self.filename, "rt") as f:
+            return f.read()
+
+    def _iter_lines(self):
+        """
+        Yields the lines of the OUTCAR, from the cache filled by __init__ if
+        there is one.
+        """
+        if getattr(self, "_text", None) is not None:
+            yield from StringIO(self._text)
+        else:
+            with zopen(self.filename, "rt") as f:
+                yield from f
+
+    def _run_search_programs(self, programs):
+        """
+        Runs the micro_pyawk search programs of several readers in a single
+        pass over the OUTCAR and then finalizes them in order.
+
+        Args:
+            programs ([(search, finalize, error)]): search is a micro_pyawk
+                search program, finalize is None or a callable run after the
+                pass, and error, if not None, is the message of the Exception
+                raised if the program fails.
+        """
+        search = [[regex, _reraise_as(test, error), _reraise_as(run, error)]
+                  for prog, finalize, error in programs
+                  for regex, test, run in prog]
+        _micro_pyawk_lines(self._iter_lines(), search, self)
+        for prog, finalize, error in programs:
+            if finalize is not None:
+                _reraise_as(finalize, error)()
+
+    def read_multiple(self, readers):
+        """
+        Runs several readers with a single read of the OUTCAR. The search
+        programs of internal_strain_tensor, lepsilon, lepsilon_ionic,
+        lcalcpol and pseudo_zval are run together in one pass over the file.
+        If other readers are requested, the text of the OUTCAR is read in
+        memory once and shared by all of them.
+
+        Args:
+            readers ([str]): Names of the readers, i.e., of the read_*
+                methods without the "read_" prefix, e.g.,
+                ["lepsilon", "lcalcpol", "elastic_tensor"]. Readers are run
+                with their default arguments.
+
+        Returns:
+            Dict of the values returned by the readers that return one, e.g.,
+            read_core_state_eigen, with the reader names as keys.
+        """
+        methods = []
+        for name in readers:
+            method = getattr(self, "read_" + name, None)
+            if name in ("pattern", "table_pattern", "multiple") or \
+                    not callable(method):
+                raise ValueError("Unknown OUTCAR reader: %s." % name)
+            methods.append((name, method))
+        programs = [getattr(self, "_%s_program" % name)()
+                    for name, method in methods
+                    if hasattr(self, "_%s_program" % name)]
+        others = [(name, method) for name, method in methods
+                  if not hasattr(self, "_%s_program" % name)]
+        results = {}
+        try:
+            if others:
+                self._text = self._read_text()
+            if programs:
+                self._run_search_programs(programs)
+            for name, method in others:
+                value = method()
+                if value is not None:
+                    results[name] = value
+        finally:
+            self._text = None
+        return results
 
     def read_pattern(self, patterns, reverse=False, terminate_on_match=False,
                      postprocess=str):
         r"""
-        General pattern reading. Uses monty's regrep method. Takes the same
-        arguments.
+        General pattern reading. Takes the same arguments as monty's regrep,
+        which is used for reverse reads. Forward reads grep all the patterns
+        in a single pass over the OUTCAR.
 
         Args:
             patterns (dict): A dict of patterns, e.g.,
@@ -1782,9 +2094,14 @@ class Outcar:
             results from regex and postprocess. Note that the returned values
             are lists of lists, because you can grep multiple items on one line.
         """
-        matches = regrep(self.filename, patterns, reverse=reverse,
-                         terminate_on_match=terminate_on_match,
-                         postprocess=postprocess)
+        if reverse:
+            matches = regrep(self.filename, patterns, reverse=reverse,
+                             terminate_on_match=terminate_on_match,
+                             postprocess=postprocess)
+        else:
+            matches = _grep_lines(self._iter_lines(), patterns,
+                                  terminate_on_match=terminate_on_match,
+                                  postprocess=postprocess)
         for k in patterns.keys():
             self.data[k] = [i[0] for i in matches.get(k, [])]
 
@@ -1824,8 +2141,14 @@ class Outcar:
             row_pattern, or a dict in case that named capturing groups are defined by
             row_pattern.
         """
-        with zopen(self.filename, 'rt') as f:
-            text = f.read()
+        text = self._read_text()
+        if re.fullmatch(r"[\w \-]+", footer_pattern):
+            # Tables end with their footer, so nothing after the last
+            # occurrence of a literal footer can be matched. Cutting the text
+            # there avoids backtracking through the rest of the file for each
+            # header, which is very slow for row patterns that span lines.
+            end = text.rfind(footer_pattern)
+            text = text[:end + len(footer_pattern)] if end != -1 else ""
         table_pattern_text = header_pattern + r"\s*^(?P<table_body>(?:\s+" + row_pattern + r")+)\s+" + footer_pattern
         table_pattern = re.compile(table_pattern_text, re.MULTILINE | re.DOTALL)
         rp = re.compile(row_pattern)
@@ -2019,8 +2342,7 @@ class Outcar:
         row_pattern = r"\s+".join([r"([-]?\d+\.\d+)"] * 3)
         unsym_footer_pattern = r"^\s+SYMMETRIZED TENSORS\s+$"
 
-        with zopen(self.filename, 'rt') as f:
-            text = f.read()
+        text = self._read_text()
         unsym_table_pattern_text = header_pattern + first_part_pattern + r"(?P<table_body>.+)" + unsym_footer_pattern
         table_pattern = re.compile(unsym_table_pattern_text, re.MULTILINE | re.DOTALL)
         rp = re.compile(row_pattern)
@@ -2322,6 +2644,12 @@ class Outcar:
         Reads the internal strain tensor and populates self.internal_strain_tensor with an array of voigt notation
             tensors for each site.
         """
+        self._run_search_programs([self._internal_strain_tensor_program()])
+
+    def _internal_strain_tensor_program(self):
+        """
+        Returns the search program of read_internal_strain_tensor.
+        """
         search = []
 
         def internal_strain_start(results, match):
@@ -2352,7 +2680,7 @@ class Outcar:
 
         self.internal_strain_ion = None
         self.internal_strain_tensor = []
-        micro_pyawk(self.filename, search, self)
+        return search, None, None
 
     def read_lepsilon(self):
         """
@@ -2360,127 +2688,130 @@ class Outcar:
 
         # TODO: Document the actual variables.
         """
-        try:
-            search = []
-
-            def dielectric_section_start(results, match):
-                results.dielectric_index = -1
-
-            search.append([r"MACROSCOPIC STATIC DIELECTRIC TENSOR \(", None,
-                           dielectric_section_start])
-
-            def dielectric_section_start2(results, match):
-                results.dielectric_index = 0
-
-            search.append(
-                [r"-------------------------------------",
-                 lambda results, line: results.dielectric_index == -1,
-                 dielectric_section_start2])
-
-            def dielectric_data(results, match):
-                results.dielectric_tensor[results.dielectric_index, :] = \
-                    np.array([float(match.group(i)) for i in range(1, 4)])
-                results.dielectric_index += 1
-
-            search.append(
-                [r"^ *([-0-9.Ee+]+) +([-0-9.Ee+]+) +([-0-9.Ee+]+) *$",
-                 lambda results, line: results.dielectric_index >= 0
-                 if results.dielectric_index is not None
-                 else None,
-                 dielectric_data])
-
-            def dielectric_section_stop(results, match):
-                results.dielectric_index = None
-
-            search.append(
-                [r"-------------------------------------",
-                 lambda results, line: results.dielectric_index >= 1
-                 if results.dielectric_index is not None
-                 else None,
-                 dielectric_section_stop])
-
-            self.dielectric_index = None
-            self.dielectric_tensor = np.zeros((3, 3))
-
-            def piezo_section_start(results, match):
-                results.piezo_index = 0
-
-            search.append([r"PIEZOELECTRIC TENSOR  for field in x, y, z        "
-                           r"\(C/m\^2\)",
-                           None, piezo_section_start])
-
-            def piezo_data(results, match):
-                results.piezo_tensor[results.piezo_index, :] = \
-                    np.array([float(match.group(i)) for i in range(1, 7)])
-                results.piezo_index += 1
-
-            search.append(
-                [r"^ *[xyz] +([-0-9.Ee+]+) +([-0-9.Ee+]+)" +
-                 r" +([-0-9.Ee+]+) *([-0-9.Ee+]+) +([-0-9.Ee+]+)" +
-                 r" +([-0-9.Ee+]+)*$",
-                 lambda results, line: results.piezo_index >= 0
-                 if results.piezo_index is not None
-                 else None,
-                 piezo_data])
-
-            def piezo_section_stop(results, match):
-                results.piezo_index = None
-
-            search.append(
-                [r"-------------------------------------",
-                 lambda results, line: results.piezo_index >= 1
-                 if results.piezo_index is not None
-                 else None,
-                 piezo_section_stop])
-
-            self.piezo_index = None
-            self.piezo_tensor = np.zeros((3, 6))
-
-            def born_section_start(results, match):
-                results.born_ion = -1
-
-            search.append([r"BORN EFFECTIVE CHARGES ",
-                           None, born_section_start])
-
-            def born_ion(results, match):
-                results.born_ion = int(match.group(1)) - 1
-                results.born.append(np.zeros((3, 3)))
-
-            search.append([r"ion +([0-9]+)", lambda results, line: results.born_ion is not None, born_ion])
-
-            def born_data(results, match):
-                results.born[results.born_ion][int(match.group(1)) - 1, :] = \
-                    np.array([float(match.group(i)) for i in range(2, 5)])
-
-            search.append(
-                [r"^ *([1-3]+) +([-0-9.Ee+]+) +([-0-9.Ee+]+) +([-0-9.Ee+]+)$",
-                 lambda results, line: results.born_ion >= 0
-                 if results.born_ion is not None
-                 else results.born_ion,
-                 born_data])
-
-            def born_section_stop(results, match):
-                results.born_ion = None
-
-            search.append(
-                [r"-------------------------------------",
-                 lambda results, line: results.born_ion >= 1
-                 if results.born_ion is not None
-                 else results.born_ion,
-                 born_section_stop])
-
-            self.born_ion = None
-            self.born = []
+        self._run_search_programs([self._lepsilon_program()])
 
-            micro_pyawk(self.filename, search, self)
+    def _lepsilon_program(self):
+        """
+        Returns the search program of read_lepsilon.
+        """
+        search = []
 
+        def dielectric_section_start(results, match):
+            results.dielectric_index = -1
+
+        search.append([r"MACROSCOPIC STATIC DIELECTRIC TENSOR \(", None,
+                       dielectric_section_start])
+
+        def dielectric_section_start2(results, match):
+            results.dielectric_index = 0
+
+        search.append(
+            [r"-------------------------------------",
+             lambda results, line: results.dielectric_index == -1,
+             dielectric_section_start2])
+
+        def dielectric_data(results, match):
+            results.dielectric_tensor[results.dielectric_index, :] = \
+                np.array([float(match.group(i)) for i in range(1, 4)])
+            results.dielectric_index += 1
+
+        search.append(
+            [r"^ *([-0-9.Ee+]+) +([-0-9.Ee+]+) +([-0-9.Ee+]+) *$",
+             lambda results, line: results.dielectric_index >= 0
+             if results.dielectric_index is not None
+             else None,
+             dielectric_data])
+
+        def dielectric_section_stop(results, match):
+            results.dielectric_index = None
+
+        search.append(
+            [r"-------------------------------------",
+             lambda results, line: results.dielectric_index >= 1
+             if results.dielectric_index is not None
+             else None,
+             dielectric_section_stop])
+
+        self.dielectric_index = None
+        self.dielectric_tensor = np.zeros((3, 3))
+
+        def piezo_section_start(results, match):
+            results.piezo_index = 0
+
+        search.append([r"PIEZOELECTRIC TENSOR  for field in x, y, z        "
+                       r"\(C/m\^2\)",
+                       None, piezo_section_start])
+
+        def piezo_data(results, match):
+            results.piezo_tensor[results.piezo_index, :] = \
+                np.array([float(match.group(i)) for i in range(1, 7)])
+            results.piezo_index += 1
+
+        search.append(
+            [r"^ *[xyz] +([-0-9.Ee+]+) +([-0-9.Ee+]+)" +
+             r" +([-0-9.Ee+]+) *([-0-9.Ee+]+) +([-0-9.Ee+]+)" +
+             r" +([-0-9.Ee+]+)*$",
+             lambda results, line: results.piezo_index >= 0
+             if results.piezo_index is not None
+             else None,
+             piezo_data])
+
+        def piezo_section_stop(results, match):
+            results.piezo_index = None
+
+        search.append(
+            [r"-------------------------------------",
+             lambda results, line: results.piezo_index >= 1
+             if results.piezo_index is not None
+             else None,
+             piezo_section_stop])
+
+        self.piezo_index = None
+        self.piezo_tensor = np.zeros((3, 6))
+
+        def born_section_start(results, match):
+            results.born_ion = -1
+
+        search.append([r"BORN EFFECTIVE CHARGES ",
+                       None, born_section_start])
+
+        def born_ion(results, match):
+            results.born_ion = int(match.group(1)) - 1
+            results.born.append(np.zeros((3, 3)))
+
+        search.append([r"ion +([0-9]+)", lambda results, line: results.born_ion is not None, born_ion])
+
+        def born_data(results, match):
+            results.born[results.born_ion][int(match.group(1)) - 1, :] = \
+                np.array([float(match.group(i)) for i in range(2, 5)])
+
+        search.append(
+            [r"^ *([1-3]+) +([-0-9.Ee+]+) +([-0-9.Ee+]+) +([-0-9.Ee+]+)$",
+             lambda results, line: results.born_ion >= 0
+             if results.born_ion is not None
+             else results.born_ion,
+             born_data])
+
+        def born_section_stop(results, match):
+            results.born_ion = None
+
+        search.append(
+            [r"-------------------------------------",
+             lambda results, line: results.born_ion >= 1
+             if results.born_ion is not None
+             else results.born_ion,
+             born_section_stop])
+
+        self.born_ion = None
+        self.born = []
+
+        def finalize():
             self.born = np.array(self.born)
 
             self.dielectric_tensor = self.dielectric_tensor.tolist()
             self.piezo_tensor = self.piezo_tensor.tolist()
 
-        except Exception:
-            raise Exception("LEPSILON OUTCAR could not be parsed.")
+        return search, finalize, "LEPSILON OUTCAR could not be parsed."
 
     def read_lepsilon_ionic(self):
         """
@@ -2488,92 +2819,94 @@ class Outcar:
 
         # TODO: Document the actual variables.
         """
-        try:
-            search = []
+        self._run_search_programs([self._lepsilon_ionic_program()])
 
-            def dielectric_section_start(results, match):
-                results.dielectric_ionic_index = -1
-
-            search.append([r"MACROSCOPIC STATIC DIELECTRIC TENSOR IONIC", None,
-                           dielectric_section_start])
-
-            def dielectric_section_start2(results, match):
-                results.dielectric_ionic_index = 0
-
-            search.append(
-                [r"-------------------------------------",
-                 lambda results, line: results.dielectric_ionic_index == -1
-                 if results.dielectric_ionic_index is not None
-                 else results.dielectric_ionic_index,
-                 dielectric_section_start2])
-
-            def dielectric_data(results, match):
-                results.dielectric_ionic_tensor[results.dielectric_ionic_index, :] = \
-                    np.array([float(match.group(i)) for i in range(1, 4)])
-                results.dielectric_ionic_index += 1
-
-            search.append(
-                [r"^ *([-0-9.Ee+]+) +([-0-9.Ee+]+) +([-0-9.Ee+]+) *$",
-                 lambda results, line: results.dielectric_ionic_index >= 0
-                 if results.dielectric_ionic_index is not None
-                 else results.dielectric_ionic_index,
-                 dielectric_data])
-
-            def dielectric_section_stop(results, match):
-                results.dielectric_ionic_index = None
-
-            search.append(
-                [r"-------------------------------------",
-                 lambda results, line: results.dielectric_ionic_index >= 1
-                 if results.dielectric_ionic_index is not None
-                 else results.dielectric_ionic_index,
-                 dielectric_section_stop])
-
-            self.dielectric_ionic_index = None
-            self.dielectric_ionic_tensor = np.zeros((3, 3))
-
-            def piezo_section_start(results, match):
-                results.piezo_ionic_index = 0
-
-            search.append([r"PIEZOELECTRIC TENSOR IONIC CONTR  for field in "
-                           r"x, y, z        ",
-                           None, piezo_section_start])
-
-            def piezo_data(results, match):
-                results.piezo_ionic_tensor[results.piezo_ionic_index, :] = \
-                    np.array([float(match.group(i)) for i in range(1, 7)])
-                results.piezo_ionic_index += 1
-
-            search.append(
-                [r"^ *[xyz] +([-0-9.Ee+]+) +([-0-9.Ee+]+)" +
-                 r" +([-0-9.Ee+]+) *([-0-9.Ee+]+) +([-0-9.Ee+]+)" +
-                 r" +([-0-9.Ee+]+)*$",
-                 lambda results, line: results.piezo_ionic_index >= 0
-                 if results.piezo_ionic_index is not None
-                 else results.piezo_ionic_index,
-                 piezo_data])
-
-            def piezo_section_stop(results, match):
-                results.piezo_ionic_index = None
-
-            search.append(
-                ["-------------------------------------",
-                 lambda results, line: results.piezo_ionic_index >= 1
-                 if results.piezo_ionic_index is not None
-                 else results.piezo_ionic_index,
-                 piezo_section_stop])
-
-            self.piezo_ionic_index = None
-            self.piezo_ionic_tensor = np.zeros((3, 6))
-
-            micro_pyawk(self.filename, search, self)
+    def _lepsilon_ionic_program(self):
+        """
+        Returns the search program of read_lepsilon_ionic.
+        """
+        search = []
 
+        def dielectric_section_start(results, match):
+            results.dielectric_ionic_index = -1
+
+        search.append([r"MACROSCOPIC STATIC DIELECTRIC TENSOR IONIC", None,
+                       dielectric_section_start])
+
+        def dielectric_section_start2(results, match):
+            results.dielectric_ionic_index = 0
+
+        search.append(
+            [r"-------------------------------------",
+             lambda results, line: results.dielectric_ionic_index == -1
+             if results.dielectric_ionic_index is not None
+             else results.dielectric_ionic_index,
+             dielectric_section_start2])
+
+        def dielectric_data(results, match):
+            results.dielectric_ionic_tensor[results.dielectric_ionic_index, :] = \
+                np.array([float(match.group(i)) for i in range(1, 4)])
+            results.dielectric_ionic_index += 1
+
+        search.append(
+            [r"^ *([-0-9.Ee+]+) +([-0-9.Ee+]+) +([-0-9.Ee+]+) *$",
+             lambda results, line: results.dielectric_ionic_index >= 0
+             if results.dielectric_ionic_index is not None
+             else results.dielectric_ionic_index,
+             dielectric_data])
+
+        def dielectric_section_stop(results, match):
+            results.dielectric_ionic_index = None
+
+        search.append(
+            [r"-------------------------------------",
+             lambda results, line: results.dielectric_ionic_index >= 1
+             if results.dielectric_ionic_index is not None
+             else results.dielectric_ionic_index,
+             dielectric_section_stop])
+
+        self.dielectric_ionic_index = None
+        self.dielectric_ionic_tensor = np.zeros((3, 3))
+
+        def piezo_section_start(results, match):
+            results.piezo_ionic_index = 0
+
+        search.append([r"PIEZOELECTRIC TENSOR IONIC CONTR  for field in "
+                       r"x, y, z        ",
+                       None, piezo_section_start])
+
+        def piezo_data(results, match):
+            results.piezo_ionic_tensor[results.piezo_ionic_index, :] = \
+                np.array([float(match.group(i)) for i in range(1, 7)])
+            results.piezo_ionic_index += 1
+
+        search.append(
+            [r"^ *[xyz] +([-0-9.Ee+]+) +([-0-9.Ee+]+)" +
+             r" +([-0-9.Ee+]+) *([-0-9.Ee+]+) +([-0-9.Ee+]+)" +
+             r" +([-0-9.Ee+]+)*$",
+             lambda results, line: results.piezo_ionic_index >= 0
+             if results.piezo_ionic_index is not None
+             else results.piezo_ionic_index,
+             piezo_data])
+
+        def piezo_section_stop(results, match):
+            results.piezo_ionic_index = None
+
+        search.append(
+            ["-------------------------------------",
+             lambda results, line: results.piezo_ionic_index >= 1
+             if results.piezo_ionic_index is not None
+             else results.piezo_ionic_index,
+             piezo_section_stop])
+
+        self.piezo_ionic_index = None
+        self.piezo_ionic_tensor = np.zeros((3, 6))
+
+        def finalize():
             self.dielectric_ionic_tensor = self.dielectric_ionic_tensor.tolist()
             self.piezo_ionic_tensor = self.piezo_ionic_tensor.tolist()
 
-        except Exception:
-            raise Exception(
-                "ionic part of LEPSILON OUTCAR could not be parsed.")
+        return search, finalize, "ionic part of LEPSILON OUTCAR could not be parsed."
 
     def read_lcalcpol(self):
         """
@@ -2581,81 +2914,87 @@ class Outcar:
 
         # TODO: Document the actual variables.
         """
+        self._run_search_programs([self._lcalcpol_program()])
+
+    def _lcalcpol_program(self):
+        """
+        Returns the search program of read_lcalcpol.
+        """
         self.p_elec = None
         self.p_sp1 = None
         self.p_sp2 = None
         self.p_ion = None
-        try:
-            search = []
+        search = []
 
-            # Always present spin/non-spin
-            def p_elec(results, match):
-                results.p_elec = np.array([float(match.group(1)),
-                                           float(match.group(2)),
-                                           float(match.group(3))])
+        # Always present spin/non-spin
+        def p_elec(results, match):
+            results.p_elec = np.array([float(match.group(1)),
+                                       float(match.group(2)),
+                                       float(match.group(3))])
+
+        search.append([r"^.*Total electronic dipole moment: "
+                       r"*p\[elc\]=\( *([-0-9.Ee+]*) *([-0-9.Ee+]*) "
+                       r"*([-0-9.Ee+]*) *\)",
+                       None, p_elec])
+
+        # If spin-polarized (and not noncollinear)
+        # save spin-polarized electronic values
+        if self.spin and not self.noncollinear:
+            def p_sp1(results, match):
+                results.p_sp1 = np.array([float(match.group(1)),
+                                          float(match.group(2)),
+                                          float(match.group(3))])
 
-            search.append([r"^.*Total electronic dipole moment: "
-                           r"*p\[elc\]=\( *([-0-9.Ee+]*) *([-0-9.Ee+]*) "
+            search.append([r"^.*p\[sp1\]=\( *([-0-9.Ee+]*) *([-0-9.Ee+]*) "
                            r"*([-0-9.Ee+]*) *\)",
-                           None, p_elec])
+                           None, p_sp1])
 
-            # If spin-polarized (and not noncollinear)
-            # save spin-polarized electronic values
-            if self.spin and not self.noncollinear:
-                def p_sp1(results, match):
-                    results.p_sp1 = np.array([float(match.group(1)),
-                                              float(match.group(2)),
-                                              float(match.group(3))])
-
-                search.append([r"^.*p\[sp1\]=\( *([-0-9.Ee+]*) *([-0-9.Ee+]*) "
-                               r"*([-0-9.Ee+]*) *\)",
-                               None, p_sp1])
-
-                def p_sp2(results, match):
-                    results.p_sp2 = np.array([float(match.group(1)),
-                                              float(match.group(2)),
-                                              float(match.group(3))])
-
-                search.append([r"^.*p\[sp2\]=\( *([-0-9.Ee+]*) *([-0-9.Ee+]*) "
-                               r"*([-0-9.Ee+]*) *\)",
-                               None, p_sp2])
-
-            def p_ion(results, match):
-                results.p_ion = np.array([float(match.group(1)),
+            def p_sp2(results, match):
+                results.p_sp2 = np.array([float(match.group(1)),
                                           float(match.group(2)),
                                           float(match.group(3))])
 
-            search.append([r"^.*Ionic dipole moment: *p\[ion\]="
-                           r"\( *([-0-9.Ee+]*)"
-                           r" *([-0-9.Ee+]*) *([-0-9.Ee+]*) *\)",
-                           None, p_ion])
+            search.append([r"^.*p\[sp2\]=\( *([-0-9.Ee+]*) *([-0-9.Ee+]*) "
+                           r"*([-0-9.Ee+]*) *\)",
+                           None, p_sp2])
 
-            micro_pyawk(self.filename, search, self)
+        def p_ion(results, match):
+            results.p_ion = np.array([float(match.group(1)),
+                                      float(match.group(2)),
+                                      float(match.group(3))])
 
-        except Exception:
-            raise Exception("LCALCPOL OUTCAR could not be parsed.")
+        search.append([r"^.*Ionic dipole moment: *p\[ion\]="
+                       r"\( *([-0-9.Ee+]*)"
+                       r" *([-0-9.Ee+]*) *([-0-9.Ee+]*) *\)",
+                       None, p_ion])
+
+        return search, None, "LCALCPOL OUTCAR could not be parsed."
 
     def read_pseudo_zval(self):
         """
         Create pseudopotential ZVAL dictionary.
         """
-        try:
-            def atom_symbols(results, match):
-                element_symbol = match.group(1)
-                if not hasattr(results, 'atom_symbols'):
-                    results.atom_symbols = []
-                results.atom_symbols.append(element_symbol.strip())
+        self._run_search_programs([self._pseudo_zval_program()])
 
-            def zvals(results, match):
-                zvals = match.group(1)
-                results.zvals = map(float, re.findall(r'-?\d+\.\d*', zvals))
+    def _pseudo_zval_program(self):
+        """
+        Returns the search program of read_pseudo_zval.
+        """
+        def atom_symbols(results, match):
+            element_symbol = match.group(1)
+            if not hasattr(results, 'atom_symbols'):
+                results.atom_symbols = []
+            results.atom_symbols.append(element_symbol.strip())
 
-            search = []
-            search.append([r'(?<=VRHFIN =)(.*)(?=:)', None, atom_symbols])
-            search.append([r'^\s+ZVAL.*=(.*)', None, zvals])
+        def zvals(results, match):
+            zvals = match.group(1)
+            results.zvals = map(float, re.findall(r'-?\d+\.\d*', zvals))
 
-            micro_pyawk(self.filename, search, self)
+        search = []
+        search.append([r'(?<=VRHFIN =)(.*)(?=:)', None, atom_symbols])
+        search.append([r'^\s+ZVAL.*=(.*)', None, zvals])
 
+        def finalize():
             zval_dict = {}
             for x, y in zip(self.atom_symbols, self.zvals):
                 zval_dict.update({x: y})
@@ -2664,8 +3003,8 @@ class Outcar:
             # Clean-up
             del (self.atom_symbols)
             del (self.zvals)
-        except Exception:
-            raise Exception("ZVAL dict could not be parsed.")
+
+        return search, finalize, "ZVAL dict could not be parsed."
 
     def read_core_state_eigen(self):
         """
@@ -2855,6 +3194,21 @@ class Outcar:
         self.data["fermi_contact_shift"] = fc_shift_table
 
 
+def _parse_floats(text):
+    """
+    Parses whitespace separated floats with np.fromstring. Text with tokens
+    which are not numbers is parsed token by token, so that the ValueError
+    of float is raised for them.
+    """
+    with warnings.catch_warnings():
+        # np.fromstring warns, instead of raising, when it stops early
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            return np.fromstring(text, sep=" ")
+        except DeprecationWarning:
+            return np.array(text.split(), dtype=float)
+
+
 class VolumetricData(MSONable):
     """
     Simple volumetric object for reading LOCPOT and CHGCAR type files.
@@ -2982,20 +3336,68 @@ class VolumetricData(MSONable):
         return VolumetricData(self.structure, data, self._distance_matrix)
 
     @staticmethod
-    def parse_file(filename):
+    def _read_data_block(f, first_line, dim):
+        """
+        Reads one block of volumetric data in bulk. Lines are pulled from the
+        file in batches and parsed by np.fromstring, without creating a Python
+        string per grid point. A batch never holds more lines than the number
+        of values still missing divided by the largest number of values per
+        line (that of the first line, and at least 10), so no line past the
+        block is read even if the layout of the lines is irregular.
+
+        Args:
+            f: Open file handle positioned just after first_line.
+            first_line (str): First line of data in the block.
+            dim ([int]): Dimensions of the grid (nx, ny, nz).
+
+        Returns:
+            np.array of shape dim.
+        """
+        ngrid_pts = dim[0] * dim[1] * dim[2]
+        max_per_line = max(len(first_line.split()), 10)
+        values = [_parse_floats(first_line)]
+        remaining = ngrid_pts - len(values[0])
+        while remaining > 0:
+            text = " ".join(itertools.islice(
+                f, max(remaining // max_per_line, 1)))
+            if not text:
+                raise VaspParserError("Expected %d grid points, found %d."
+                                      % (ngrid_pts, ngrid_pts - remaining))
+            values.append(_parse_floats(text))
+            remaining -= len(values[-1])
+        if remaining < 0:
+            raise VaspParserError("Expected %d grid points, found %d."
+                                  % (ngrid_pts, ngrid_pts - remaining))
+        values = np.concatenate(values)
+        # vasp outputs x as the fastest index, followed by y then z, i.e.,
+        # Fortran ordering.
+        return values.reshape(dim, order="F")
+
+    @staticmethod
+    def parse_file(filename, cache=False):
         """
         Convenience method to parse a generic volumetric data file in the vasp
         like format. Used by subclasses for parsing file.
 
         Args:
             filename (str): Path of file to parse
+            cache (bool): If True, the parsed data is saved in a directory
+                named filename + ".npy_cache" as .npy arrays. Subsequent
+                parses of an unmodified file load the data from the cache in
+                memory-mapped (read-only) mode instead of re-parsing the
+                file, which is much faster for large grids.
 
         Returns:
             (poscar, data)
         """
+        if cache:
+            cache_dir = str(filename) + ".npy_cache"
+            cached = VolumetricData._load_npy_cache(filename, cache_dir)
+            if cached is not None:
+                return cached
+
         poscar_read = False
         poscar_string = []
-        dataset = []
         all_dataset = []
         # for holding any strings in input that are not Poscar
         # or VolumetricData (typically augmentation charges)
@@ -3003,29 +3405,15 @@ class VolumetricData(MSONable):
         dim = None
         dimline = None
         read_dataset = False
-        ngrid_pts = 0
-        data_count = 0
         poscar = None
         with zopen(filename, "rt") as f:
             for line in f:
                 original_line = line
                 line = line.strip()
                 if read_dataset:
-                    toks = line.split()
-                    for tok in toks:
-                        if data_count < ngrid_pts:
-                            # This complicated procedure is necessary because
-                            # vasp outputs x as the fastest index, followed by y
-                            # then z.
-                            x = data_count % dim[0]
-                            y = int(math.floor(data_count / dim[0])) % dim[1]
-                            z = int(math.floor(data_count / dim[0] / dim[1]))
-                            dataset[x, y, z] = float(tok)
-                            data_count += 1
-                    if data_count >= ngrid_pts:
-                        read_dataset = False
-                        data_count = 0
-                        all_dataset.append(dataset)
+                    all_dataset.append(
+                        VolumetricData._read_data_block(f, line, dim))
+                    read_dataset = False
                 elif not poscar_read:
                     if line != "" or len(poscar_string) == 0:
                         poscar_string.append(line)
@@ -3034,15 +3422,12 @@ class VolumetricData(MSONable):
                         poscar_read = True
                 elif not dim:
                     dim = [int(i) for i in line.split()]
-                    ngrid_pts = dim[0] * dim[1] * dim[2]
                     dimline = line
                     read_dataset = True
-                    dataset = np.zeros(dim)
                 elif line == dimline:
                     # when line == dimline, expect volumetric data to follow
                     # so set read_dataset to True
                     read_dataset = True
-                    dataset = np.zeros(dim)
                 else:
                     # store any extra lines that were not part of the
                     # volumetric data so we know which set of data the extra
@@ -3082,7 +3467,43 @@ class VolumetricData(MSONable):
             else:
                 data = {"total": all_dataset[0]}
                 data_aug = {"total": all_dataset_aug.get(0, None)}
-            return poscar, data, data_aug
+
+        if cache:
+            VolumetricData._write_npy_cache(cache_dir, poscar, data, data_aug)
+        return poscar, data, data_aug
+
+    @staticmethod
+    def _write_npy_cache(cache_dir, poscar, data, data_aug):
+        """
+        Writes parsed volumetric data to a directory of .npy files, plus a
+        json file holding the Poscar and augmentation data.
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        for k, v in data.items():
+            np.save(os.path.join(cache_dir, "%s.npy" % k), v)
+        with open(os.path.join(cache_dir, "meta.json"), "w") as f:
+            json.dump({"poscar": poscar.as_dict(), "data_aug": data_aug,
+                       "keys": list(data.keys())}, f)
+
+    @staticmethod
+    def _load_npy_cache(filename, cache_dir):
+        """
+        Loads volumetric data from a .npy cache directory written by
+        _write_npy_cache. Arrays are memory-mapped in read-only mode.
+
+        Returns:
+            (poscar, data, data_aug), or None if there is no up-to-date cache.
+        """
+        meta_file = os.path.join(cache_dir, "meta.json")
+        if not os.path.exists(meta_file) or \
+                os.path.getmtime(meta_file) < os.path.getmtime(filename):
+            return None
+        with open(meta_file) as f:
+            meta = json.load(f)
+        data = {k: np.load(os.path.join(cache_dir, "%s.npy" % k),
+                           mmap_mode="r")
+                for k in meta["keys"]}
+        return Poscar.from_dict(meta["poscar"]), data, meta["data_aug"]
 
     def write_file(self, file_name, vasp4_compatible=False):
         """
@@ -3305,14 +3726,17 @@ class Locpot(VolumetricData):
         self.name = poscar.comment
 
     @classmethod
-    def from_file(cls, filename, **kwargs):
+    def from_file(cls, filename, cache=False, **kwargs):
         """
         Reads a LOCPOT file.
 
         :param filename: Filename
+        :param cache: Whether to cache the parsed data as memory-mappable
+            .npy files. See VolumetricData.parse_file.
         :return: Locpot
         """
-        (poscar, data, data_aug) = VolumetricData.parse_file(filename)
+        (poscar, data, data_aug) = VolumetricData.parse_file(filename,
+                                                             cache=cache)
         return cls(poscar, data, **kwargs)
 
 
@@ -3342,14 +3766,17 @@ class Chgcar(VolumetricData):
         self._distance_matrix = {}
 
     @staticmethod
-    def from_file(filename):
+    def from_file(filename, cache=False):
         """
         Reads a CHGCAR file.
 
         :param filename: Filename
+        :param cache: Whether to cache the parsed data as memory-mappable
+            .npy files. See VolumetricData.parse_file.
         :return: Chgcar
         """
-        (poscar, data, data_aug) = VolumetricData.parse_file(filename)
+        (poscar, data, data_aug) = VolumetricData.parse_file(filename,
+                                                             cache=cache)
         return Chgcar(poscar, data, data_aug=data_aug)
 
     @property
@@ -3387,14 +3814,17 @@ class Elfcar(VolumetricData):
         self.data = data
 
     @classmethod
-    def from_file(cls, filename):
+    def from_file(cls, filename, cache=False):
         """
         Reads a ELFCAR file.
 
         :param filename: Filename
+        :param cache: Whether to cache the parsed data as memory-mappable
+            .npy files. See VolumetricData.parse_file.
         :return: Elfcar
         """
-        (poscar, data, data_aug) = VolumetricData.parse_file(filename)
+        (poscar, data, data_aug) = VolumetricData.parse_file(filename,
+                                                             cache=cache)
         return cls(poscar, data)
 
     def get_alpha(self):
@@ -3449,93 +3879,183 @@ class Procar:
     ..attribute:: nions
 
         Number of ions
+
+    ..attribute:: ions
+
+        0-based indices of the ions in data and phase_factors
+
+    ..attribute:: orbitals
+
+        Names of the orbitals in data and phase_factors
     """
 
-    def __init__(self, filename):
+    def __init__(self, filename, ions=None, orbitals=None, cache=False):
         """
         Args:
             filename: Name of file containing PROCAR.
-        """
+            ions ([int]): 0-based indices of the ions to read. The ion index
+                of data and phase_factors then refers to this list. Defaults
+                to None, i.e., all ions.
+            orbitals ([str]): Names of the orbitals to read, e.g.,
+                ["s", "px"]. Defaults to None, i.e., all orbitals.
+            cache (bool): If True, the parsed data is saved in a compressed
+                numpy file named filename + ".npz". Subsequent parses of an
+                unmodified file with the same ions and orbitals load the data
+                from that file instead of re-parsing the PROCAR.
+        """
+        cache_file = str(filename) + ".npz"
+        if cache and self._load_npz_cache(filename, cache_file, ions,
+                                          orbitals):
+            return
+
         headers = None
+        data = {}
+        phase_factors = {}
+        preambleexpr = re.compile(
+            r"# of k-points:\s*(\d+)\s+# of bands:\s*(\d+)\s+# of "
+            r"ions:\s*(\d+)")
+        kpointexpr = re.compile(r"^k-point\s+(\d+).*weight = ([0-9\.]+)")
+        current_kpoint = 0
+        current_band = 0
+        done = False
+        spin = Spin.down
+        weights = None
+        nkpoints = nbands = nions = None
+        ion_inds = list(ions) if ions is not None else []
+        orb_names = list(orbitals) if orbitals is not None else []
 
         with zopen(filename, "rt") as f:
-            preambleexpr = re.compile(
-                r"# of k-points:\s*(\d+)\s+# of bands:\s*(\d+)\s+# of "
-                r"ions:\s*(\d+)")
-            kpointexpr = re.compile(r"^k-point\s+(\d+).*weight = ([0-9\.]+)")
-            bandexpr = re.compile(r"^band\s+(\d+)")
-            ionexpr = re.compile(r"^ion.*")
-            expr = re.compile(r"^([0-9]+)\s+")
-            current_kpoint = 0
-            current_band = 0
-            done = False
-            spin = Spin.down
-            weights = None
-
             for l in f:
                 l = l.strip()
-                if bandexpr.match(l):
-                    m = bandexpr.match(l)
-                    current_band = int(m.group(1)) - 1
+                if l.startswith("band"):
+                    current_band = int(l.split()[1]) - 1
                     done = False
-                elif kpointexpr.match(l):
+                elif l.startswith("k-point"):
+                    if nkpoints is None:
+                        raise ValueError(
+                            "%s has a k-point before the '# of "
+                            "k-points/bands/ions' header." % filename)
                     m = kpointexpr.match(l)
                     current_kpoint = int(m.group(1)) - 1
                     weights[current_kpoint] = float(m.group(2))
                     if current_kpoint == 0:
                         spin = Spin.up if spin == Spin.down else Spin.down
                     done = False
-                elif headers is None and ionexpr.match(l):
-                    headers = l.split()
-                    headers.pop(0)
-                    headers.pop(-1)
-
-                    def f():
-                        return np.zeros((nkpoints, nbands, nions, len(headers)))
-
-                    data = defaultdict(f)
-
-                    def f2():
-                        return np.full((nkpoints, nbands, nions, len(headers)),
-                                       np.NaN, dtype=np.complex128)
-
-                    phase_factors = defaultdict(f2)
-                elif expr.match(l):
-                    toks = l.split()
-                    index = int(toks.pop(0)) - 1
-                    num_data = np.array([float(t) for t in toks[:len(headers)]])
+                elif l.startswith("ion"):
+                    if headers is None:
+                        if nions is None:
+                            raise ValueError(
+                                "%s has an ion table before the '# of "
+                                "k-points/bands/ions' header." % filename)
+                        headers = l.split()[1:-1]
+                        if ions is None:
+                            ion_inds = list(range(nions))
+                        if orbitals is None:
+                            orb_names = list(headers)
+                        orb_inds = np.array([headers.index(o)
+                                             for o in orb_names])
+                        shape = (nkpoints, nbands, len(ion_inds),
+                                 len(orb_names))
+                    if spin not in data:
+                        data[spin] = np.zeros(shape)
+                    # each table is read with a single numpy call
                     if not done:
-                        data[spin][current_kpoint, current_band, index, :] = num_data
+                        block = np.array(
+                            " ".join(itertools.islice(f, nions)).split(),
+                            dtype=np.float64).reshape(nions, -1)
+                        data[spin][current_kpoint, current_band] = \
+                            block[ion_inds][:, orb_inds + 1]
+                        done = True
+                        continue
+                    first = next(f).split()
+                    if len(first) > len(headers) + 1:
+                        # new format of PROCAR (vasp 5.4.4): real and
+                        # imaginary parts side by side
+                        nlines = nions
                     else:
-                        if len(toks) > len(headers):
-                            # new format of PROCAR (vasp 5.4.4)
-                            num_data = np.array([float(t)
-                                                 for t in toks[:2 * len(headers)]])
-                            for orb in range(len(headers)):
-                                phase_factors[spin][current_kpoint, current_band,
-                                                    index, orb] = complex(num_data[2 * orb], num_data[2 * orb + 1])
-                        else:
-                            # old format of PROCAR (vasp 5.4.1 and before)
-                            if np.isnan(phase_factors[spin][current_kpoint, current_band, index, 0]):
-                                phase_factors[spin][current_kpoint, current_band, index, :] = num_data
-                            else:
-                                phase_factors[spin][current_kpoint, current_band, index, :] += 1j * num_data
-                elif l.startswith("tot"):
-                    done = True
-                elif preambleexpr.match(l):
+                        # old format of PROCAR (vasp 5.4.1 and before):
+                        # real and imaginary parts on consecutive lines
+                        nlines = 2 * nions
+                    toks = first + " ".join(
+                        itertools.islice(f, nlines - 1)).split()
+                    block = np.array(toks, dtype=np.float64).reshape(
+                        nlines, -1)
+                    if nlines == nions:
+                        block = block[:, 1:2 * len(headers) + 1]
+                        block = block[:, ::2] + 1j * block[:, 1::2]
+                    else:
+                        block = block[::2, 1:] + 1j * block[1::2, 1:]
+                    if spin not in phase_factors:
+                        phase_factors[spin] = np.full(
+                            shape, np.NaN, dtype=np.complex128)
+                    phase_factors[spin][current_kpoint, current_band] = \
+                        block[ion_inds][:, orb_inds]
+                elif l.startswith("#"):
                     m = preambleexpr.match(l)
-                    nkpoints = int(m.group(1))
-                    nbands = int(m.group(2))
-                    nions = int(m.group(3))
-                    weights = np.zeros(nkpoints)
-
-            self.nkpoints = nkpoints
-            self.nbands = nbands
-            self.nions = nions
-            self.weights = weights
-            self.orbitals = headers
-            self.data = data
-            self.phase_factors = phase_factors
+                    if m:
+                        nkpoints = int(m.group(1))
+                        nbands = int(m.group(2))
+                        nions = int(m.group(3))
+                        weights = np.zeros(nkpoints)
+
+        self.nkpoints = nkpoints
+        self.nbands = nbands
+        self.nions = nions
+        self.ions = ion_inds
+        self.weights = weights
+        self.orbitals = orb_names
+        self.data = data
+        self.phase_factors = phase_factors
+        if cache:
+            self._write_npz_cache(cache_file, headers)
+
+    def _write_npz_cache(self, cache_file, headers):
+        """
+        Writes the parsed data and the names of all the orbitals in the
+        PROCAR (headers) to a compressed numpy file.
+        """
+        arrays = {"weights": self.weights, "ions": np.array(self.ions),
+                  "orbitals": np.array(self.orbitals),
+                  "headers": np.array(headers),
+                  "shape": np.array([self.nkpoints, self.nbands,
+                                     self.nions])}
+        for spin, v in self.data.items():
+            arrays["data_%d" % int(spin)] = v
+        for spin, v in self.phase_factors.items():
+            arrays["phase_factors_%d" % int(spin)] = v
+        with open(cache_file, "wb") as f:
+            np.savez_compressed(f, **arrays)
+
+    def _load_npz_cache(self, filename, cache_file, ions, orbitals):
+        """
+        Loads the data from a cache file written by _write_npz_cache.
+
+        Returns:
+            True if there is an up-to-date cache for the same ions and
+            orbitals, False otherwise.
+        """
+        if not os.path.exists(cache_file) or \
+                os.path.getmtime(cache_file) < os.path.getmtime(filename):
+            return False
+        with np.load(cache_file) as d:
+            self.nkpoints, self.nbands, self.nions = \
+                [int(i) for i in d["shape"]]
+            self.ions = d["ions"].tolist()
+            self.orbitals = d["orbitals"].tolist()
+            headers = d["headers"].tolist() if "headers" in d.files else None
+            if (ions is not None and list(ions) != self.ions) or \
+                    (ions is None and self.ions != list(range(self.nions))) \
+                    or (orbitals is not None and
+                        list(orbitals) != self.orbitals) or \
+                    (orbitals is None and self.orbitals != headers):
+                return False
+            self.weights = d["weights"]
+            self.data = {Spin(int(k.split("_")[-1])): d[k] for k in d.files
+                         if k.startswith("data_")}
+            self.phase_factors = {Spin(int(k.split("_")[-1])): d[k]
+                                  for k in d.files
+                                  if k.startswith("phase_factors_")}
+        return True
 
     def get_projection_on_elements(self, structure):
         """
@@ -3553,12 +4073,12 @@ class Procar:
                            for i in range(self.nkpoints)]
                           for j in range(self.nbands)]
 
-        for iat in range(self.nions):
+        for i, iat in enumerate(self.ions):
             name = structure.species[iat].symbol
             for spin, d in self.data.items():
                 for k, b in itertools.product(range(self.nkpoints),
                                               range(self.nbands)):
-                    dico[spin][b][k][name] = np.sum(d[k, b, iat, :])
+                    dico[spin][b][k][name] = np.sum(d[k, b, i, :])
 
         return dico
 
@@ -3582,6 +4102,7 @@ class Procar:
         """
 
         orbital_index = self.orbitals.index(orbital)
+        atom_index = self.ions.index(atom_index)
         return {spin: np.sum(d[:, :, atom_index, orbital_index] * self.weights[:, None])
                 for spin, d in self.data.items()}
 
@@ -4176,7 +4697,13 @@ class Wavecar:
         the wavefunction. For non-spin-polarized, the first index corresponds
         to the kpoint and the second corresponds to the band (e.g.
         self.coeffs[kp][b] corresponds to k-point kp and band b). For
-        spin-polarized calculations, the first index is for the spin.
+        spin-polarized calculations, the first index is for the spin. None if
+        the Wavecar is lazy, in which case the coefficients are read from the
+        file on demand with get_coeffs.
+
+    .. attribute:: lazy
+
+        Whether the coefficients are read from the file on demand.
 
     Acknowledgments:
         This code is based upon the Fortran program, WaveTrans, written by
@@ -4187,7 +4714,8 @@ class Wavecar:
     Author: Mark Turiansky
     """
 
-    def __init__(self, filename='WAVECAR', verbose=False, precision='normal'):
+    def __init__(self, filename='WAVECAR', verbose=False, precision='normal',
+                 lazy=False):
         """
         Information is extracted from the given WAVECAR
 
@@ -4196,8 +4724,13 @@ class Wavecar:
             verbose (bool): determines whether processing information is shown
             precision (str): determines how fine the fft mesh is (normal or
                              accurate), only the first letter matters
+            lazy (bool): if True, only the headers are read and the
+                             coefficients of a band are read from a memory
+                             map of the file when they are needed. This keeps
+                             the memory use low for large WAVECARs.
         """
         self.filename = filename
+        self.lazy = lazy
 
         # c = 0.26246582250210965422
         # 2m/hbar^2 in agreement with VASP
@@ -4210,6 +4743,9 @@ class Wavecar:
                 print('recl={}, spin={}, rtag={}'.format(recl, spin, rtag))
             recl8 = int(recl / 8)
             self.spin = spin
+            self._recl = recl
+            self._coeff_dtype = np.complex64 if rtag == 45200 else \
+                np.complex128
 
             # check that ISPIN wasn't set to 2
             # if spin == 2:
@@ -4263,7 +4799,14 @@ class Wavecar:
             # np.set_printoptions(precision=7, suppress=True)
             self.Gpoints = [None for _ in range(self.nk)]
             self.kpoints = []
-            if spin == 2:
+            # file offsets of the first band record of each spin and k-point
+            self._offsets = np.zeros((spin, self.nk), dtype=np.int64)
+            self._mmap = None
+            if lazy:
+                self.coeffs = None
+                self.band_energy = [[] for _ in range(spin)] if spin == 2 \
+                    else []
+            elif spin == 2:
                 self.coeffs = [[[None for i in range(self.nb)]
                                 for j in range(self.nk)] for _ in range(spin)]
                 self.band_energy = [[] for _ in range(spin)]
@@ -4309,6 +4852,10 @@ class Wavecar:
                                          'number of G points')
 
                     # extract coefficients
+                    self._offsets[ispin, ink] = f.tell()
+                    if lazy:
+                        f.seek(self.nb * recl, 1)
+                        continue
                     for inb in range(self.nb):
                         if rtag == 45200:
                             data = np.fromfile(f, dtype=np.complex64, count=nplane)
@@ -4378,20 +4925,43 @@ class Wavecar:
         Returns:
             a list containing valid G-points
         """
-        gpoints = []
-        for i in range(2 * self._nbmax[2] + 1):
-            i3 = i - 2 * self._nbmax[2] - 1 if i > self._nbmax[2] else i
-            for j in range(2 * self._nbmax[1] + 1):
-                j2 = j - 2 * self._nbmax[1] - 1 if j > self._nbmax[1] else j
-                for k in range(2 * self._nbmax[0] + 1):
-                    k1 = k - 2 * self._nbmax[0] - 1 if k > self._nbmax[0] else k
-                    G = np.array([k1, j2, i3])
-                    v = kpoint + G
-                    g = np.linalg.norm(np.dot(v, self.b))
-                    E = g ** 2 / self._C
-                    if E < self.encut:
-                        gpoints.append(G)
-        return np.array(gpoints, dtype=np.float64)
+        # integers in the order 0, 1, ..., nbmax, -nbmax, ..., -1
+        k1, j2, i3 = [np.roll(np.arange(-n, n + 1), -n)
+                      for n in self._nbmax]
+        # the first component varies fastest
+        gpoints = np.stack(np.meshgrid(i3, j2, k1, indexing='ij'),
+                           axis=-1)[..., ::-1].reshape(-1, 3)
+        g = np.linalg.norm(np.dot(kpoint + gpoints, self.b), axis=1)
+        E = g ** 2 / self._C
+        return np.array(gpoints[E < self.encut], dtype=np.float64)
+
+    def get_coeffs(self, kpoint, band, spin=0):
+        """
+        Returns the plane wave coefficients of a wavefunction. For a lazy
+        Wavecar, they are read from the WAVECAR file.
+
+        Args:
+            kpoint (int): the index of the kpoint of the wavefunction
+            band (int): the index of the band of the wavefunction
+            spin (int):  spin index of the wavefunction (only for ISPIN = 2,
+                            default = 0)
+        Returns:
+            a numpy array of the coefficients, in the order of
+            self.Gpoints[kpoint]
+        """
+        if not self.lazy:
+            return self.coeffs[spin][kpoint][band] if self.spin == 2 else \
+                self.coeffs[kpoint][band]
+        spin = range(self.spin)[spin] if self.spin == 2 else 0
+        kpoint = range(self.nk)[kpoint]
+        band = range(self.nb)[band]
+        if self._mmap is None:
+            self._mmap = np.memmap(self.filename, dtype=np.uint8, mode='r')
+        start = self._offsets[spin, kpoint] + band * self._recl
+        nbytes = len(self.Gpoints[kpoint]) * \
+            np.dtype(self._coeff_dtype).itemsize
+        return np.frombuffer(self._mmap[start:start + nbytes],
+                             dtype=self._coeff_dtype).copy()
 
     def evaluate_wavefunc(self, kpoint, band, r, spin=0):
         r"""
@@ -4423,8 +4993,7 @@ class Wavecar:
         """
         v = self.Gpoints[kpoint] + self.kpoints[kpoint]
         u = np.dot(np.dot(v, self.b), r)
-        c = self.coeffs[spin][kpoint][band] if self.spin == 2 else \
-            self.coeffs[kpoint][band]
+        c = self.get_coeffs(kpoint, band, spin=spin)
         return np.sum(np.dot(c, np.exp(1j * u, dtype=np.complex64))) / np.sqrt(self.vol)
 
     def fft_mesh(self, kpoint, band, spin=0, shift=True):
@@ -4451,16 +5020,33 @@ class Wavecar:
         Returns:
             a numpy ndarray representing the 3D mesh of coefficients
         """
-        mesh = np.zeros(tuple(self.ng), dtype=np.complex)
-        tcoeffs = self.coeffs[spin][kpoint][band] if self.spin == 2 else \
-            self.coeffs[kpoint][band]
-        for gp, coeff in zip(self.Gpoints[kpoint], tcoeffs):
-            t = tuple(gp.astype(np.int) + (self.ng / 2).astype(np.int))
-            mesh[t] = coeff
+        inds = self._get_mesh_indices(kpoint, self.ng, shift)
+        return self._fill_mesh(inds, self.ng,
+                               self.get_coeffs(kpoint, band, spin=spin))
+
+    def _get_mesh_indices(self, kpoint, ng, shift=True):
+        """
+        Helper function that returns the flat indices of the G-points of a
+        kpoint on a fft mesh of shape ng. If shift is True, the indices are
+        those of the mesh after np.fft.ifftshift.
+        """
+        ng = np.array(ng, dtype=int)
+        inds = self.Gpoints[kpoint].astype(int)
         if shift:
-            return np.fft.ifftshift(mesh)
+            inds %= ng
         else:
-            return mesh
+            inds += (ng / 2).astype(int)
+        return np.ravel_multi_index(inds.T, ng)
+
+    @staticmethod
+    def _fill_mesh(inds, ng, coeffs):
+        """
+        Helper function that places coefficients on a fft mesh of shape ng at
+        the flat indices from _get_mesh_indices.
+        """
+        mesh = np.zeros(np.prod(ng), dtype=complex)
+        mesh[inds[:len(coeffs)]] = coeffs[:len(inds)]
+        return mesh.reshape(tuple(ng))
 
     def get_parchg(self, poscar, kpoint, band, spin=None, phase=False,
                    scale=2):
@@ -4499,39 +5085,62 @@ class Wavecar:
             a pymatgen.io.vasp.outputs.Chgcar object
         """
 
+        return self.get_parchgs(poscar, kpoint, [band], spin=spin, phase=phase,
+                                scale=scale)[0]
+
+    def get_parchgs(self, poscar, kpoint, bands, spin=None, phase=False,
+                    scale=2):
+        """
+        Generates the Chgcar objects of several bands at the same kpoint. This
+        is equivalent to calling get_parchg for each band, but the G-points
+        are mapped onto the fft grid only once.
+
+        Args:
+            poscar (pymatgen.io.vasp.inputs.Poscar): Poscar object that has the
+                                structure associated with the WAVECAR file
+            kpoint (int):   the index of the kpoint for the wavefunctions
+            bands ([int]):  the indices of the bands
+            spin (int):     optional argument to specify the spin (see
+                                get_parchg)
+            phase (bool):   flag to determine if the charge density is
+                                multiplied by the sign of the wavefunction.
+                                Only valid for real wavefunctions.
+            scale (int):    scaling for the FFT grid. The default value of 2 is
+                                at least as fine as the VASP default.
+        Returns:
+            a list of pymatgen.io.vasp.outputs.Chgcar objects, one per band
+        """
+
         if phase and not np.all(self.kpoints[kpoint] == 0.):
             warnings.warn('phase == True should only be used for the Gamma '
                           'kpoint! I hope you know what you\'re doing!')
 
-        # scaling of ng for the fft grid, need to restore value at the end
-        temp_ng = self.ng
-        self.ng = self.ng * scale
-        N = np.prod(self.ng)
+        ng = self.ng * scale
+        N = np.prod(ng)
 
-        data = {}
-        if self.spin == 2:
-            if spin is not None:
-                wfr = np.fft.ifftn(self.fft_mesh(kpoint, band, spin=spin)) * N
-                den = np.abs(np.conj(wfr) * wfr)
-                if phase:
-                    den = np.sign(np.real(wfr)) * den
-                data['total'] = den
-            else:
-                wfr = np.fft.ifftn(self.fft_mesh(kpoint, band, spin=0)) * N
-                denup = np.abs(np.conj(wfr) * wfr)
-                wfr = np.fft.ifftn(self.fft_mesh(kpoint, band, spin=1)) * N
-                dendn = np.abs(np.conj(wfr) * wfr)
-                data['total'] = denup + dendn
-                data['diff'] = denup - dendn
-        else:
-            wfr = np.fft.ifftn(self.fft_mesh(kpoint, band)) * N
+        inds = self._get_mesh_indices(kpoint, ng)
+
+        def get_density(band, spin, phase):
+            mesh = self._fill_mesh(inds, ng,
+                                   self.get_coeffs(kpoint, band, spin=spin))
+            wfr = np.fft.ifftn(mesh) * N
             den = np.abs(np.conj(wfr) * wfr)
             if phase:
                 den = np.sign(np.real(wfr)) * den
-            data['total'] = den
-
-        self.ng = temp_ng
-        return Chgcar(poscar, data)
+            return den
+
+        chgcars = []
+        for band in bands:
+            data = {}
+            if self.spin == 2 and spin is None:
+                denup = get_density(band, 0, False)
+                dendn = get_density(band, 1, False)
+                data['total'] = denup + dendn
+                data['diff'] = denup - dendn
+            else:
+                data['total'] = get_density(band, spin or 0, phase)
+            chgcars.append(Chgcar(poscar, data))
+        return chgcars
 
 
 class Eigenval:
@@ -817,6 +817,8 @@ class PotcarTest(PymatgenTest):
                          "Wrong symbols read in for POTCAR")
         potcar = Potcar(["Fe_pv", "O"])
         self.assertEqual(potcar[0].enmax, 293.238)
+        # PotcarSingles are only read once.
+        self.assertIs(Potcar(["Fe_pv"])[0], potcar[0])
 
     def test_potcar_map(self):
         fe_potcar = zopen(self.TEST_FILES_DIR / "POT_GGA_PAW_PBE" / "POTCAR.Fe_pv.gz").read().decode(
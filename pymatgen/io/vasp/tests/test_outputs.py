@@ -5,6 +5,7 @@
 
 import unittest
 import os
+import io
 from pathlib import Path
 import json
 import gzip
@@ -20,7 +21,7 @@ from pymatgen.electronic_structure.core import OrbitalType
 from pymatgen.io.vasp.inputs import Kpoints, Poscar
 from pymatgen.io.vasp.outputs import Chgcar, Locpot, Oszicar, Outcar, \
     Vasprun, Procar, Xdatcar, Dynmat, BSVasprun, UnconvergedVASPWarning, \
-    VaspParserError, Wavecar, Waveder, Elfcar, Eigenval
+    VaspParserError, Wavecar, Waveder, Elfcar, Eigenval, VolumetricData
 from pymatgen import Spin, Orbital, Lattice, Structure
 from pymatgen.entries.compatibility import MaterialsProjectCompatibility
 from pymatgen.electronic_structure.core import Magmom
@@ -198,6 +199,28 @@ class VasprunTest(PymatgenTest):
         self.assertEqual(d["elements"], ["Fe", "Li", "O", "P"])
         self.assertEqual(d["nelements"], 4)
 
+    def test_iter_ionic_steps(self):
+        filepath = self.TEST_FILES_DIR / 'vasprun.xml.unconverged'
+        vasprun = Vasprun(filepath, parse_potcar_file=False)
+        steps = list(Vasprun.iter_ionic_steps(filepath))
+        self.assertEqual(len(steps), len(vasprun.ionic_steps))
+        for s1, s2 in zip(steps, vasprun.ionic_steps):
+            self.assertEqual(s1["structure"], s2["structure"])
+            self.assertEqual(s1["forces"], s2["forces"])
+            self.assertEqual(s1["electronic_steps"], s2["electronic_steps"])
+
+        steps = list(Vasprun.iter_ionic_steps(
+            filepath, fields=["forces", "e_fr_energy"]))
+        self.assertEqual(set(steps[0].keys()), {"forces", "e_fr_energy"})
+        self.assertAlmostEqual(steps[-1]["e_fr_energy"],
+                               vasprun.final_energy)
+
+        steps = list(Vasprun.iter_ionic_steps(
+            filepath, ionic_step_skip=2, ionic_step_offset=1))
+        self.assertEqual(len(steps), 2)
+        self.assertEqual(steps[1]["structure"],
+                         vasprun.ionic_steps[3]["structure"])
+
     def test_unconverged(self):
         filepath = self.TEST_FILES_DIR / 'vasprun.xml.unconverged'
         with warnings.catch_warnings(record=True) as w:
@@ -1013,6 +1036,65 @@ class OutcarTest(PymatgenTest):
         self.assertEqual(outcar.data["nplwv"], [[None]])
         self.assertEqual(outcar.data["nplwvs_at_kpoints"], [85687])
 
+    def test_sections(self):
+        filepath = self.TEST_FILES_DIR / "OUTCAR.BaTiO3.polar"
+        full = Outcar(filepath)
+        outcar = Outcar(filepath, sections=["lcalcpol"])
+        self.assertTrue(outcar.lcalcpol)
+        self.assertTrue(outcar.spin)
+        self.assertArrayAlmostEqual(outcar.p_elec, full.p_elec)
+        self.assertArrayAlmostEqual(outcar.p_ion, full.p_ion)
+        self.assertDictEqual(outcar.zval_dict, full.zval_dict)
+        self.assertEqual(outcar.efermi, full.efermi)
+        self.assertEqual(outcar.magnetization, full.magnetization)
+        self.assertEqual(outcar.drift, [])
+        self.assertEqual(outcar.final_energy_contribs, {})
+        self.assertNotIn("nplwv", outcar.data)
+        self.assertArrayAlmostEqual(outcar.as_dict()["p_elec"], full.p_elec)
+
+        filepath = self.TEST_FILES_DIR / "OUTCAR.lepsilon"
+        full = Outcar(filepath)
+        outcar = Outcar(filepath, sections=["lepsilon", "dfpt", "drift"])
+        self.assertTrue(outcar.lepsilon)
+        self.assertTrue(outcar.dfpt)
+        self.assertEqual(outcar.dielectric_tensor, full.dielectric_tensor)
+        self.assertEqual(outcar.piezo_ionic_tensor, full.piezo_ionic_tensor)
+        self.assertArrayAlmostEqual(outcar.born, full.born)
+        self.assertArrayAlmostEqual(outcar.internal_strain_tensor,
+                                    full.internal_strain_tensor)
+        self.assertEqual(outcar.drift, full.drift)
+        self.assertFalse(outcar.has_onsite_density_matrices)
+        d = Outcar(filepath, sections=["lepsilon"]).as_dict()
+        self.assertEqual(d["dielectric_tensor"], full.dielectric_tensor)
+        self.assertEqual(d["drift"], [])
+        d = Outcar(filepath,
+                   sections=["drift", "final_energy_contribs"]).as_dict()
+        self.assertEqual(d["drift"], full.drift)
+        self.assertIsNone(d["ngf"])
+        self.assertIsNone(d["electrostatic_potential"])
+
+        outcar = Outcar(filepath, sections=[])
+        self.assertFalse(outcar.lepsilon)
+        self.assertEqual(outcar.final_energy, full.final_energy)
+        self.assertRaises(ValueError, Outcar, filepath, sections=["foo"])
+
+    def test_read_multiple(self):
+        filepath = self.TEST_FILES_DIR / "OUTCAR.lepsilon"
+        full = Outcar(filepath)
+        outcar = Outcar(filepath, sections=[])
+        results = outcar.read_multiple(["lepsilon", "internal_strain_tensor",
+                                        "piezo_tensor", "avg_core_poten"])
+        self.assertEqual(outcar.dielectric_tensor, full.dielectric_tensor)
+        self.assertArrayAlmostEqual(outcar.born, full.born)
+        self.assertArrayAlmostEqual(outcar.internal_strain_tensor,
+                                    full.internal_strain_tensor)
+        self.assertAlmostEqual(outcar.data["piezo_tensor"][0][0], 0.52799)
+        self.assertEqual(list(results.keys()), ["avg_core_poten"])
+        self.assertAlmostEqual(results["avg_core_poten"][-1][1], -90.0487)
+        self.assertIsNone(outcar._text)
+        self.assertRaises(ValueError, outcar.read_multiple, ["pattern"])
+        self.assertRaises(ValueError, outcar.read_multiple, ["foo"])
+
 
 class BSVasprunTest(PymatgenTest):
     _multiprocess_shared_ = True
@@ -1061,6 +1143,43 @@ class LocpotTest(PymatgenTest):
         self.assertAlmostEqual(locpot.get_axis_grid(1)[-1], 2.87629, 2)
         self.assertAlmostEqual(locpot.get_axis_grid(2)[-1], 2.87629, 2)
 
+    def test_read_data_block(self):
+        values = np.arange(24) * 0.5
+        lines = [" ".join("%.5E" % v for v in values[i:i + 5])
+                 for i in range(0, 24, 5)]
+        f = io.StringIO("\n".join(lines[1:]) + "\n 1 2 3\n")
+        data = VolumetricData._read_data_block(f, lines[0], [2, 3, 4])
+        self.assertArrayAlmostEqual(data, values.reshape((2, 3, 4), order="F"))
+        self.assertEqual(f.readline(), " 1 2 3\n")
+        # irregular layout, the first line is shorter than the others
+        lines = [" ".join("%.5E" % v for v in values[:2])] + \
+            [" ".join("%.5E" % v for v in values[i:i + 5])
+             for i in range(2, 24, 5)]
+        f = io.StringIO("\n".join(lines[1:]) + "\n")
+        data = VolumetricData._read_data_block(f, lines[0], [2, 3, 4])
+        self.assertArrayAlmostEqual(data, values.reshape((2, 3, 4), order="F"))
+        f = io.StringIO("\n".join(lines[1:3]) + "\n")
+        self.assertRaises(VaspParserError, VolumetricData._read_data_block,
+                          f, lines[0], [2, 3, 4])
+        f = io.StringIO("\n".join(["1 2 3 4 5", "6 *** 8 9 10"]) + "\n")
+        self.assertRaises(ValueError, VolumetricData._read_data_block,
+                          f, "0 0 0 0 0", [3, 2, 2])
+        # a short first line does not make the block swallow the next one
+        chgcar = Chgcar.from_file(self.TEST_FILES_DIR / "CHGCAR.spin")
+        with open(self.TEST_FILES_DIR / "CHGCAR.spin") as f:
+            lines = f.readlines()
+        i = [l.strip() for l in lines].index("") + 2
+        toks = lines[i].split()
+        lines[i:i + 1] = [" ".join(toks[:3]) + "\n", " ".join(toks[3:]) + "\n"]
+        with ScratchDir("."):
+            with open("CHGCAR", "w") as f:
+                f.writelines(lines)
+            irregular = Chgcar.from_file("CHGCAR")
+        self.assertEqual(sorted(irregular.data.keys()), ["diff", "total"])
+        for k in ["diff", "total"]:
+            self.assertArrayAlmostEqual(irregular.data[k], chgcar.data[k])
+        self.assertEqual(irregular.data_aug, chgcar.data_aug)
+
 
 class ChgcarTest(PymatgenTest):
 
@@ -1153,6 +1272,21 @@ class ChgcarTest(PymatgenTest):
                                     chgcar.data["total"])
         os.remove("chgcar_test.hdf5")
 
+    def test_npy_cache(self):
+        with ScratchDir("."):
+            copyfile(self.TEST_FILES_DIR / "CHGCAR.spin", "CHGCAR")
+            chgcar = Chgcar.from_file("CHGCAR", cache=True)
+            self.assertTrue(os.path.exists("CHGCAR.npy_cache"))
+            self.assertArrayAlmostEqual(chgcar.data["total"],
+                                        self.chgcar_spin.data["total"])
+            chgcar2 = Chgcar.from_file("CHGCAR", cache=True)
+            self.assertIsInstance(chgcar2.data["diff"], np.memmap)
+            self.assertArrayAlmostEqual(chgcar2.data["diff"],
+                                        self.chgcar_spin.data["diff"])
+            self.assertEqual(chgcar2.data_aug["total"],
+                             self.chgcar_spin.data_aug["total"])
+            self.assertEqual(chgcar2.structure, self.chgcar_spin.structure)
+
     def test_spin_data(self):
         d = self.chgcar_spin.spin_data
         for k, v in d.items():
@@ -1244,6 +1378,55 @@ class ProcarTest(PymatgenTest):
         p = Procar(filepath)
         self.assertAlmostEqual(p.phase_factors[Spin.up][0, 0, 0, 0], -0.13 + 0.199j)
 
+    def test_selective(self):
+        filepath = self.TEST_FILES_DIR / 'PROCAR.phase'
+        p = Procar(filepath)
+        p2 = Procar(filepath, ions=[2, 0], orbitals=["px", "s"])
+        self.assertEqual(p2.ions, [2, 0])
+        self.assertEqual(p2.orbitals, ["px", "s"])
+        self.assertEqual(p2.data[Spin.up].shape, (60, 12, 2, 2))
+        for spin in [Spin.up, Spin.down]:
+            self.assertTrue(np.array_equal(
+                p2.data[spin], p.data[spin][:, :, [2, 0]][..., [3, 0]]))
+            self.assertTrue(np.array_equal(
+                p2.phase_factors[spin],
+                p.phase_factors[spin][:, :, [2, 0]][..., [3, 0]]))
+        self.assertEqual(p2.get_occupation(0, "s"), p.get_occupation(0, "s"))
+        self.assertRaises(ValueError, p2.get_occupation, 1, "s")
+
+    def test_missing_header(self):
+        with ScratchDir("."):
+            with open(self.TEST_FILES_DIR / 'PROCAR') as f:
+                lines = f.readlines()
+            with open('PROCAR', 'w') as f:
+                f.writelines(l for l in lines if not l.startswith("#"))
+            self.assertRaises(ValueError, Procar, 'PROCAR')
+            with open('PROCAR', 'w') as f:
+                f.writelines(l for l in lines if not l.startswith(("#", " k-point")))
+            self.assertRaises(ValueError, Procar, 'PROCAR')
+
+    def test_cache(self):
+        with ScratchDir("."):
+            copyfile(self.TEST_FILES_DIR / 'PROCAR', 'PROCAR')
+            p = Procar('PROCAR', cache=True)
+            self.assertTrue(os.path.exists('PROCAR.npz'))
+            p2 = Procar('PROCAR', cache=True)
+            self.assertEqual(p2.orbitals, p.orbitals)
+            self.assertEqual(p2.nkpoints, p.nkpoints)
+            self.assertTrue(np.array_equal(p2.weights, p.weights))
+            for spin in p.data:
+                self.assertTrue(np.array_equal(p2.data[spin], p.data[spin]))
+            # A different selection is parsed again.
+            p3 = Procar('PROCAR', ions=[1], cache=True)
+            self.assertEqual(p3.data[Spin.up].shape[2], 1)
+            self.assertEqual(Procar('PROCAR', cache=True).ions,
+                             list(range(p.nions)))
+            p4 = Procar('PROCAR', orbitals=["s"], cache=True)
+            self.assertEqual(p4.data[Spin.up].shape[3], 1)
+            p5 = Procar('PROCAR', cache=True)
+            self.assertEqual(p5.orbitals, p.orbitals)
+            self.assertEqual(p5.data[Spin.up].shape, p.data[Spin.up].shape)
+
 
 class XdatcarTest(PymatgenTest):
 
@@ -1379,6 +1562,22 @@ class WavecarTest(PymatgenTest):
         finally:
             Wavecar._generate_G_points = temp_ggp
 
+    def test_lazy(self):
+        for f in ['WAVECAR.N2', 'WAVECAR.N2.spin']:
+            w = Wavecar(self.TEST_FILES_DIR / f)
+            lazy = Wavecar(self.TEST_FILES_DIR / f, lazy=True)
+            self.assertIsNone(lazy.coeffs)
+            self.assertTrue(np.allclose(lazy.band_energy, w.band_energy))
+            for spin in range(w.spin):
+                for b in [0, 4, -1]:
+                    self.assertTrue(np.array_equal(
+                        lazy.get_coeffs(0, b, spin=spin),
+                        w.get_coeffs(0, b, spin=spin)))
+                    self.assertTrue(np.array_equal(
+                        lazy.fft_mesh(0, b, spin=spin),
+                        w.fft_mesh(0, b, spin=spin)))
+            self.assertRaises(IndexError, lazy.get_coeffs, 0, w.nb)
+
     def test__generate_nbmax(self):
         self.w._generate_nbmax()
         self.assertEqual(self.w._nbmax.tolist(), [5, 5, 5])
@@ -1408,6 +1607,18 @@ class WavecarTest(PymatgenTest):
         self.assertEqual(np.unravel_index(ind, mesh.shape), (6, 8, 8))
         self.assertEqual(mesh[0, 0, 0], 0j)
 
+    def test_get_parchgs(self):
+        poscar = Poscar.from_file(self.TEST_FILES_DIR / 'POSCAR')
+        for f in ['WAVECAR.N2', 'WAVECAR.N2.spin']:
+            w = Wavecar(self.TEST_FILES_DIR / f, lazy=True)
+            chgcars = w.get_parchgs(poscar, 0, [0, 3, 5], phase=False)
+            self.assertEqual(len(chgcars), 3)
+            for b, c in zip([0, 3, 5], chgcars):
+                ref = w.get_parchg(poscar, 0, b, phase=False)
+                self.assertEqual(c.data.keys(), ref.data.keys())
+                for k in ref.data:
+                    self.assertTrue(np.allclose(c.data[k], ref.data[k]))
+
     def test_get_parchg(self):
         poscar = Poscar.from_file(self.TEST_FILES_DIR / 'POSCAR')
         w = self.w
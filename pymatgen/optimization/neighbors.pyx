@@ -8,11 +8,8 @@ from __future__ import print_function
 import numpy as np
 cimport numpy as np
 cimport cython
-from cython.operator cimport dereference, postincrement
 from libc.math cimport round, pi, sqrt, ceil, floor
 from libc.stdlib cimport malloc, free, realloc
-from libcpp.vector cimport vector
-from libcpp.map cimport map
 from libc.string cimport memset
 
 
@@ -86,24 +83,27 @@ def find_points_in_spheres(double[:, ::1] all_coords, double[:, ::1] center_coor
     cdef double coord_temp[3]
 
     count = 0
-    for i in range(min_bounds[0], max_bounds[0]):
-        for j in range(min_bounds[1], max_bounds[1]):
-            for k in range(min_bounds[2], max_bounds[2]):
-                for l in range(n_total):
-                    for m in range(3):
-                        coord_temp[m] = i * lattice[0, m] + <double>j * lattice[1, m] + \
-                            k * lattice[2, m] + coords_in_cell[l, m]
-                    if (coord_temp[0] > valid_min[0]) & (coord_temp[0] < valid_max[0]) & \
-                        (coord_temp[1] > valid_min[1]) & (coord_temp[1] < valid_max[1]) & \
-                        (coord_temp[2] > valid_min[2]) & (coord_temp[2] < valid_max[2]):
-                        offsets_p_temp[3*count] = i
-                        offsets_p_temp[3*count+1] = j
-                        offsets_p_temp[3*count+2] = k
-                        indices_p_temp[count] = l
-                        expanded_coords_p_temp[3*count] = coord_temp[0]
-                        expanded_coords_p_temp[3*count+1] = coord_temp[1]
-                        expanded_coords_p_temp[3*count+2] = coord_temp[2]
-                        count += 1
+    # the loops over images and neighbors only use C data, so other threads
+    # can run while they execute
+    with nogil:
+        for i in range(min_bounds[0], max_bounds[0]):
+            for j in range(min_bounds[1], max_bounds[1]):
+                for k in range(min_bounds[2], max_bounds[2]):
+                    for l in range(n_total):
+                        for m in range(3):
+                            coord_temp[m] = i * lattice[0, m] + <double>j * lattice[1, m] + \
+                                k * lattice[2, m] + coords_in_cell[l, m]
+                        if (coord_temp[0] > valid_min[0]) & (coord_temp[0] < valid_max[0]) & \
+                            (coord_temp[1] > valid_min[1]) & (coord_temp[1] < valid_max[1]) & \
+                            (coord_temp[2] > valid_min[2]) & (coord_temp[2] < valid_max[2]):
+                            offsets_p_temp[3*count] = i
+                            offsets_p_temp[3*count+1] = j
+                            offsets_p_temp[3*count+2] = k
+                            indices_p_temp[count] = l
+                            expanded_coords_p_temp[3*count] = coord_temp[0]
+                            expanded_coords_p_temp[3*count+1] = coord_temp[1]
+                            expanded_coords_p_temp[3*count+2] = coord_temp[2]
+                            count += 1
 
     # if no valid neighbors were found return empty
     if count == 0:
@@ -143,16 +143,13 @@ def find_points_in_spheres(double[:, ::1] all_coords, double[:, ::1] center_coor
     cdef long *atom_indices = <long*> malloc(natoms*sizeof(long))
     memset(<void*>head, -1, nb_cubes*sizeof(long))
     memset(<void*>atom_indices, -1, natoms*sizeof(long))
-    cdef map[long, vector[long]] neighbor_map = get_cube_neighbors(ncube)
     for i in range(natoms):
         atom_indices[i] = head[all_indices1[i]]
         head[all_indices1[i]] = i
 
     # Get center atoms' cube indices
     cdef long[:, ::1] center_indices3 = <long[:n_center, :3]> malloc(n_center*3*sizeof(long))
-    cdef long *center_indices1 = <long*> malloc(n_center*sizeof(long))
     compute_cube_index(center_coords, valid_min, ledge, center_indices3)
-    three_to_one(center_indices3, ncube[1], ncube[2], <long[:n_center]>center_indices1)
 
     # it works by allocate incrementally n more memory locations, I found it 3x faster to do so
     # compared to using vectors in cpp
@@ -161,41 +158,50 @@ def find_points_in_spheres(double[:, ::1] all_coords, double[:, ::1] center_coor
     cdef long *index_2 = <long*> malloc(n*sizeof(long))
     cdef double *offset_final = <double*> malloc(3*n*sizeof(double))
     cdef double *distances = <double*> malloc(n*sizeof(double))
-    cdef vector[long] ncube_indices_temp
-    cdef vector[long].iterator it
     cdef long cube_index_temp
+    cdef long cube_x, cube_y, cube_z
     cdef long link_index
     cdef double d_temp2
     cdef double r2 = r * r
 
     count = 0
-    for i in range(n_center):
-        ncube_indices_temp = neighbor_map[center_indices1[i]]
-        it = ncube_indices_temp.begin()
-        while (it != ncube_indices_temp.end()):
-            cube_index_temp = dereference(it)
-            link_index = head[cube_index_temp]
-            while (link_index != -1):
-                d_temp2 = distance2(expanded_coords, center_coords, link_index, i, 3)
-                if d_temp2 < r2 + tol:
-                    index_1[count] = i
-                    index_2[count] = indices[link_index]
-                    offset_final[3*count] = offsets[link_index, 0] - offset_correction[indices[link_index], 0]
-                    offset_final[3*count + 1] = offsets[link_index, 1] - offset_correction[indices[link_index], 1]
-                    offset_final[3*count + 2] = offsets[link_index, 2] - offset_correction[indices[link_index], 2]
-                    distances[count] = sqrt(d_temp2)
-
-                    count += 1
-                    # increasing the memory size
-                    if count >= n:
-                        n += 10000
-                        # may not be safe to assign so, but if realloc fails the program fails
-                        index_1 = <long*>realloc(index_1, n * sizeof(long))
-                        index_2 = <long*>realloc(index_2, n*sizeof(long))
-                        offset_final = <double*> realloc(offset_final, 3*n*sizeof(double))
-                        distances = <double*> realloc(distances, n*sizeof(double))
-                link_index = atom_indices[link_index]
-            postincrement(it)
+    with nogil:
+        for i in range(n_center):
+            # loop over the cube of the center and its 26 neighboring cubes
+            for j in range(-1, 2):
+                cube_x = center_indices3[i, 0] + j
+                if (cube_x < 0) | (cube_x >= ncube[0]):
+                    continue
+                for k in range(-1, 2):
+                    cube_y = center_indices3[i, 1] + k
+                    if (cube_y < 0) | (cube_y >= ncube[1]):
+                        continue
+                    for l in range(-1, 2):
+                        cube_z = center_indices3[i, 2] + l
+                        if (cube_z < 0) | (cube_z >= ncube[2]):
+                            continue
+                        cube_index_temp = (cube_x * ncube[1] + cube_y) * ncube[2] + cube_z
+                        link_index = head[cube_index_temp]
+                        while (link_index != -1):
+                            d_temp2 = distance2(expanded_coords, center_coords, link_index, i, 3)
+                            if d_temp2 < r2 + tol:
+                                index_1[count] = i
+                                index_2[count] = indices[link_index]
+                                offset_final[3*count] = offsets[link_index, 0] - offset_correction[indices[link_index], 0]
+                                offset_final[3*count + 1] = offsets[link_index, 1] - offset_correction[indices[link_index], 1]
+                                offset_final[3*count + 2] = offsets[link_index, 2] - offset_correction[indices[link_index], 2]
+                                distances[count] = sqrt(d_temp2)
+
+                                count += 1
+                                # increasing the memory size
+                                if count >= n:
+                                    n += 10000
+                                    # may not be safe to assign so, but if realloc fails the program fails
+                                    index_1 = <long*>realloc(index_1, n * sizeof(long))
+                                    index_2 = <long*>realloc(index_2, n*sizeof(long))
+                                    offset_final = <double*> realloc(offset_final, 3*n*sizeof(double))
+                                    distances = <double*> realloc(distances, n*sizeof(double))
+                            link_index = atom_indices[link_index]
 
     if count == 0:
         free(index_1)
@@ -212,7 +218,6 @@ def find_points_in_spheres(double[:, ::1] all_coords, double[:, ::1] center_coor
         free(indices_p)
         free(&all_indices3[0, 0])
         free(&all_indices1[0])
-        free(center_indices1)
         free(head)
         free(atom_indices)
         return np.array([], dtype=int), np.array([], dtype=int), np.array([[], [], []], dtype=float).T, np.array([], dtype=float)
@@ -243,12 +248,11 @@ def find_points_in_spheres(double[:, ::1] all_coords, double[:, ::1] center_coor
     free(indices_p)
     free(&all_indices3[0, 0])
     free(&all_indices1[0])
-    free(center_indices1)
     free(head)
     free(atom_indices)
     return py_index_1, py_index_2, py_offsets, py_distances
 
-cdef double distance2(double[:, ::1] m1, double[:, ::1] m2, long index1, long index2, long size):
+cdef double distance2(double[:, ::1] m1, double[:, ::1] m2, long index1, long index2, long size) noexcept nogil:
     """
     Faster way to compute the distance squared by not using slice but providing indices in each matrix
 
@@ -259,42 +263,6 @@ cdef double distance2(double[:, ::1] m1, double[:, ::1] m2, long index1, long in
         s += (m1[index1, i] - m2[index2, i]) * (m1[index1, i] - m2[index2, i])
     return s
 
-cdef map[long, vector[long]] get_cube_neighbors(long [:] ncube):
-    """
-    Get {cube_index: cube_neighbor_indices} map
-    """
-    cdef long ncubes = ncube[0] * ncube[1] * ncube[2]
-    cdef long[:, ::1] cube_indices_3d = <long[:ncubes, :3]> malloc(ncubes*3*sizeof(long))
-    cdef long[::1] cube_indices_1d = <long[:ncubes]> malloc(ncubes*sizeof(long))
-    cdef long count = 0
-    cdef int i, j, k
-
-    for i in range(ncube[0]):
-        for j in range(ncube[1]):
-            for k in range(ncube[2]):
-                cube_indices_3d[count, 0] = i
-                cube_indices_3d[count, 1] = j
-                cube_indices_3d[count, 2] = k
-                count += 1
-    three_to_one(cube_indices_3d, ncube[1], ncube[2], cube_indices_1d)
-    cdef long[:, ::1] index3 = <long[:1, :3]> malloc(3*sizeof(long))
-    cdef long index1[1]
-    cdef map[long, vector[long]] neighbor_map
-    cdef long[:, ::1] ovectors = compute_offset_vectors(1)
-    for i in range(ncubes):
-        for j in range(27):
-            index3[0, 0] = ovectors[j, 0] + cube_indices_3d[i, 0]
-            index3[0, 1] = ovectors[j, 1] + cube_indices_3d[i, 1]
-            index3[0, 2] = ovectors[j, 2] + cube_indices_3d[i, 2]
-            if (index3[0, 0] < ncube[0]) & (index3[0, 0] >= 0) & (index3[0, 1] < ncube[1]) & \
-                (index3[0, 1] >= 0) & (index3[0, 2] < ncube[2]) & (index3[0, 2] >= 0):
-                three_to_one(index3, ncube[1], ncube[2], index1)
-                neighbor_map[i].push_back(index1[0])
-    free(&cube_indices_3d[0, 0])
-    free(&cube_indices_1d[0])
-    free(&index3[0, 0])
-    return neighbor_map
-
 cdef void get_bounds(double[:, ::1] frac_coords, double[::1] maxr, long[:] pbc, long[:] max_bounds, long[:] min_bounds):
     """Given the fractional coordinates and the number of repeation needed in each direction, maxr,
     compute the translational bounds in each dimension
@@ -394,7 +362,7 @@ cdef double inner(double[:] x, double[:] y):
         sum += x[i] * y[i]
     return sum
 
-cdef void cross(double[:] x, double[:] y, double[:] out) nogil:
+cdef void cross(double[:] x, double[:] y, double[:] out) noexcept nogil:
     """
     Cross product of vector x and y, output in out
     """
@@ -402,7 +370,7 @@ cdef void cross(double[:] x, double[:] y, double[:] out) nogil:
     out[1] = x[2] * y[0] - x[0] * y[2]
     out[2] = x[0] * y[1] - x[1] * y[0]
 
-cdef double norm(double[::1] vec) nogil:
+cdef double norm(double[::1] vec) noexcept nogil:
     """
     Vector norm
     """
@@ -429,14 +397,14 @@ cdef max_and_min(double[:, ::1] coords, double[::1] max_coords, double[::1] min_
             if coords[i, j] <= min_coords[j]:
                 min_coords[j] = coords[i, j]
 
-cdef void compute_cube_index(double[:, ::1] coords, double [:] global_min, double radius, long[:, ::1] return_indice) nogil:
+cdef void compute_cube_index(double[:, ::1] coords, double [:] global_min, double radius, long[:, ::1] return_indice) noexcept nogil:
     cdef int i, j
     for i in range(coords.shape[0]):
         for j in range(coords.shape[1]):
             return_indice[i, j] = <long>(floor((coords[i, j] - global_min[j] + 1e-8) / radius))
 
 
-cdef void one_to_three(long[::1] label1d, long ny, long nz, long[:, ::1] label3d) nogil:
+cdef void one_to_three(long[::1] label1d, long ny, long nz, long[:, ::1] label3d) noexcept nogil:
     """
     1D label vector to 3D label representation
     """
@@ -448,7 +416,7 @@ cdef void one_to_three(long[::1] label1d, long ny, long nz, long[:, ::1] label3d
         label3d[i, 0] = (label1d[i] - label3d[i, 2] - label3d[i, 1] * nz) / (ny * nz)
 
 
-cdef void three_to_one(long[:, ::1] label3d, long ny, long nz, long[::1] label1d) nogil:
+cdef void three_to_one(long[:, ::1] label3d, long ny, long nz, long[::1] label1d) noexcept nogil:
     """
     3D vector representation to 1D
     """
@@ -16,7 +16,8 @@ from numpy import around
 
 from pymatgen.analysis.bond_valence import BVAnalyzer
 from pymatgen.analysis.structure_matcher import StructureMatcher
-from pymatgen.analysis.ewald import EwaldSummation, EwaldMinimizer
+from pymatgen.analysis.ewald import EwaldSummation, EwaldMinimizer, \
+    EwaldMonteCarloMinimizer
 from pymatgen.analysis.elasticity.strain import Deformation
 from pymatgen.symmetry.analyzer import SpacegroupAnalyzer
 from pymatgen.core.composition import Composition
@@ -530,14 +531,21 @@ class OrderDisorderedStructureTransformation(AbstractTransformation):
     putting all lithium in sites [4,5,6,7].
 
     USE WITH CARE.
+
+    For large supercells, ALGO_MONTE_CARLO finds low energy orderings by
+    simulated annealing (see EwaldMonteCarloMinimizer) instead of a search of
+    all orderings. The orderings returned are then low in energy but not
+    guaranteed to be the lowest, and those equivalent by symmetry are removed
+    with StructureMatcher.
     """
 
     ALGO_FAST = 0
     ALGO_COMPLETE = 1
     ALGO_BEST_FIRST = 2
+    ALGO_MONTE_CARLO = 4
 
     def __init__(self, algo=ALGO_FAST, symmetrized_structures=False,
-                 no_oxi_states=False):
+                 no_oxi_states=False, ncores=None, mc_params=None):
         """
         Args:
             algo (int): Algorithm to use.
@@ -546,8 +554,17 @@ class OrderDisorderedStructureTransformation(AbstractTransformation):
                 should be used for the grouping of sites.
             no_oxi_states (bool): Whether to remove oxidation states prior to
                 ordering.
+            ncores (int): Number of processes used by the EwaldMinimizer to
+                search the orderings, or to run the replicas of the Monte
+                Carlo. Default is None, which implies serial processing.
+                ALGO_BEST_FIRST always runs serially.
+            mc_params (dict): Keyword arguments of EwaldMonteCarloMinimizer
+                for ALGO_MONTE_CARLO, e.g., {"n_steps": 100000,
+                "n_replicas": 4, "seed": 0}.
         """
         self.algo = algo
+        self.ncores = ncores
+        self.mc_params = mc_params
         self._all_structures = []
         self.no_oxi_states = no_oxi_states
         self.symmetrized_structures = symmetrized_structures
@@ -646,8 +663,19 @@ class OrderDisorderedStructureTransformation(AbstractTransformation):
             if empty > 0.5:
                 m_list.append([0, empty, list(g), None])
 
+        # The energy is bilinear in the charges, so the minimizers get the
+        # energy change of every manipulation by rescaling rows of this
+        # matrix, which is cheaper than EwaldSummation.compute_energy_change.
         matrix = EwaldSummation(s).total_energy_matrix
-        ewald_m = EwaldMinimizer(matrix, m_list, num_to_return, self.algo)
+        if self.algo == self.ALGO_MONTE_CARLO:
+            # Orderings equivalent by symmetry are removed afterwards, so
+            # more are requested.
+            ewald_m = EwaldMonteCarloMinimizer(
+                matrix, m_list, 4 * num_to_return, ncores=self.ncores,
+                **(self.mc_params or {}))
+        else:
+            ewald_m = EwaldMinimizer(matrix, m_list, num_to_return, self.algo,
+                                     ncores=self.ncores)
 
         self._all_structures = []
 
@@ -675,6 +703,18 @@ class OrderDisorderedStructureTransformation(AbstractTransformation):
                      (output[0] - lowest_energy) / num_atoms,
                  "structure": s_copy.get_sorted_structure()})
 
+        if self.algo == self.ALGO_MONTE_CARLO:
+            # Equivalent orderings have the same energy, so only those are
+            # compared.
+            matcher = StructureMatcher()
+            unique = []
+            for d in self._all_structures:
+                if not any(abs(d["energy"] - u["energy"]) < 1e-6 and
+                           matcher.fit(d["structure"], u["structure"])
+                           for u in unique):
+                    unique.append(d)
+            self._all_structures = unique
+
         if return_ranked_list:
             return self._all_structures[:num_to_return]
         else:
@@ -357,6 +357,28 @@ class OrderDisorderedStructureTransformationTest(unittest.TestCase):
         output = t.apply_transformation(struct, return_ranked_list=3)
         self.assertAlmostEqual(output[0]['energy'], -234.57813667648315, 4)
 
+    def test_monte_carlo(self):
+        t = OrderDisorderedStructureTransformation(
+            algo=OrderDisorderedStructureTransformation.ALGO_MONTE_CARLO,
+            mc_params={"n_replicas": 2, "seed": 0})
+        lattice = Lattice.cubic(3.8)
+        struct = Structure(lattice, [{"Si4+": 0.5, "O2-": 0.25, "P5+": 0.25},
+                                     {"Si4+": 0.5, "O2-": 0.25, "P5+": 0.25}],
+                           [[0, 0, 0], [0.5, 0.5, 0.5]])
+        struct.make_supercell([2, 2, 1])
+        output = t.apply_transformation(struct, return_ranked_list=3)
+        t2 = OrderDisorderedStructureTransformation()
+        best = t2.apply_transformation(struct, return_ranked_list=1)
+        self.assertAlmostEqual(output[0]['energy'], best[0]['energy'], 4)
+        matcher = StructureMatcher()
+        for i, d in enumerate(output):
+            self.assertEqual(d["structure"].composition.reduced_formula,
+                             "Si2PO")
+            for d2 in output[:i]:
+                self.assertFalse(matcher.fit(d["structure"], d2["structure"]))
+        d = t.as_dict()
+        self.assertEqual(d["mc_params"]["n_replicas"], 2)
+
 
 class PrimitiveCellTransformationTest(unittest.TestCase):
     def test_apply_transformation(self):